@@ -4,10 +4,17 @@ The primary application script for Froggit
 This is the module with the application code.  Make sure that this module is
 in a folder with the following files:
 
-    app.py      (the primary controller class)
-    level.py    (the subcontroller for a single game level)
-    models.py   (the model classes)
-    consts.py   (the application constants)
+    app.py        (the primary controller class)
+    level.py      (the subcontroller for a single game level)
+    models.py     (the model classes)
+    simulation.py (the game rules, which run without Kivy)
+    engine.py     (the vectorized engine that moves the lane obstacles)
+    vector.py     (many games of one level at once, for training agents)
+    env.py        (a single level with the reset/step interface of Gym)
+    rollout.py    (plays many episodes of a folder of levels on all cores)
+    planner.py    (finds the fastest safe path to each exit of a level)
+    analyze.py    (checks and solves a folder of levels on all cores)
+    consts.py     (the application constants)
 
 In addition, you should have the following subfolders
 
@@ -26,4 +33,4 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Froggit(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Froggit(width=GAME_WIDTH,height=GAME_HEIGHT,rate=GAME_RATE).run()
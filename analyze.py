@@ -0,0 +1,266 @@
+"""
+Level analyzer module for Froggit
+
+This module checks a folder of level files (like the JSON folder) without a window.
+For each level, it reports whether the file is valid, whether every exit can be
+reached, the shortest time to fill every exit, and a difficulty score.  The levels are
+solved with the planner in planner.py, spread over all of the cores of the machine.
+
+The results are kept in a cache file, keyed by a hash of the contents of each level
+file.  Running the analyzer again only solves the levels that are new or have been
+changed since the last run.  Files with the same contents are only solved once.
+
+To analyze a folder from the command line::
+
+    python analyze.py JSON --processes 4
+
+This prints one line of JSON per level, followed by a summary.  Use the --options form
+for every number, as consts.py reads the second command line argument as the frog
+speed.
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+from simulation import *
+from planner import *
+import multiprocessing
+import argparse
+import hashlib
+import json
+import math
+import os
+
+# PRIMARY RULE: This module can only access consts.py, engine.py, simulation.py and
+# planner.py.  It must never import game2d (or anything from Kivy).
+
+
+# The name of the cache file in the level folder (it is not a .json file, so it is
+# never mistaken for a level)
+CACHE_FILE = '.analysis'
+
+# The version of the analysis (change it to throw away the results in every cache)
+ANALYSIS_VERSION = 1
+
+# The object data of a worker process (read once, when the worker starts)
+_HBDICT = None
+
+
+def analyze(folder,processes=None,objects=None,cache=None,dt=1/60):
+    """
+    Analyzes every level in folder, and yields the result of each level.
+
+    Each result is a dictionary with the level file name ('level') and the hash of
+    its contents ('hash').  A level that cannot be played has an error message
+    ('error').  Otherwise, the result has the number of exits ('exits'), the list of
+    exits that cannot be reached from the start ('unreachable'), whether the frog can
+    fill every exit ('solvable'), the time in seconds to fill every exit ('time', or
+    None if it cannot) and the difficulty score ('difficulty', see difficulty).
+
+    Files that are not well-formed JSON are reported first, without being sent to the
+    worker processes.  Levels found in the cache are reported next, and the rest
+    arrive in the order that they are solved.  The object data file in folder
+    (OBJECT_DATA) is not treated as a level.
+
+    Parameter folder: The folder with the level files
+    Precondition: folder is a string naming a folder
+
+    Parameter processes: The number of worker processes (None for one per core)
+    Precondition: processes is an int > 0 or None
+
+    Parameter objects: The object data file (None for the one in the JSON folder)
+    Precondition: objects is a string naming a JSON file or None
+
+    Parameter cache: The cache file (None for CACHE_FILE in folder, '' for no cache)
+    Precondition: cache is a string or None
+
+    Parameter dt: The time in seconds of each frame
+    Precondition: dt is a number > 0
+    """
+    if objects is None:
+        objects = os.path.join(JSON_PATH,OBJECT_DATA)
+    if cache is None:
+        cache = os.path.join(folder,CACHE_FILE)
+    with open(objects,'rb') as file:
+        context = hashlib.sha256(file.read())
+    context.update(repr((ANALYSIS_VERSION,dt)).encode())
+    saved = _read_cache(cache)
+
+    tasks = {}
+    found = {}
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder,name)
+        if name[-5:].lower() != '.json' or name == OBJECT_DATA:
+            continue
+        with open(path,'rb') as file:
+            data = file.read()
+        key = context.copy()
+        key.update(data)
+        key = key.hexdigest()
+        try:
+            json.loads(data)
+        except Exception as e:
+            yield {'level': name, 'hash': key, 'error': 'cannot read the JSON ('+str(e)+')'}
+            continue
+        if key in saved:
+            found[key] = saved[key]
+            yield dict(saved[key],level=name,hash=key)
+        elif key in tasks:
+            tasks[key][1].append(name)
+        else:
+            tasks[key] = (data,[name])
+
+    if len(tasks) > 0:
+        work = [(key,data,dt) for (key,(data,names)) in tasks.items()]
+        with multiprocessing.Pool(processes,_init_worker,(objects,)) as pool:
+            for (key,result) in pool.imap_unordered(_solve,work,chunksize=4):
+                found[key] = result
+                for name in tasks[key][1]:
+                    yield dict(result,level=name,hash=key)
+
+    if cache != '':
+        _write_cache(cache,found)
+
+
+def difficulty(planner,plans):
+    """
+    Returns the difficulty score of a level, from the plans that fill its exits.
+
+    The score is the time the plans take, divided by the time they would take if
+    nothing were ever in the way (going straight to each exit, one hop at a time).
+    So it is about 1 for a level that is easy, and grows with the time the frog has
+    to wait or go around obstacles.
+
+    Parameter planner: The planner for the level
+    Precondition: planner is a Planner object
+
+    Parameter plans: The plans that fill every exit, one after the other
+    Precondition: plans is a non-empty list of Plan objects from planner.solve()
+    """
+    level = planner.getLevel()
+    lanes = level.getLanes()
+    row = max(pos for pos in range(len(lanes)) if lanes[pos].getType() == 'hedge')
+    frog = level.getFrog()
+    lane = level.getLaneAt(frog.getY())
+
+    frames = 0
+    straight = 0
+    for plan in plans:
+        x = lanes[row].getXs()[plan.exit]
+        hops = row-lanes.index(lane)+math.ceil(round(abs(x-frog.getX())/GRID_SIZE,6))
+        straight += hops*planner.getHopFrames()
+        frames += plan.end-plan.start+1
+    return frames/straight
+
+
+def summarize(results):
+    """
+    Returns a dictionary with a summary of the results.
+
+    The summary has the number of levels ('levels'), the number that cannot be
+    played ('errors'), the number where every exit can be filled ('solvable'), and
+    the names of the levels where some exit cannot be reached ('unreachable').
+
+    Parameter results: The results of the levels
+    Precondition: results is a list of dictionaries from analyze
+    """
+    summary = {'levels': len(results), 'errors': 0, 'solvable': 0, 'unreachable': []}
+    for result in results:
+        if 'error' in result:
+            summary['errors'] += 1
+            continue
+        summary['solvable'] += 1 if result['solvable'] else 0
+        if len(result['unreachable']) > 0:
+            summary['unreachable'].append(result['level'])
+    summary['unreachable'].sort()
+    return summary
+
+
+def _read_cache(path):
+    """
+    Returns the dictionary of results in the cache file (empty if there is none).
+
+    Parameter path: The path to the cache file
+    Precondition: path is a string
+    """
+    try:
+        with open(path) as file:
+            saved = json.loads(file.read())
+        assert type(saved) == dict
+        return saved
+    except:
+        return {}
+
+
+def _write_cache(path,results):
+    """
+    Writes the results to the cache file.
+
+    The file is written next to the old one and then moved into place, so that a run
+    that is stopped part way never leaves a broken cache.
+
+    Parameter path: The path to the cache file
+    Precondition: path is a string
+
+    Parameter results: The results of each level, keyed by hash
+    Precondition: results is a dictionary of dictionaries
+    """
+    temp = path+'.tmp'
+    with open(temp,'w') as file:
+        file.write(json.dumps(results))
+    os.replace(temp,path)
+
+
+def _init_worker(objects):
+    """
+    Reads the object data for a worker process.
+
+    Parameter objects: The object data file
+    Precondition: objects is a string naming a JSON file
+    """
+    global _HBDICT
+    with open(objects) as file:
+        _HBDICT = json.loads(file.read())
+
+
+def _solve(task):
+    """
+    Solves one level in a worker process and returns the pair (hash,result).
+
+    The result has the keys described in analyze, except for the level name and hash.
+
+    Parameter task: The tuple (hash,data,dt), where data is the contents of the file
+    Precondition: task is a tuple with a string, a bytes object and a number > 0
+    """
+    (key,data,dt) = task
+    try:
+        planner = Planner(json.loads(data),_HBDICT,dt)
+    except Exception as e:
+        return (key,{'error': 'not a valid level ('+type(e).__name__+': '+str(e)+')'})
+
+    exits = planner.getExits()
+    plans = planner.plan()
+    result = {'exits': len(exits), 'unreachable': [pos for pos in exits if not pos in plans],
+              'solvable': False, 'time': None, 'difficulty': None}
+    if len(exits) > 0 and len(result['unreachable']) == 0:
+        chain = planner.solve()
+        if not chain is None:
+            result['solvable'] = True
+            result['time'] = planner.time(chain)
+            result['difficulty'] = difficulty(planner,chain)
+    return (key,result)
+
+
+# Application code
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Checks and solves Froggit levels.')
+    parser.add_argument('folder',help='the folder with the level files')
+    parser.add_argument('--processes',type=int,default=None)
+    parser.add_argument('--cache',default=None,help="the cache file ('' for none)")
+    args = parser.parse_args()
+
+    results = []
+    for result in analyze(args.folder,args.processes,cache=args.cache):
+        print(json.dumps(result),flush=True)
+        results.append(result)
+    print(json.dumps(summarize(results),indent=2))
@@ -74,6 +74,9 @@ class Froggit(GameApp):
     #Attribute _lastkeys: the number of keys pressed last frame
     #Invariant: _laskeys is an int >= 0
 
+    #Attribute _hbdict: the object data (hitboxes) read from OBJECT_DATA
+    #Invariant: _hbdict is a dictionary, read once when the application starts
+
     # DO NOT MAKE A NEW INITIALIZER!
 
     # THREE MAIN GAMEAPP METHODS
@@ -93,6 +96,7 @@ class Froggit(GameApp):
         """
         self._level = None
         self._lastkeys = 0
+        self._hbdict = self.load_json(OBJECT_DATA)
 
         self._title = GLabel(text='FROGGIT')
         self._title.font_name = ALLOY_FONT
@@ -156,6 +160,11 @@ class Froggit(GameApp):
         STATE_COMPLETE: The wave is over (all lives are lost or all frogs are safe),
         and is either won or lost.
 
+        Nothing moves in STATE_INACTIVE, STATE_PAUSED and STATE_COMPLETE until the
+        player presses a key.  So in those states the game is marked idle (see the
+        attribute idle of GameApp), and it stops updating and drawing until a key
+        is pressed or released.
+
         You are allowed to add more states if you wish. Should you do so, you should
         describe them here.
 
@@ -168,7 +177,7 @@ class Froggit(GameApp):
                 self._state = STATE_LOADING
 
         if self._state == STATE_LOADING:
-            self._level = Level(self.load_json(DEFAULT_LEVEL),self.load_json('objects.json'))
+            self._level = Level(self.load_json(DEFAULT_LEVEL),self._hbdict)
             self.width = self._level.getWidth()*GRID_SIZE
             self.height = self._level.getHeight()*GRID_SIZE
             self._state = STATE_ACTIVE
@@ -183,7 +192,7 @@ class Froggit(GameApp):
                 self._state = STATE_CONTINUE
 
         if self._state == STATE_CONTINUE:
-                self._level.start_over(self.load_json('objects.json'))
+                self._level.start_over(self._hbdict)
                 self._state = STATE_ACTIVE
 
         if self._state == STATE_COMPLETE:
@@ -193,6 +202,7 @@ class Froggit(GameApp):
                 self._text = self.middle_lane_label("YOU LOSE")
 
         self._lastkeys = curr_keys
+        self.idle = self._state in [STATE_INACTIVE,STATE_PAUSED,STATE_COMPLETE]
 
     def draw(self):
         """
@@ -212,7 +222,7 @@ class Froggit(GameApp):
             self._text.draw(self.view)
 
         elif self._state == STATE_LOADING or self._state == STATE_ACTIVE:
-            self._level.draw(self.view)
+            self._level.draw(self.view,self.alpha)
 
         elif self._state == STATE_PAUSED or self._state == STATE_COMPLETE:
             self._level.draw(self.view)
@@ -20,6 +20,10 @@ GAME_WIDTH  = 1024
 GAME_HEIGHT = 896
 # The size in pixels of a single grid square
 GRID_SIZE    = 64
+# The number of game updates per second (independent of the frames per second)
+GAME_RATE   = 120
+# Updates longer than this (in seconds) test car collisions over the whole update
+SWEEP_TIME  = 1/30
 
 
 ### FROG CONSTANTS ###
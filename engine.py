@@ -0,0 +1,365 @@
+"""
+Lane engine module for Froggit
+
+This module contains the vectorized lane engine used by the simulation in
+simulation.py.  The engine keeps every obstacle of a level in NumPy arrays, with one
+row per lane.  Moving the obstacles (and wrapping them around once they pass the
+offscreen buffer) is then a handful of array operations for the whole level, instead
+of a Python loop for each lane.
+
+Lanes have different numbers of obstacles, so the rows are padded with NaN.  A NaN
+position never compares as offscreen, so the padding never moves or wraps.
+
+The arithmetic is exactly the arithmetic of the original Lane.update, so the engine
+produces the same positions (down to the last bit) as the per-lane loops.
+
+As every lane moves at a constant speed and wraps around with a fixed period, the
+positions are also a simple function of time.  The engine can compute them for any
+time (see getXAt) without stepping through the frames in between.
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+import numpy as np
+
+# PRIMARY RULE: The engine can only access consts.py.  It must never import game2d
+# (or anything from Kivy), as it has to run on machines with no display.
+
+
+class LaneEngine(object):
+    """
+    A class storing and moving all of the obstacles in a level.
+
+    The engine is built from the lanes of a level (LaneSim objects from simulation.py).
+    Row r of each array is lane r, and column k is obstacle k of that lane.  After the
+    engine is built, the lanes read their obstacle positions from the engine.
+
+    Positions are returned to Python code as lists (see getXs).  These lists are made
+    on demand, and only once per step, so a lane that is never asked for its positions
+    costs nothing but its share of the array operations.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _x: The x coordinates of the obstacle centers (NaN for padding)
+    # Invariant: _x is a float array of shape (lanes,columns)
+
+    # Attribute _counts: The number of obstacles in each lane
+    # Invariant: _counts is a list of ints >= 0, one per lane
+
+    # Attribute _speed: The speed (#pixels/sec) of each lane
+    # Invariant: _speed is a float array of shape (lanes,1)
+
+    # Attribute _far: The right edge of the offscreen buffer of each lane
+    # Invariant: _far is a float array of shape (lanes,1)
+
+    # Attribute _edge: The right edge where an obstacle wraps (inf if it moves left)
+    # Invariant: _edge is a float array of shape (lanes,1)
+
+    # Attribute _low: The left edge where an obstacle wraps (-inf if it moves right)
+    # Invariant: _low is a float array of shape (lanes,1)
+
+    # Attribute _buffer: The distance in pixels that obstacles can move offscreen
+    # Invariant: _buffer is a float > 0
+
+    # Attribute _period: The distance an obstacle moves before it is back where it was
+    # Invariant: _period is a float array of shape (lanes,1)
+
+    # Attribute _clock: The time in seconds that the obstacles have moved
+    # Invariant: _clock is a float >= 0
+
+    # Attribute _widths: The image width of each obstacle (NaN for padding)
+    # Invariant: _widths is a float array of shape (lanes,columns)
+
+    # Attribute _hitboxes: The hitbox of each obstacle (NaN for padding)
+    # Invariant: _hitboxes is a float array of shape (lanes,columns,4)
+
+    # Attribute _lefts: The hitbox offset of the left edge of each obstacle
+    # Invariant: _lefts is a float array of shape (lanes,columns)
+
+    # Attribute _rights: The hitbox offset of the right edge of each obstacle
+    # Invariant: _rights is a float array of shape (lanes,columns)
+
+    # Attribute _halves: The half width of each obstacle
+    # Invariant: _halves is a float array of shape (lanes,columns)
+
+    # Attribute _tops: The top edge of each hitbox (which never changes)
+    # Invariant: _tops is a float array of shape (lanes,columns)
+
+    # Attribute _bottoms: The bottom edge of each hitbox (which never changes)
+    # Invariant: _bottoms is a float array of shape (lanes,columns)
+
+    # Attribute _start: The x coordinates of the obstacle centers when the level starts
+    # Invariant: _start is a float array with the same shape as _x
+
+    # Attribute _last: The x coordinates of the obstacle centers before the last step
+    # Invariant: _last is a float array with the same shape as _x
+
+    # Attribute _rows: The positions of each lane as a list, if already computed
+    # Invariant: _rows is a list of (list or None), one per lane
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getX(self):
+        """
+        Returns the array of x coordinates of all obstacles (one row per lane).
+
+        Unused entries of a row are NaN.  This array is the live state of the engine,
+        and should not be modified.
+        """
+        return self._x
+
+    def getCounts(self):
+        """
+        Returns the list of the number of obstacles in each lane.
+        """
+        return self._counts
+
+    def getWidths(self):
+        """
+        Returns the array of obstacle widths (one row per lane).
+        """
+        return self._widths
+
+    def getHitboxes(self):
+        """
+        Returns the array of obstacle hitboxes, of shape (lanes,columns,4).
+        """
+        return self._hitboxes
+
+    def getClock(self):
+        """
+        Returns the time in seconds that the obstacles have moved.
+
+        This is the sum of the dt values given to step since the level started (or
+        was reset).
+        """
+        return self._clock
+
+    def setClock(self,value,xs=None):
+        """
+        Moves every obstacle to where it is at the given time.
+
+        The positions are computed with getXAt, so this can jump forward or back in
+        time.  The positions agree with the ones from step up to rounding error.  To
+        get the exact positions of an earlier step instead, give them as xs.
+
+        Parameter value: The time in seconds since the start of the level
+        Precondition: value is a number (int or float) >= 0
+
+        Parameter xs: The positions in each lane at that time (or None to compute them)
+        Precondition: xs is None or a sequence with the positions of each lane, as
+        from getXsAt
+        """
+        assert type(value) in [int,float] and value >= 0, repr(value)+' is not a valid time'
+        if xs is None:
+            self._x[:] = self.getXAt(value)
+        else:
+            assert len(xs) == len(self._counts), repr(xs)+' does not have one entry per lane'
+            for row in range(len(xs)):
+                assert len(xs[row]) == self._counts[row], repr(xs[row])+' has the wrong size'
+                self._x[row,:self._counts[row]] = xs[row]
+        self._last[:] = self._x
+        self._clock = value
+        self._rows = [None]*len(self._rows)
+
+    def getEdges(self):
+        """
+        Returns the arrays (lefts,rights,halves,tops,bottoms) of the hitbox edges.
+
+        The bounding box of an obstacle at position x is (x+lefts-halves,tops,
+        x-rights+halves,bottoms), computed in that order (see getBoxes).
+        """
+        return (self._lefts,self._rights,self._halves,self._tops,self._bottoms)
+
+    def getPeriod(self,row):
+        """
+        Returns the distance an obstacle in the given lane moves before it wraps back.
+
+        After an obstacle moves this far, it is back where it started.
+
+        Parameter row: The lane number, bottom/first = 0
+        Precondition: row is a valid lane number
+        """
+        return float(self._period[row,0])
+
+    def getXs(self,row):
+        """
+        Returns the list of x coordinates of the obstacles in the given lane.
+
+        Parameter row: The lane number, bottom/first = 0
+        Precondition: row is a valid lane number
+        """
+        xs = self._rows[row]
+        if xs is None:
+            xs = self._x[row,:self._counts[row]].tolist()
+            self._rows[row] = xs
+        return xs
+
+    # INITIALIZER
+    def __init__(self,lanes,buffer):
+        """
+        Initializes a LaneEngine from the lanes of a level.
+
+        Parameter lanes: The lanes of the level, bottom lane first
+        Precondition: lanes is a list of LaneSim objects
+
+        Parameter buffer: The distance (in grid squares) that obstacles can move offscreen
+        Precondition: buffer is a number > 0
+        """
+        size = len(lanes)
+        columns = max([len(lane.getTypes()) for lane in lanes]+[1])
+        self._buffer = buffer*GRID_SIZE
+        self._counts = [len(lane.getTypes()) for lane in lanes]
+        self._rows = [None]*size
+
+        self._x = np.full((size,columns),np.nan)
+        self._widths = np.full((size,columns),np.nan)
+        self._hitboxes = np.full((size,columns,4),np.nan)
+        self._lefts = np.full((size,columns),np.nan)
+        self._rights = np.full((size,columns),np.nan)
+        self._halves = np.full((size,columns),np.nan)
+        self._tops = np.full((size,columns),np.nan)
+        self._bottoms = np.full((size,columns),np.nan)
+        self._speed = np.zeros((size,1))
+        self._far = np.zeros((size,1))
+        self._edge = np.full((size,1),np.inf)
+        self._low = np.full((size,1),-np.inf)
+
+        for row in range(size):
+            lane = lanes[row]
+            count = self._counts[row]
+            self._speed[row,0] = lane.getSpeed()
+            self._far[row,0] = lane.getWidth()*GRID_SIZE+self._buffer
+            if lane.getSpeed() < 0:
+                self._low[row,0] = -self._buffer
+            else:
+                self._edge[row,0] = self._far[row,0]
+
+            for pos in range(count):
+                (width,height) = lane.getSizes()[pos]
+                hit = lane.getHitboxes()[pos]
+                (l,t,r,b) = lane.getBox(pos)
+                self._x[row,pos] = lane.getXs()[pos]
+                self._widths[row,pos] = width
+                self._hitboxes[row,pos] = hit
+                self._lefts[row,pos] = hit[0] if lane.getAngle() == 0 else hit[2]
+                self._rights[row,pos] = hit[2] if lane.getAngle() == 0 else hit[0]
+                self._halves[row,pos] = width/2
+                self._tops[row,pos] = t
+                self._bottoms[row,pos] = b
+
+        self._period = self._far+self._buffer
+        self._start = self._x.copy()
+        self._last = self._x.copy()
+        self._clock = 0.0
+
+    # ADDITIONAL METHODS
+    def step(self,dt):
+        """
+        Moves all of the obstacles in all of the lanes.
+
+        Obstacles that move past the offscreen buffer wrap around to the other side,
+        keeping the distance they moved past the buffer.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        self._last[:] = self._x
+        self.move(self._x,dt)
+        self._clock += dt
+        self._rows = [None]*len(self._rows)
+
+    def reset(self):
+        """
+        Puts all of the obstacles back where they were when the level started.
+        """
+        self._x[:] = self._start
+        self._last[:] = self._start
+        self._clock = 0.0
+        self._rows = [None]*len(self._rows)
+
+    def getXAt(self,t):
+        """
+        Returns the array of obstacle positions at time t (one row per lane).
+
+        The time is measured from the start of the level, like getClock.  The result
+        is computed directly from the starting positions, so it costs the same for
+        any time.  It agrees with the positions from step, up to the rounding error
+        that step accumulates over many frames.
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0
+        """
+        start = self._start
+        x = start+self._buffer+self._speed*t
+        # The empty slots are nan, which is slow in mod, so they are left out
+        np.mod(x,self._period,out=x,where=~np.isnan(x))
+        return np.where(self._speed == 0,start,x-self._buffer)
+
+    def getXsAt(self,row,t):
+        """
+        Returns the list of x coordinates of the obstacles in a lane at time t.
+
+        Parameter row: The lane number, bottom/first = 0
+        Precondition: row is a valid lane number
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0
+        """
+        start = self._start[row,:self._counts[row]]
+        speed = self._speed[row,0]
+        if speed == 0:
+            return start.tolist()
+        period = self._period[row,0]
+        return (np.mod(start+self._buffer+speed*t,period)-self._buffer).tolist()
+
+    def blend(self,alpha):
+        """
+        Returns the obstacle positions part of the way from the last step to this one.
+
+        The result is an array like the one from getX, with the positions before the
+        last step when alpha is 0, and the current positions when alpha is 1.  This is
+        used to draw the obstacles between two simulation steps.  Obstacles that just
+        wrapped around are drawn at their current position, so they do not streak
+        across the screen.
+
+        Parameter alpha: The fraction of the way from the last step to this one
+        Precondition: alpha is a number with 0 <= alpha <= 1
+        """
+        result = self._last+(self._x-self._last)*alpha
+        wrapped = np.abs(self._x-self._last) > self._buffer
+        np.copyto(result,self._x,where=wrapped)
+        return result
+
+    def move(self,x,dt):
+        """
+        Moves the obstacles in the array x, using the speeds and edges of this engine.
+
+        This is the arithmetic of step, applied to an array that is not part of the
+        engine.  The last two dimensions of x must match the array from getX, but it
+        may have more dimensions in front (such as one per game, to move the lanes of
+        many copies of the same level at once).  The array is modified in place.
+
+        Parameter x: The obstacle positions to move
+        Precondition: x is a float array whose shape ends with the shape of getX()
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        x += self._speed*dt
+
+        # Only wrap if an obstacle has moved past the buffer
+        over = x > self._edge
+        under = x < self._low
+        if (over|under).any():
+            np.copyto(x,-self._buffer+(x-self._edge),where=over)
+            np.copyto(x,self._far-(-x-self._buffer),where=under)
+
+    def getBoxes(self):
+        """
+        Returns the bounding boxes of all obstacles as four arrays (l,t,r,b).
+
+        Each array has one row per lane, like the array from getX.  These are the
+        same boxes that GObject._bbox computes for the obstacle images.
+        """
+        x = self._x
+        return (x+self._lefts-self._halves,self._tops,x-self._rights+self._halves,self._bottoms)
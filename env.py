@@ -0,0 +1,158 @@
+"""
+Environment module for Froggit
+
+This module contains the class LevelEnv, which wraps a single level in the reset/step
+interface used by Gym.  It is built on LevelSim (in simulation.py), so it runs without
+Kivy, and it never reads a file after it is created.  A reset puts the simulation
+back in its starting state instead of loading the level again, so it takes a few
+microseconds.
+
+To play a level with random actions::
+
+    env = LevelEnv(load_json('easy1.json'),load_json('objects.json'))
+    obs = env.reset()
+    done = False
+    while not done:
+        (obs,reward,done,info) = env.step(random.randrange(len(ACTIONS)))
+
+The observation and rewards are the same as for VecLevel in vector.py.
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+from simulation import *
+from vector import *
+import numpy as np
+
+# PRIMARY RULE: This module can only access consts.py, engine.py, simulation.py and
+# vector.py.  It must never import game2d (or anything from Kivy).
+
+
+class LevelEnv(object):
+    """
+    A class presenting a single level of Froggit as a Gym-style environment.
+
+    An action is an index into ACTIONS (so 0 is no move, and 3 is a hop up).  Each
+    step advances the game by dt seconds.  When the frog dies or reaches an exit, the
+    next frog is placed on the board right away, as if the player had pressed 'C'.
+    The episode is done when the game is complete (all exits full or no lives left),
+    and the environment must then be reset before it is stepped again.
+
+    The observation is a float array.  Entry 0 is the frog x coordinate, entry 1 is
+    the frog y coordinate, entry 2 is the number of lives, and the remaining entries
+    are the x coordinates of every obstacle in the level (bottom lane first).  When
+    there is no frog on the board (at the end of a game), the frog coordinates are
+    those of the starting position.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _level: The simulation of the level
+    # Invariant: _level is a LevelSim object
+
+    # Attribute _dt: The time in seconds of each step
+    # Invariant: _dt is a number > 0
+
+    # Attribute _startx: The starting x-coordinate of the frog
+    # Invariant: _startx is a number
+
+    # Attribute _starty: The starting y-coordinate of the frog
+    # Invariant: _starty is a number
+
+    # Attribute _columns: The entries of the engine array that are real obstacles
+    # Invariant: _columns is a bool array with one entry per engine array entry
+
+    # Attribute _frames: The number of steps since the last reset
+    # Invariant: _frames is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getLevel(self):
+        """
+        Returns the simulation (a LevelSim object) of the level.
+        """
+        return self._level
+
+    def getFrames(self):
+        """
+        Returns the number of steps since the last reset.
+        """
+        return self._frames
+
+    # INITIALIZER
+    def __init__(self,dict,hbdict,dt=1/60):
+        """
+        Initializes an environment for the given level.
+
+        The dictionaries are only read here.  They are never read again, not even
+        when the environment is reset.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+
+        Parameter dt: The time in seconds of each step
+        Precondition: dt is a number > 0
+        """
+        assert type(dt) in [int,float] and dt > 0, repr(dt)+' is not a valid time step'
+        self._level = LevelSim(dict,hbdict)
+        self._dt = dt
+        self._startx = self._level.getFrog().getX()
+        self._starty = self._level.getFrog().getY()
+        self._columns = ~np.isnan(self._level.getEngine().getX()).ravel()
+        self._frames = 0
+
+    # ADDITIONAL METHODS
+    def reset(self):
+        """
+        Puts the level back in its starting state and returns the observation.
+        """
+        self._level.reset()
+        self._frames = 0
+        return self._observe()
+
+    def step(self,action):
+        """
+        Advances the game by one step and returns the tuple (obs,reward,done,info).
+
+        The reward is REWARD_EXIT if the frog reached an exit in this step, and
+        REWARD_DEATH if the frog was killed.  The value info is a dictionary with the
+        events of the step ('events'), the number of lives left ('lives'), and
+        whether all exits are full ('won').
+
+        Parameter action: The action, as an index into ACTIONS
+        Precondition: action is an int with 0 <= action < len(ACTIONS)
+        """
+        level = self._level
+        assert level.getState() != STATE_COMPLETE, 'the game is over; call reset'
+        level.update(ACTIONS[action],self._dt)
+        self._frames += 1
+
+        events = level.getEvents()
+        reward = 0.0
+        if EVENT_EXIT in events:
+            reward += REWARD_EXIT
+        if EVENT_DEATH in events:
+            reward += REWARD_DEATH
+
+        if level.getState() == STATE_PAUSED:
+            level.start_over()
+
+        done = level.getState() == STATE_COMPLETE
+        info = {'events': list(events), 'lives': level.getLives(),
+                'won': level.exits_full()}
+        return (self._observe(),reward,done,info)
+
+    # HELPERS
+    def _observe(self):
+        """
+        Returns the observation of the game (see the class description).
+        """
+        frog = self._level.getFrog()
+        obstacles = self._level.getEngine().getX().ravel()[self._columns]
+        obs = np.empty(3+len(obstacles))
+        obs[0] = self._startx if frog is None else frog.getX()
+        obs[1] = self._starty if frog is None else frog.getY()
+        obs[2] = self._level.getLives()
+        obs[3:] = obstacles
+        return obs
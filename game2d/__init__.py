@@ -11,6 +11,9 @@ from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
 from .gtile import GTile
+from .ghash import GHash
+from .gbatch import GBatch
+from .glayer import GLayer
 from .gpath import GPath, GTriangle, GPolygon
 from .gview import GInput, GView
 from .sound import Sound, SoundLibrary
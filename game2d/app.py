@@ -18,6 +18,8 @@ from kivy.core.window import Window
 from kivy.logger import Logger
 
 import traceback
+import collections
+import hashlib
 import os.path
 import json
 import sys
@@ -48,6 +50,30 @@ class GameApp(kivy.app.App):
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # Class attribute for tracking collision masks (computed once per image file)
+    MASK_CACHE = {}
+    
+    # Class attribute for the images in the texture atlas (None until it is loaded)
+    ATLAS_CACHE = None
+    
+    # Class attribute for tracking rendered text (least recently used first)
+    TEXT_CACHE = collections.OrderedDict()
+    
+    # The most textures of rendered text to keep in the cache
+    TEXT_LIMIT = 64
+    
+    # The width and height of each page of the texture atlas (0 for no atlas)
+    ATLAS_SIZE = 1024
+    
+    # The folder (inside the Images folder) where the texture atlas is saved
+    ATLAS_FOLDER = '.atlas'
+    
+    # The smallest alpha value (0..255) of a pixel that counts for collisions
+    MASK_ALPHA = 128
+    
+    # The most updates in one animation frame when the game has a fixed rate
+    MAX_STEPS = 8
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -69,7 +95,98 @@ class GameApp(kivy.app.App):
         assert value > 0, 'value %s is not positive' % repr(value)
         Clock.unschedule(self._refresh)
         self._fps = value
-        Clock.schedule_interval(self._refresh,1.0/self._fps)
+        if not self._asleep:
+            Clock.schedule_interval(self._refresh,1.0/self._fps)
+    
+    @property
+    def rate(self):
+        """
+        The number of times per second to update the game, or None
+        
+        If this value is None (the default), ``update`` is called once per animation 
+        frame with the time since the last frame.  Otherwise, ``update`` is always called
+        with ``dt`` equal to 1/rate.  It is called as many times as needed to keep up 
+        with the clock (so it may be called several times in one frame, or not at all),
+        but never more than ``MAX_STEPS`` times in a single frame.  This makes the game
+        the same on every run, and a long pause cannot make objects jump over each other.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._rate
+    
+    @rate.setter
+    def rate(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._rate = value
+        self._time = 0.0
+    
+    @property
+    def interpolate(self):
+        """
+        Whether ``alpha`` reports the time between updates (when the game has a rate)
+        
+        If this value is False, ``alpha`` is always 1.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._interpolate
+    
+    @interpolate.setter
+    def interpolate(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._interpolate = value
+    
+    @property
+    def idle(self):
+        """
+        Whether the game is idle, so that nothing on screen changes without input
+        
+        Set this value in ``update`` when the game is waiting for the player, such as
+        on a title screen or a pause screen.  The frame of that update is still drawn.
+        After it, the game stops updating and drawing, and the last frame stays on the 
+        screen.  The clock stops calling the game at all, so an idle game takes no 
+        time.  As soon as a key or the mouse is pressed or released, the game wakes up
+        and runs at the full frame rate again (and ``update`` can set this value back 
+        to False, or leave it True to go back to sleep).
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._idle
+    
+    @idle.setter
+    def idle(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._idle = value
+        if not value:
+            self._wake()
+    
+    @property
+    def capture(self):
+        """
+        The size (width,height) to capture each frame at, or None for no capture.
+        
+        When this value is not None, every frame is read back after ``draw`` (see the
+        method ``capture`` in :class:`GView`), and stored in the attribute ``pixels``.
+        This is how to get pixel observations for an agent, or screenshots to compare
+        from one version of a game to the next.  The capture does not need a visible
+        window, so it can run under ``SDL_VIDEODRIVER=offscreen`` or ``xvfb-run``.
+        
+        The size may be smaller than the window, in which case the frame is scaled 
+        down to fit.  Use (0,0) to capture at the size of the window.
+        
+        **Invariant**: Must be None or a tuple of two ints >= 0.
+        """
+        return self._capture
+    
+    @capture.setter
+    def capture(self,value):
+        assert value is None or (type(value) == tuple and len(value) == 2 and 
+                                 all(type(x) == int and x >= 0 for x in value)), \
+                                 'value %s is not a valid size' % repr(value)
+        self._capture = value
+        if value is None:
+            self._pixels = None
     
     @property
     def width(self):
@@ -129,6 +246,38 @@ class GameApp(kivy.app.App):
         """
         return self._input
     
+    @property
+    def alpha(self):
+        """
+        The fraction of an update that has passed since the last update.
+        
+        When the game has a ``rate``, the animation frames fall between the updates.
+        This value says how far the current frame is from the last update to the next
+        one, so ``draw`` can place objects between their last two positions for a 
+        smoother animation.  It is always 1 if there is no rate, or if ``interpolate``
+        is False.
+        
+        **Invariant**: Must be a float with 0 <= alpha <= 1.
+        """
+        if self._rate is None or not self._interpolate:
+            return 1.0
+        return min(self._time*self._rate,1.0)
+    
+    @property
+    def pixels(self):
+        """
+        The pixels of the last frame, if the game is capturing frames.
+        
+        This is a numpy array of ``uint8`` with shape (height,width,3), where the
+        first row is the top of the window (see the method ``capture`` in 
+        :class:`GView`).  It is read-only, and it is replaced with a new array every
+        frame.
+        
+        **Invariant**: Must be a numpy array, or None if ``capture`` is None or no 
+        frame has been drawn yet.
+        """
+        return self._pixels
+    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -213,6 +362,9 @@ class GameApp(kivy.app.App):
         has already been loaded, it will return the cached texture.  Otherwise, it will
         load the texture and cache it before returning it.
         
+        If the image is in the texture atlas (see :meth:`load_atlas`), the texture is
+        its region of an atlas page.  Otherwise it is a texture of its own.
+        
         :param name: The file name
         :type name:  ``str``
         """
@@ -221,6 +373,10 @@ class GameApp(kivy.app.App):
             return None
         elif name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
+        elif name in cls.load_atlas():
+            texture = cls.ATLAS_CACHE[name]
+            cls.TEXTURE_CACHE[name] = texture
+            return texture
         
         try:
             from kivy.core.image import Image
@@ -235,6 +391,147 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def load_atlas(cls):
+        """
+        Returns: A dictionary with the texture of each image in the texture atlas
+        
+        The atlas packs the PNG files in the **Images** folder into a few large pages
+        (``ATLAS_SIZE`` pixels wide and high), so that drawing images from different
+        files does not switch textures.  The dictionary maps each file name to its
+        region of a page.  Images too large for a page are left out.
+        
+        Packing the atlas is slow, so the pages are saved in ``ATLAS_FOLDER`` inside the
+        **Images** folder.  They are named by a hash of the image files, and are only
+        packed again when an image changes.  If the atlas cannot be made (packing needs
+        PIL, and the folder must be writable), the dictionary is empty and every image
+        gets a texture of its own.
+        """
+        if not cls.ATLAS_CACHE is None:
+            return cls.ATLAS_CACHE
+        
+        cls.ATLAS_CACHE = {}
+        if cls.ATLAS_SIZE == 0:
+            return cls.ATLAS_CACHE
+        
+        try:
+            from kivy.atlas import Atlas
+            folder = os.path.join(cls.images,cls.ATLAS_FOLDER)
+            files = sorted(name for name in os.listdir(cls.images) if name.lower().endswith('.png'))
+            digest = hashlib.sha1(repr(cls.ATLAS_SIZE).encode())
+            for name in files:
+                with open(os.path.join(cls.images,name),'rb') as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+            outname = os.path.join(folder,'images-'+digest.hexdigest()[:16])
+            if not os.path.exists(outname+'.atlas'):
+                cls._pack_atlas(outname,files)
+            
+            atlas = Atlas(outname+'.atlas')
+            for name in files:
+                if name[:-4] in atlas.textures:
+                    cls.ATLAS_CACHE[name] = atlas.textures[name[:-4]]
+        except:
+            Logger.info('GameApp: Could not make the texture atlas.')
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            items = traceback.format_exception(exc_type, exc_value, exc_tb)
+            Logger.info(items[-1].strip())
+            cls.ATLAS_CACHE = {}
+        
+        return cls.ATLAS_CACHE
+    
+    @classmethod
+    def load_text(cls,text,font_name,font_size,bold=False,color=(1,1,1,1),halign='left'):
+        """
+        Returns: The texture of the given text, rendered with the given font
+        
+        Rendering text with FreeType is slow, so the texture is cached.  Text that is 
+        rendered again with the same font, size, style, color and alignment gets the 
+        cached texture.  The cache keeps the ``TEXT_LIMIT`` textures that were used
+        most recently, and forgets the others.
+        
+        The alignment only matters for text with more than one line.
+        
+        :param text: The text to render
+        :type text:  ``str``
+        
+        :param font_name: The font file (or the name of a Kivy font)
+        :type font_name:  ``str``
+        
+        :param font_size: The size of the font in pixels
+        :type font_size:  ``int`` or ``float`` > 0
+        
+        :param bold: Whether the text is bold
+        :type bold:  ``bool``
+        
+        :param color: The color of the text
+        :type color:  4-element list of floats between 0 and 1
+        
+        :param halign: The alignment of the lines: 'left', 'right' or 'center'
+        :type halign:  ``str``
+        """
+        key = (text,font_name,font_size,bold,tuple(color),halign)
+        if key in cls.TEXT_CACHE:
+            cls.TEXT_CACHE.move_to_end(key)
+            return cls.TEXT_CACHE[key]
+        
+        from kivy.core.text import Label
+        label = Label(text=text,font_name=font_name,font_size=font_size,bold=bold,
+                      color=list(color),halign=halign)
+        label.refresh()
+        texture = label.texture
+        cls.TEXT_CACHE[key] = texture
+        while len(cls.TEXT_CACHE) > cls.TEXT_LIMIT:
+            cls.TEXT_CACHE.popitem(last=False)
+        return texture
+    
+    @classmethod
+    def load_mask(cls,name):
+        """
+        Returns: The collision mask for the given file name, or None if it cannot be loaded
+        
+        The mask is a 2d numpy array of bools, with one entry per pixel of the image.
+        An entry is True if the alpha value of the pixel is at least ``MASK_ALPHA``.
+        The first row of the array is the bottom row of the image, as in a texture.  An
+        image with no alpha channel is solid everywhere.
+        
+        The ``name`` must refer to the file in the **Images** folder.  The mask is only
+        computed the first time, and it is cached after that.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        if not cls.is_image(name):
+            Logger.info('GameApp: No image file named %s.' % repr(name))
+            return None
+        elif name in cls.MASK_CACHE:
+            return cls.MASK_CACHE[name]
+        
+        try:
+            from kivy.core.image import ImageLoader
+            data = ImageLoader.load(os.path.join(cls.images,name),keep_data=True)._data[0]
+            (width, height) = (data.width, data.height)
+            if data.fmt in ['rgba','bgra','argb','abgr']:
+                size = data.rowlength if data.rowlength else width*4
+                pixels = numpy.frombuffer(data.data,numpy.uint8)[:size*height]
+                pixels = pixels.reshape(height,size)[:,:width*4].reshape(height,width,4)
+                mask = pixels[:,:,data.fmt.index('a')] >= cls.MASK_ALPHA
+            else:
+                mask = numpy.ones((height,width),bool)
+            if data.flip_vertical:
+                mask = mask[::-1]
+            mask = numpy.ascontiguousarray(mask)
+            mask.flags.writeable = False
+            cls.MASK_CACHE[name] = mask
+        except:
+            Logger.info('GameApp: Image %s is not properly formatted.' % repr(name))
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            items = traceback.format_exception(exc_type, exc_value, exc_tb)
+            Logger.info(items[-1].strip())
+            mask = None
+        
+        return mask
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -297,6 +594,11 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        To update the game 120 times a second, no matter the frame rate, add the 
+        keyword ``rate=120`` (see the attribute ``rate``).  To read back every frame 
+        as an 84x84 array of pixels, add the keyword ``capture=(84,84)`` (see the 
+        attribute ``capture``).
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -309,6 +611,9 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        r = keywords.pop('rate', None)
+        i = keywords.pop('interpolate', True)
+        c = keywords.pop('capture', None)
         
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
@@ -320,6 +625,12 @@ class GameApp(kivy.app.App):
         Window.size = (self.width,self.height)
         
         self._fps = f
+        self._asleep = False
+        self._idle = False
+        self.rate = r
+        self.interpolate = i
+        self._pixels = None
+        self.capture = c
         
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
@@ -360,6 +671,7 @@ class GameApp(kivy.app.App):
         self._view.size_hint = (1,1)
         self._input = GInput()
         self._input._register(self._view)
+        self._input._listener = self._wake
         return self.view
     
     def run(self):
@@ -430,11 +742,39 @@ class GameApp(kivy.app.App):
         This method is a callback-proxy for method `start`.  It handles important issues 
         behind the scenes, particularly with setting the FPS
         """
+        self._schedule()
+        self.start()
+    
+    def _schedule(self):
+        """
+        Schedules the animation frames at the frame rate.
+        """
+        Clock.unschedule(self._refresh)
         if (self.fps < 60):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
-        self.start()
+    
+    def _sleep(self):
+        """
+        Stops the animation frames while the game is idle.
+        
+        The view is not cleared, so the last frame stays on the screen.
+        """
+        Clock.unschedule(self._refresh)
+        self._asleep = True
+    
+    def _wake(self):
+        """
+        Starts the animation frames again if the game is asleep.
+        
+        This is called when there is input, or when ``idle`` is set to False.  The time
+        spent asleep is dropped, so the game does not try to catch up on it.
+        """
+        if self._asleep:
+            self._asleep = False
+            self._time = 0.0
+            self._schedule()
     
     def _refresh(self,dt):
         """
@@ -447,9 +787,69 @@ class GameApp(kivy.app.App):
         :type dt:  ``int`` or ``float``
         """
         self.view.clear()
-        self.update(dt)
+        if self._rate is None:
+            self.update(dt)
+            self.draw()
+            self._grab()
+            self.input.refresh()
+            if self._idle:
+                self._sleep()
+            return
+        
+        step = 1.0/self._rate
+        self._time += dt
+        count = 0
+        while self._time >= step and count < self.MAX_STEPS:
+            self.update(step)
+            self.input.refresh()
+            self._time -= step
+            count += 1
+        
+        # Drop the time we cannot catch up on
+        if self._time >= step:
+            self._time = self._time % step
         self.draw()
-        self.input.refresh()
+        self._grab()
+        if self._idle:
+            self._sleep()
+    
+    def _grab(self):
+        """
+        Captures the frame just drawn into the attribute ``pixels``, if asked to.
+        """
+        if not self._capture is None:
+            (w,h) = self._capture
+            self._pixels = self.view.capture(w if w else None,h if h else None)
+    
+    @classmethod
+    def _pack_atlas(cls,outname,files):
+        """
+        Packs the image files into new atlas pages, deleting the old pages.
+        
+        :param outname: The path of the atlas, without the .atlas suffix
+        :type outname:  ``str``
+        
+        :param files: The names of the PNG files in the **Images** folder
+        :type files:  ``list`` of ``str``
+        """
+        from kivy.atlas import Atlas
+        from PIL import Image
+        folder = os.path.dirname(outname)
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.startswith('images-'):
+                    os.remove(os.path.join(folder,name))
+        else:
+            os.makedirs(folder)
+        
+        # Leave room for the padding around each image
+        paths = []
+        for name in files:
+            path = os.path.join(cls.images,name)
+            with Image.open(path) as image:
+                if max(image.size) <= cls.ATLAS_SIZE-2:
+                    paths.append(path)
+        assert Atlas.create(outname,paths,cls.ATLAS_SIZE), 'atlas %s was not packed' % repr(outname)
     
     def _setpaths(self):
         """
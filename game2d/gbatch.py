@@ -0,0 +1,179 @@
+"""
+A module to support drawing many images at once.
+
+Every :class:`GImage` is drawn with its own chain of Kivy instructions: it pushes the
+matrix, moves, turns and scales it, draws a rectangle and pops the matrix again.  A
+lane with forty cars makes forty of these chains every frame.  A batch instead puts
+every image that shares a texture into a single mesh, so the whole lane is drawn with
+one mesh per texture.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject, GScene, _corners
+from .grectangle import GImage
+from .gsprite import GSprite
+
+
+def is_image_list(g):
+    """
+    Returns True if g is a list or tuple of images (GImage or GSprite objects).
+
+    :param g: The value to test
+    :type g:  any
+    """
+    try:
+        return type(g) in [list,tuple] and all(isinstance(x,(GImage,GSprite)) for x in g)
+    except:
+        return False
+
+
+class GBatch(GScene):
+    """
+    A class representing a batch of images drawn with one mesh per texture.
+
+    A batch is a scene graph node (see :class:`GScene`) whose children must be
+    :class:`GImage` or :class:`GSprite` objects.  The children are not drawn on their
+    own.  Instead, the corners of each child become four vertices in the mesh of its
+    texture.  Sprite frames and images from the same texture atlas share a mesh, as
+    they share the same texture on the graphics card.
+
+    The mesh does not know when a child moves.  Call :meth:`update` after moving the
+    children (or changing their angle, scale, size, source or frame)::
+
+        batch = GBatch(children=cars)
+        for car in cars:
+            car.x += speed*dt
+        batch.update()
+
+    The batch only draws the images.  The ``fillcolor`` (tint) and ``linecolor``
+    (border) of the children are ignored.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def children(self):
+        """
+        The list of images stored in this batch.
+
+        The images are drawn as if (x,y) is the origin.  Therefore, changing the
+        attributes `x` and `y` will shift all of the children on the screen.
+
+        **invariant**: Value must be a list or tuple of :class:`GImage` or
+        :class:`GSprite` (possibly empty)
+        """
+        return tuple(self._children)
+
+    @children.setter
+    def children(self,value):
+        assert is_image_list(value), '%s is not a list of images' % repr(value)
+        self._children = list(value)
+        if self._defined:
+            self._reset()
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def meshes(self):
+        """
+        The number of meshes in this batch (one for each texture).
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return len(self._meshes)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new batch of images.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to batch
+        the images car1 and car2, call the constructor::
+
+            GBatch(children=[car1,car2])
+
+        This class supports the same keywords as :class:`GScene`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._meshes = []
+        self._groups = []
+        self._keys = ()
+        GScene.__init__(self,**keywords)
+
+
+    # PUBLIC METHODS
+    def update(self):
+        """
+        Moves the vertices of the meshes to the current corners of the children.
+
+        If the children no longer share the same textures (because a source changed),
+        the meshes are built again.
+        """
+        if self._texture_keys() != self._keys:
+            self._reset()
+        else:
+            self._fill()
+
+
+    # HIDDEN METHODS
+    def _texture_keys(self):
+        """
+        Returns a tuple with the texture of each child, as seen by the graphics card.
+
+        Texture regions (sprite frames and atlas images) have the id of the texture
+        that they are part of, so they share a key.
+        """
+        return tuple(None if child._texture is None else child._texture.id
+                     for child in self._children)
+
+    def _reset(self):
+        """
+        Resets the drawing cache, with one mesh for each texture.
+        """
+        GObject._reset(self)
+        self._keys = self._texture_keys()
+        self._meshes = []
+        self._groups = []
+
+        found = {}
+        for pos in range(len(self._children)):
+            key = self._keys[pos]
+            if key in found:
+                self._groups[found[key]].append(self._children[pos])
+            else:
+                found[key] = len(self._groups)
+                self._groups.append([self._children[pos]])
+
+        self._cache.add(Color(1,1,1))
+        for group in self._groups:
+            size = len(group)
+            indx = []
+            for pos in range(0,4*size,4):
+                indx.extend([pos,pos+1,pos+2,pos+2,pos+3,pos])
+            mesh = Mesh(vertices=[0]*(16*size),indices=indx,mode='triangles',
+                        texture=group[0]._texture)
+            self._meshes.append(mesh)
+            self._cache.add(mesh)
+        self._cache.add(PopMatrix())
+        self._fill()
+
+    def _fill(self):
+        """
+        Sets the vertices of each mesh from the corners and textures of its images.
+
+        Each vertex is (x,y,u,v).  The corners from :func:`_corners` go around the image
+        from the top left, while the texture coordinates of Kivy go around from the
+        bottom left, so the texture coordinates are reversed.
+        """
+        import numpy as np
+        for pos in range(len(self._groups)):
+            group = self._groups[pos]
+            corners = _corners(group,False)
+            coords = np.array([(0,0,1,0,1,1,0,1) if child._texture is None
+                               else child._texture.tex_coords for child in group],float)
+            coords = coords.reshape(-1,4,2)[:,::-1]
+            self._meshes[pos].vertices = np.concatenate([corners,coords],axis=2).ravel().tolist()
+
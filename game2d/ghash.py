@@ -0,0 +1,300 @@
+"""
+A module to support fast collisions between many objects.
+
+The method collides in GObject only tests one pair of objects.  Testing every object
+against every other object is quadratic, which is too slow once there are more than
+a few dozen objects.  A spatial hash splits the plane into square cells, and only
+tests objects that share a cell.  Objects in the hash move to their new cells on their
+own whenever their position, angle, scale, size or hitbox changes.
+"""
+import math
+from .gobject import GObject
+
+
+class GHash(object):
+    """
+    A class representing a spatial hash of graphics objects.
+
+    The hash is a grid of square cells.  Each object is stored in every cell that its
+    bounding box (see :meth:`GObject.collides`) touches.  To make a hash for a game
+    on a grid, use the grid size as the cell size::
+
+        grid = GHash(GRID_SIZE)
+        grid.insert(frog)
+        grid.insert(snake)
+
+    Objects that are added to a hash stay up to date as they move.  The only exception
+    is a :class:`GScene`, whose children can move without the scene knowing.  Call
+    :meth:`move` after changing the children of a scene in a hash.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellsize(self):
+        """
+        The width and height of each cell of the hash.
+
+        **invariant**: Value is a ``float`` > 0
+        """
+        return self._cellsize
+
+    @property
+    def objects(self):
+        """
+        The objects in this hash, in the order that they were added.
+
+        **invariant**: Value is a tuple of :class:`GObject`
+        """
+        return tuple(self._spans)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,cellsize):
+        """
+        Creates a new, empty spatial hash.
+
+        The cell size should be about the size of the objects in the hash.  If it is
+        much smaller, each object is stored in a lot of cells.  If it is much larger,
+        each cell has a lot of objects that do not overlap.
+
+        :param cellsize: The width and height of each cell
+        :type cellsize:  ``int`` or ``float`` > 0
+        """
+        assert type(cellsize) in [int,float], '%s is not a number' % repr(cellsize)
+        assert cellsize > 0, '%s is not positive' % repr(cellsize)
+        self._cellsize = float(cellsize)
+        self._cells = {}
+        self._spans = {}
+        self._added = {}
+        self._count = 0
+
+    def __len__(self):
+        """
+        :return: The number of objects in this hash.
+        :rtype:  ``int``
+        """
+        return len(self._spans)
+
+    def __contains__(self,obj):
+        """
+        :return: True if obj is in this hash
+        :rtype:  ``bool``
+        """
+        return obj in self._spans
+
+
+    # PUBLIC METHODS
+    def insert(self,obj):
+        """
+        Adds an object to this hash.
+
+        :param obj: The object to add
+        :type obj:  :class:`GObject` not already in this hash
+        """
+        assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(obj)
+        assert not obj in self._spans, '%s is already in this hash' % repr(obj)
+        span = self._span(self._extent(obj))
+        self._spans[obj] = span
+        self._added[obj] = self._count
+        self._count += 1
+        self._add(obj,span)
+        obj._grids = obj._grids+(self,)
+
+    def remove(self,obj):
+        """
+        Removes an object from this hash.
+
+        :param obj: The object to remove
+        :type obj:  :class:`GObject` in this hash
+        """
+        assert obj in self._spans, '%s is not in this hash' % repr(obj)
+        self._drop(obj,self._spans.pop(obj))
+        del self._added[obj]
+        obj._grids = tuple(grid for grid in obj._grids if not grid is self)
+
+    def move(self,obj):
+        """
+        Moves an object to the cells of its current bounding box.
+
+        Objects call this method on their own when their position, angle, scale, size
+        or hitbox changes, so there is normally no reason to call it.  It only moves
+        the object if it is now in different cells.
+
+        :param obj: The object to move
+        :type obj:  :class:`GObject` in this hash
+        """
+        assert obj in self._spans, '%s is not in this hash' % repr(obj)
+        span = self._span(self._extent(obj))
+        if span != self._spans[obj]:
+            self._drop(obj,self._spans[obj])
+            self._spans[obj] = span
+            self._add(obj,span)
+
+    def clear(self):
+        """
+        Removes every object from this hash.
+        """
+        for obj in self._spans:
+            obj._grids = tuple(grid for grid in obj._grids if not grid is self)
+        self._cells = {}
+        self._spans = {}
+        self._added = {}
+
+    def query(self,box):
+        """
+        Returns the objects whose bounding boxes overlap the given box.
+
+        The box is a tuple (left,top,right,bottom), like the bounding box of an object.
+        Boxes that only touch at an edge overlap, as in :meth:`GObject.collides`.  The
+        objects are in the order that they were added to the hash.
+
+        :param box: The box to search
+        :type box:  4-element tuple of numbers
+
+        :return: The objects overlapping the box
+        :rtype:  ``list`` of :class:`GObject`
+        """
+        assert len(box) == 4, '%s is not a valid box' % repr(box)
+        (l,t,r,b) = self._normal(box)
+        found = set()
+        span = self._span(box)
+        for col in range(span[0],span[2]+1):
+            for row in range(span[1],span[3]+1):
+                if (col,row) in self._cells:
+                    found.update(self._cells[(col,row)])
+
+        result = []
+        for obj in found:
+            (l0,t0,r0,b0) = self._extent(obj)
+            if l0 <= r and l <= r0 and b0 <= t and b <= t0:
+                result.append(obj)
+        result.sort(key=lambda obj: self._added[obj])
+        return result
+
+    def collisions(self,obj):
+        """
+        Returns the other objects in this hash that collide with obj.
+
+        The objects are tested with :meth:`GObject.collides`, so hitboxes and rotations
+        are taken into account.  The object obj does not need to be in this hash.
+
+        :param obj: The object to test
+        :type obj:  :class:`GObject`
+
+        :return: The objects that collide with obj
+        :rtype:  ``list`` of :class:`GObject`
+        """
+        assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(obj)
+        return [other for other in self.query(self._extent(obj))
+                if not other is obj and obj.collides(other)]
+
+    def pairs(self):
+        """
+        Returns every pair of objects in this hash that collide.
+
+        Each pair (a,b) appears once, with a added to the hash before b.  The pairs are
+        tested with :meth:`GObject.collides`.  As only objects that share a cell are
+        tested, the time is close to linear in the number of objects (unless many of
+        them are piled into the same cells).
+
+        :return: The colliding pairs
+        :rtype:  ``list`` of 2-element tuples of :class:`GObject`
+        """
+        tested = set()
+        result = []
+        for cell in self._cells.values():
+            objs = sorted(cell,key=lambda obj: self._added[obj])
+            for pos in range(len(objs)):
+                for other in objs[pos+1:]:
+                    key = (id(objs[pos]),id(other))
+                    if not key in tested:
+                        tested.add(key)
+                        if objs[pos].collides(other):
+                            result.append((objs[pos],other))
+        result.sort(key=lambda pair: (self._added[pair[0]],self._added[pair[1]]))
+        return result
+
+
+    # HIDDEN METHODS
+    def _normal(self,box):
+        """
+        Returns the box (l,t,r,b) with l <= r and b <= t.
+
+        The bounding box of an object turned 90 or 270 degrees has its top below its
+        bottom (see :meth:`GObject._bbox`), so the edges are put back in order.
+
+        :param box: The bounding box (l,t,r,b)
+        :type box:  4-element tuple of numbers
+        """
+        (l,t,r,b) = box
+        return (min(l,r),max(t,b),max(l,r),min(t,b))
+
+    def _extent(self,obj):
+        """
+        Returns a box (l,t,r,b) with l <= r and b <= t that holds every part of obj.
+
+        This is the bounding box of the object.  But :meth:`GObject.collides` tests a
+        rotated object with its rotated hitbox, and the bounding box of an object at
+        90 or 270 degrees (or with a scale) is not quite that.  In those cases the box
+        is grown to hold the corners of the rotated hitbox as well.
+
+        :param obj: The object
+        :type obj:  :class:`GObject`
+        """
+        (l,t,r,b) = self._normal(obj._bbox())
+        if (obj.angle % 360) in [90,270] or obj.scale != (1,1):
+            points = obj._corners()
+            l = min(l,float(points[:,0].min()))
+            r = max(r,float(points[:,0].max()))
+            b = min(b,float(points[:,1].min()))
+            t = max(t,float(points[:,1].max()))
+        return (l,t,r,b)
+
+    def _span(self,box):
+        """
+        Returns the cells (c0,r0,c1,r1) covered by a bounding box.
+
+        The cells are every (col,row) with c0 <= col <= c1 and r0 <= row <= r1.
+
+        :param box: The bounding box (l,t,r,b)
+        :type box:  4-element tuple of numbers
+        """
+        (l,t,r,b) = self._normal(box)
+        size = self._cellsize
+        return (math.floor(l/size),math.floor(b/size),math.floor(r/size),math.floor(t/size))
+
+    def _add(self,obj,span):
+        """
+        Adds an object to every cell in span.
+
+        :param obj: The object to add
+        :type obj:  :class:`GObject`
+
+        :param span: The cells (c0,r0,c1,r1) to add to
+        :type span:  4-element tuple of ``int``
+        """
+        (c0,r0,c1,r1) = span
+        for col in range(c0,c1+1):
+            for row in range(r0,r1+1):
+                if (col,row) in self._cells:
+                    self._cells[(col,row)].add(obj)
+                else:
+                    self._cells[(col,row)] = {obj}
+
+    def _drop(self,obj,span):
+        """
+        Removes an object from every cell in span, deleting the cells that are empty.
+
+        :param obj: The object to remove
+        :type obj:  :class:`GObject`
+
+        :param span: The cells (c0,r0,c1,r1) to remove from
+        :type span:  4-element tuple of ``int``
+        """
+        (c0,r0,c1,r1) = span
+        for col in range(c0,c1+1):
+            for row in range(r0,r1+1):
+                cell = self._cells[(col,row)]
+                cell.discard(obj)
+                if len(cell) == 0:
+                    del self._cells[(col,row)]
@@ -0,0 +1,130 @@
+"""
+A module to support backgrounds that are drawn once.
+
+Most of a game board never moves.  Drawing the grass, roads and water again every frame
+costs as much as drawing the first frame.  A layer draws its objects once into an
+offscreen framebuffer, and after that it is drawn as a single textured rectangle.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.metrics import dp
+from .gobject import GObject, is_gobject_list
+import math
+
+
+class GLayer(GObject):
+    """
+    A class representing objects drawn once into an offscreen texture.
+
+    A layer is a rectangle, like :class:`GRectangle`.  Its children are drawn into a
+    Kivy ``Fbo`` (framebuffer) the size of the layer, as if the bottom left corner of
+    the layer is the origin.  Drawing the layer only draws the texture of the
+    framebuffer, no matter how many children there are.
+
+    The children are not drawn again when they change.  Call :meth:`refresh` after
+    changing them.  Changing the children, width or height of the layer draws the
+    children again on its own.  As with :class:`GScene`, the children of a layer should
+    not be drawn anywhere else.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def children(self):
+        """
+        The list of objects drawn in this layer.
+
+        The objects are drawn as if the bottom left corner of the layer is the origin.
+
+        **invariant**: Value must be a list or tuple of :class:`GObject` (possibly empty)
+        """
+        return tuple(self._children)
+
+    @children.setter
+    def children(self,value):
+        assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
+        self._children = list(value)
+        if self._defined:
+            self._reset()
+
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture that the children are drawn into.
+
+        **invariant**: Value is a Kivy ``Texture``
+        """
+        return self._fbo.texture
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new layer.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to draw the
+        tiles grass and road in the bottom left corner of a 400x300 window, call the
+        constructor::
+
+            GLayer(children=[grass,road],left=0,bottom=0,width=400,height=300)
+
+        This class supports the same keywords as :class:`GObject`.  However, the
+        attributes `width` and `height` are **required** (so that the object knows how
+        large a framebuffer to make).  Leaving out these values will cause a
+        `ValueError`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names, including 'width' and 'height'
+        """
+        self._defined = False
+        if not 'width' in keywords:
+            raise ValueError("The 'width' argument must be specified.")
+        if not 'height' in keywords:
+            raise ValueError("The 'height' argument must be specified.")
+        self.children = keywords['children'] if 'children' in keywords else []
+        self._fbo = None
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def refresh(self):
+        """
+        Draws the children into the framebuffer again.
+
+        This puts the current drawing cache of each child in the framebuffer, so it
+        also picks up children that have rebuilt their caches.
+        """
+        self._fbo.clear()
+        self._fbo.add(ClearColor(0,0,0,0))
+        self._fbo.add(ClearBuffers())
+        self._fbo.add(PushMatrix())
+        self._fbo.add(Scale(dp(1),dp(1),1))
+        for child in self._children:
+            self._fbo.add(child._cache)
+        self._fbo.add(PopMatrix())
+        self._fbo.draw()
+
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache, with a new framebuffer.
+        """
+        GObject._reset(self)
+        if not self._fbo is None:
+            self._fbo.clear()
+
+        # Match the pixels of the screen (see the Retina work-around in GView)
+        size = (max(1,math.ceil(self.width*dp(1))),max(1,math.ceil(self.height*dp(1))))
+        self._fbo = Fbo(size=size)
+        self.refresh()
+
+        x = -self.width/2.0
+        y = -self.height/2.0
+        self._cache.add(Color(1,1,1))
+        self._cache.add(Rectangle(pos=(x,y),size=(self.width,self.height),texture=self._fbo.texture))
+        self._cache.add(PopMatrix())
@@ -77,6 +77,73 @@ def is_gobject_list(g):
         return False
 
 
+def _corners(objs,hitbox=True):
+    """
+    Computes the corners of the rotated hitboxes of the given objects.
+    
+    The corners of each hitbox are in order around the hitbox: top left, top right,
+    bottom right and then bottom left (before the rotation).  They are computed for
+    all of the objects at once.  If hitbox is False, the hitboxes are ignored, and
+    these are the corners of the objects as they are drawn.
+    
+    :return: The corners of each hitbox
+    :rtype:  numpy array of floats with shape (len(objs),4,2)
+    
+    :param objs: The objects
+    :type objs:  ``list`` of :class:`GObject`
+    
+    :param hitbox: Whether to use the hitboxes of the objects
+    :type hitbox:  ``bool``
+    """
+    import numpy as np
+    data = np.array([(obj._trans.x, obj._trans.y, obj._rotate.angle, obj._scale.x, obj._scale.y,
+                      obj.width, obj.height)+
+                     ((0,0,0,0) if obj._hitbox is None or not hitbox else obj._hitbox)
+                     for obj in objs],float).reshape(-1,11).T
+    (x, y, angle, sx, sy, width, height, h0, h1, h2, h3) = data
+    (w, h) = (width/2.0, height/2.0)
+    lx = np.stack([-w+h0, w-h2, w-h2,-w+h0],axis=1)*sx[:,None]
+    ly = np.stack([ h-h1, h-h1,-h+h3,-h+h3],axis=1)*sy[:,None]
+    radians = np.radians(angle)[:,None]
+    (cos, sin) = (np.cos(radians), np.sin(radians))
+    return np.stack([x[:,None]+cos*lx-sin*ly,y[:,None]+sin*lx+cos*ly],axis=2)
+
+
+def _separated(corners,others):
+    """
+    Checks whether a rectangle is separated from each of a collection of rectangles.
+    
+    This is the separating axis test.  Two rectangles do not overlap if and only if
+    they are separated along the direction of one of their four edges.  Rectangles
+    that only touch are not separated.
+    
+    :return: True for each rectangle in others that does not overlap corners
+    :rtype:  numpy array of ``bool`` (or a single ``bool`` if others is one rectangle)
+    
+    :param corners: The corners of the rectangle, in order around it
+    :type corners:  4x2 numpy array of floats
+    
+    :param others: The corners of the other rectangles, in order around each one
+    :type others:  numpy array of floats with shape (n,4,2) or (4,2)
+    """
+    import numpy as np
+    single = others.ndim == 2
+    others = others.reshape(-1,4,2)
+    count = others.shape[0]
+    
+    # The edge directions of both rectangles are the axes to test
+    mine = np.stack([corners[1]-corners[0],corners[3]-corners[0]])
+    axes = np.concatenate([np.broadcast_to(mine,(count,2,2)),
+                           others[:,1:2]-others[:,0:1],others[:,3:4]-others[:,0:1]],axis=1)
+    
+    # Project every corner on every axis
+    proj1 = np.einsum('nad,cd->nac',axes,corners)
+    proj2 = np.einsum('nad,ncd->nac',axes,others)
+    apart = (proj1.max(axis=2) < proj2.min(axis=2)) | (proj2.max(axis=2) < proj1.min(axis=2))
+    result = apart.any(axis=1)
+    return result[0] if single else result
+
+
 #mark -
 
 class GObject(object):
@@ -91,6 +158,16 @@ class GObject(object):
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
     """
 
+    # The number of bounding box requests answered from (or missing) the cache
+    _bhits = 0
+    _bmisses = 0
+
+    # The spatial hashes (GHash) with this object (shared and empty until it is added)
+    _grids = ()
+
+    # The views (GView) that this object was added to (shared and empty until it is added)
+    _views = ()
+
     # MUTABLE PROPERTIES
     @property
     def x(self):
@@ -106,6 +183,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._touch()
 
     @property
     def y(self):
@@ -121,6 +199,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._touch()
 
     @property
     def width(self):
@@ -138,6 +217,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
+        self._touch()
         if self._defined:
             self._reset()
 
@@ -157,6 +237,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
+        self._touch()
         if self._defined:
             self._reset()
     
@@ -186,6 +267,7 @@ class GObject(object):
     def hitbox(self,value):
         if value is None:
             self._hitbox = None
+            self._touch()
             return
         
         try:
@@ -195,6 +277,7 @@ class GObject(object):
         assert size == 4, '%s is not a tuple or list of size 4' % repr(value)
         assert all(map(lambda x : type(x) in [int,float], value)), '%s has non-numerical elements' % repr(value)
         self._hitbox = tuple(value)
+        self._touch()
 
     @property
     def scale(self):
@@ -225,6 +308,7 @@ class GObject(object):
             self._scale.x = float(value[0])
             self._scale.y = float(value[1])
         self._mtrue = False
+        self._touch()
 
     @property
     def angle(self):
@@ -242,9 +326,12 @@ class GObject(object):
         import numpy as np
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         diff = np.allclose([self._rotate.angle],[value])
+        same = self._rotate.angle == value
         self._rotate.angle = float(value)
         if not diff:
             self._mtrue = False
+        if not same:
+            self._touch()
 
     @property
     def linecolor(self):
@@ -355,11 +442,9 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.x-self.width/2.0+self._hitbox[0]
-        elif (self._rotate.angle % 360) == 180:
-            return self.x-self.width/2.0+self._hitbox[2]
+        # Optimize for 90 degree turns (the cached box is the same at 0 and 180)
+        if (self._rotate.angle % 360) in [0,180]:
+            return self._bbox()[0]
         elif (self._rotate.angle % 360) == 90.0:
             return self.x-self.height/2.0+self._hitbox[3]
         elif (self._rotate.angle % 360) == 270:
@@ -392,11 +477,9 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.x+self.width/2.0-self._hitbox[2]
-        elif (self._rotate.angle % 360) == 180:
-            return self.x+self.width/2.0-self._hitbox[0]
+        # Optimize for 90 degree turns (the cached box is the same at 0 and 180)
+        if (self._rotate.angle % 360) in [0,180]:
+            return self._bbox()[2]
         elif (self._rotate.angle % 360) == 90.0:
             return self.x+self.height/2.0-self._hitbox[1]
         elif (self._rotate.angle % 360) == 270:
@@ -429,11 +512,9 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.y+self.height/2.0-self._hitbox[1]
-        elif (self._rotate.angle % 360) == 180:
-            return self.y+self.height/2.0-self._hitbox[3]
+        # Optimize for 90 degree turns (the cached box is the same at 0 and 180)
+        if (self._rotate.angle % 360) in [0,180]:
+            return self._bbox()[1]
         elif (self._rotate.angle % 360) == 90.0:
             return self.y+self.width/2.0-self._hitbox[0]
         elif (self._rotate.angle % 360) == 270:
@@ -466,11 +547,9 @@ class GObject(object):
         
         **invariant**: Value must be an ``int`` or ``float``.
         """
-        # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.y-self.height/2.0+self._hitbox[3]
-        elif (self._rotate.angle % 360) == 180:
-            return self.y-self.height/2.0+self._hitbox[1]
+        # Optimize for 90 degree turns (the cached box is the same at 0 and 180)
+        if (self._rotate.angle % 360) in [0,180]:
+            return self._bbox()[3]
         elif (self._rotate.angle % 360) == 90.0:
             return self.y-self.width/2.0+self._hitbox[2]
         elif (self._rotate.angle % 360) == 270:
@@ -491,6 +570,21 @@ class GObject(object):
 
 
     # IMMUTABLE PROPERTIES
+    @property
+    def mask(self):
+        """
+        The collision mask of this object.
+        
+        If the mask is not None, :meth:`collides` only reports a collision if the solid
+        parts of the masks overlap (once the bounding boxes overlap).  The mask is a 2d
+        numpy array of bools, with the first row at the bottom, and it is stretched to
+        the width and height of the object.  Only images and sprites have masks (see
+        their ``masked`` attribute).
+        
+        **invariant**: Either a 2d numpy array of bools or ``None``
+        """
+        return None
+    
     @property
     def matrix(self):
         """
@@ -546,6 +640,8 @@ class GObject(object):
 
         # Create the Kivy transforms for position and size
         self._mtrue  = False
+        self._btrue  = False
+        self._bcache = None
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
@@ -607,6 +703,32 @@ class GObject(object):
 
 
     # PUBLIC METHODS
+    @classmethod
+    def bbox_stats(cls):
+        """
+        Returns the statistics of the bounding box cache.
+        
+        The statistics are for every object since the program started (or since the
+        last call to :meth:`reset_bbox_stats`).  The result is a dictionary with the
+        number of boxes that came from the cache ('hits'), the number that had to be
+        computed ('misses') and the fraction that came from the cache ('rate', which
+        is 0 if no box has been requested).
+        
+        :return: The statistics of the bounding box cache
+        :rtype:  ``dict``
+        """
+        total = GObject._bhits+GObject._bmisses
+        rate = GObject._bhits/total if total > 0 else 0.0
+        return {'hits': GObject._bhits, 'misses': GObject._bmisses, 'rate': rate}
+    
+    @classmethod
+    def reset_bbox_stats(cls):
+        """
+        Resets the statistics of the bounding box cache to 0.
+        """
+        GObject._bhits = 0
+        GObject._bmisses = 0
+    
     def collides(self,obj):
         """
         Checks whether this object collides with another.
@@ -621,42 +743,58 @@ class GObject(object):
         """
         assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(object)
         
-        # Get the hitboxes
-        h1 = (0,0,0,0) if self._hitbox is None else self._hitbox
-        h2 = (0,0,0,0) if obj._hitbox is None else obj._hitbox
-
         # Optimize for 90 degree turns
         if (self.angle % 360) in [0,90,180,270] and (obj.angle % 360) in [0,90,180,270]:
             (l0,t0,r0,b0) = obj._bbox()
             (l1,t1,r1,b1) = self._bbox()
             isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
             isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
-            return isx and isy
-        
-        comp = obj.matrix*self.matrix.inverse()
-        w = obj.width/2.0
-        h = obj.height/2.0
-        p0 = tuple(comp._transform(-w+h2[0], h-h2[1]))
-        p1 = tuple(comp._transform( w-h2[2], h-h2[1]))
-        p2 = tuple(comp._transform( w-h2[2],-h+h2[3]))
-        p3 = tuple(comp._transform(-w+h2[0],-h+h2[3]))
-        
-        sides = ((p0,p1),(p1,p2),(p2,p3),(p3,p0))
-        l1 = -self.width/2.0  + h1[0]
-        r1 =  self.width/2.0  - h1[2]
-        t1 =  self.height/2.0 - h1[1]
-        b1 = -self.height/2.0 + h1[3]
-        for s in sides:
-            l0 = min(s[0][0],s[1][0])
-            r0 = max(s[0][0],s[1][0])
-            b0 = min(s[0][1],s[1][1])
-            t0 = max(s[0][1],s[1][1])
-            isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
-            isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
-            if isx and isy:
-                return True
+            return isx and isy and self._mask_overlap(obj)
+        
+        # Otherwise use the separating axis test on the rotated hitboxes
+        return not _separated(self._corners(),obj._corners()) and self._mask_overlap(obj)
     
-        return False
+    def collides_all(self,objs):
+        """
+        Checks whether this object collides with each object in a list.
+        
+        The result is the same as calling :meth:`collides` on each object, but the
+        rotated objects are all tested in one step with numpy.  This is much faster for
+        a large number of rotated objects.
+        
+        :param objs: the objects to check for collision
+        :type objs: ``list`` or ``tuple`` of :class:`GObject`
+        
+        :return: The result of the collision test for each object
+        :rtype:  numpy array of ``bool``
+        """
+        import numpy as np
+        assert is_gobject_list(objs), '%s is not a list of valid objects' % repr(objs)
+        result = np.zeros(len(objs),bool)
+        if len(objs) == 0:
+            return result
+        
+        # The objects at a 90 degree turn use the bounding box test (as in collides)
+        square = [(obj.angle % 360) in [0,90,180,270] for obj in objs]
+        if (self.angle % 360) in [0,90,180,270] and any(square):
+            pos = [index for index in range(len(objs)) if square[index]]
+            (l0,t0,r0,b0) = np.array([objs[index]._bbox() for index in pos]).T
+            (l1,t1,r1,b1) = self._bbox()
+            isx = ((l1 <= l0) & (l0 <= r1)) | ((l0 <= l1) & (l1 <= r0))
+            isy = ((b1 <= b0) & (b0 <= t1)) | ((b0 <= b1) & (b1 <= t0))
+            result[pos] = isx & isy
+            rest = [index for index in range(len(objs)) if not square[index]]
+        else:
+            rest = list(range(len(objs)))
+        
+        if len(rest) > 0:
+            corners = _corners([objs[index] for index in rest])
+            result[rest] = ~_separated(self._corners(),corners)
+        
+        # Only the hits need the masks
+        for index in np.flatnonzero(result):
+            result[index] = self._mask_overlap(objs[index])
+        return result
     
     def contains(self,point):
         """
@@ -682,11 +820,17 @@ class GObject(object):
             return l <= point[0] <= r and b <= point[1] <= t
         
         # Transform this to the right space.
-        point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
+        import math
+        radians = -math.radians(self._rotate.angle)
+        (cos, sin) = (math.cos(radians), math.sin(radians))
+        dx = point[0]-self._trans.x
+        dy = point[1]-self._trans.y
+        point = ((cos*dx-sin*dy)/self._scale.x,(sin*dx+cos*dy)/self._scale.y)
+        hit = (0,0,0,0) if self._hitbox is None else self._hitbox
         w = self.width/2.0 
         h = self.height/2.0
-        isx = - w + self._hitbox[0] <= point[0] <= w - self._hitbox[2]
-        isy = - h + self._hitbox[3] <= point[1] <= h - self._hitbox[1]
+        isx = - w + hit[0] <= point[0] <= w - hit[2]
+        isy = - h + hit[3] <= point[1] <= h - hit[1]
         return isx and isy
 
     def transform(self,point):
@@ -735,6 +879,8 @@ class GObject(object):
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
+        for view in self._views:
+            view._replace(self)
 
     def _build_matrix(self):
         """
@@ -752,11 +898,106 @@ class GObject(object):
 
     def _bbox(self):
         """
-        Computes the bounding box of this rotated object
+        Returns the bounding box of this rotated object
         
         The bounding box is returned as a tuple (l,t,r,b). This function allows for 
         fast(er) collisions when the object is rotated in 90 degree increments.
         
+        The box is cached, and it is only computed again after a change to the
+        position, angle, scale, size or hitbox.
+        
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        if self._btrue:
+            GObject._bhits += 1
+            return self._bcache
+        GObject._bmisses += 1
+        self._bcache = self._build_bbox()
+        self._btrue = True
+        return self._bcache
+
+    def _mask_overlap(self,obj):
+        """
+        Checks whether the masks of this object and obj overlap.
+        
+        This is only called once the boxes overlap.  It returns True right away if
+        neither object has a mask.  Otherwise, it samples the pixels in the overlap of
+        the two bounding boxes, and tests whether any pixel is solid in both masks (an
+        object with no mask is solid everywhere).
+        
+        :param obj: the object to check for collision
+        :type obj: :class:`GObject`
+        
+        :return: True if the masks overlap
+        :rtype:  ``bool``
+        """
+        mask1 = self.mask
+        mask2 = obj.mask
+        if mask1 is None and mask2 is None:
+            return True
+        
+        import numpy as np
+        (l1,t1,r1,b1) = self._bbox()
+        (l2,t2,r2,b2) = obj._bbox()
+        left   = max(min(l1,r1),min(l2,r2))
+        right  = min(max(l1,r1),max(l2,r2))
+        bottom = max(min(t1,b1),min(t2,b2))
+        top    = min(max(t1,b1),max(t2,b2))
+        
+        cols = max(1,int(np.ceil(right-left)))
+        rows = max(1,int(np.ceil(top-bottom)))
+        xs = left+(np.arange(cols)+0.5)*((right-left)/cols)
+        ys = bottom+(np.arange(rows)+0.5)*((top-bottom)/rows)
+        (xs, ys) = np.meshgrid(xs,ys)
+        
+        solid = np.ones(xs.shape,bool)
+        for (item,mask) in ((self,mask1),(obj,mask2)):
+            if not mask is None:
+                solid &= item._mask_at(mask,xs,ys)
+        return bool(solid.any())
+    
+    def _mask_at(self,mask,xs,ys):
+        """
+        Returns a numpy array that is True where the points are solid in the mask.
+        
+        :param mask: the mask of this object
+        :type mask: 2d numpy array of bools
+        
+        :param xs: the x coordinates of the points
+        :type xs: numpy array of floats
+        
+        :param ys: the y coordinates of the points (the same shape as xs)
+        :type ys: numpy array of floats
+        """
+        import numpy as np
+        radians = -np.radians(self._rotate.angle)
+        (cos, sin) = (np.cos(radians), np.sin(radians))
+        dx = xs-self._trans.x
+        dy = ys-self._trans.y
+        lx = (cos*dx-sin*dy)/self._scale.x
+        ly = (sin*dx+cos*dy)/self._scale.y
+        
+        (height, width) = mask.shape
+        cols = np.floor((lx/self.width+0.5)*width).astype(int)
+        rows = np.floor((ly/self.height+0.5)*height).astype(int)
+        valid = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+        result = np.zeros(xs.shape,bool)
+        result[valid] = mask[rows[valid],cols[valid]]
+        return result
+    
+    def _touch(self):
+        """
+        Marks the bounding box as changed, and moves this object in its spatial hashes.
+        """
+        self._btrue = False
+        for grid in self._grids:
+            grid.move(self)
+
+    def _build_bbox(self):
+        """
+        Computes the bounding box of this rotated object
+        
         :return: The bounding box for the shape
         :rtype:  ``tuple`` of four ``float`` values
         """
@@ -785,21 +1026,26 @@ class GObject(object):
             r = self.x - hit[1] + h
             l = self.x + hit[3] - h
         else:
-            comp = self.matrix
-            w = self.width/2.0
-            h = self.height/2.0
-            p0 = tuple(comp._transform(-w+hit[0], h-hit[1]))
-            p1 = tuple(comp._transform( w-hit[2], h-hit[1]))
-            p2 = tuple(comp._transform( w-hit[2],-h+hit[3]))
-            p3 = tuple(comp._transform(-w+hit[0],-h+hit[3]))
-            
-            l = min(p0[0],p1[0],p2[0],p3[0])
-            r = max(p0[0],p1[0],p2[0],p3[0])
-            b = min(p0[1],p1[1],p2[1],p3[1])
-            t = max(p0[1],p1[1],p2[1],p3[1])
+            points = self._corners()
+            l = float(points[:,0].min())
+            r = float(points[:,0].max())
+            b = float(points[:,1].min())
+            t = float(points[:,1].max())
         
         return (l,t,r,b)
 
+    def _corners(self):
+        """
+        Computes the corners of the rotated hitbox of this object
+        
+        The corners are in order around the hitbox: top left, top right, bottom right
+        and then bottom left (before the rotation).
+        
+        :return: The corners of the hitbox
+        :rtype:  4x2 numpy array of floats
+        """
+        return _corners([self])[0]
+
 
 #mark -
 
@@ -932,6 +1178,17 @@ class GScene(GObject):
 
 
     # HIDDEN METHODS
+    def _bbox(self):
+        """
+        Computes the bounding box of this rotated scene
+        
+        The box is never cached, as the children can move without the scene knowing.
+        
+        :return: The bounding box for the scene
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return self._build_bbox()
+    
     def _reset(self):
         """
         Resets the drawing cache
@@ -10,7 +10,8 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
+from kivy.core.text import DEFAULT_FONT
+from kivy.metrics import sp
 from kivy.uix.image import Image
 from .gobject import GObject
 from .app import GameApp
@@ -222,6 +223,36 @@ class GImage(GRectangle):
         if self._defined:
             self._reset()
     
+    @property
+    def masked(self):
+        """
+        Whether this image uses a collision mask from its alpha channel.
+        
+        If this value is True, :meth:`collides` only reports a collision if the visible
+        (not transparent) pixels of the images overlap.  This is more accurate than a
+        hitbox for round or slanted images, but it is slower when the boxes overlap.
+        
+        **invariant**. Value is a bool.
+        """
+        return self._masked
+    
+    @masked.setter
+    def masked(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._masked = value
+        if self._defined:
+            self._reset()
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def mask(self):
+        """
+        The collision mask of this image (None if masked is False).
+        
+        **invariant**: Either a 2d numpy array of bools or ``None``
+        """
+        return self._mask
+    
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -235,15 +266,17 @@ class GImage(GRectangle):
             GImage(x=0,y=0,width=10,height=10,source='beach-ball.png')
         
         This class supports the all same keywords as :class:`GRectangle`; the only new 
-        keyword is ``source``.  See the documentation of :class:`GRectangle` and 
-        :class:`GObject` for the other supported keywords.
+        keywords are ``source`` and ``masked``.  See the documentation of :class:`GRectangle`
+        and :class:`GObject` for the other supported keywords.
         
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         self._defined = False
         self.source = keywords['source'] if 'source' in keywords else None
+        self.masked = keywords['masked'] if 'masked' in keywords else False
         self._texture = None
+        self._mask = None
         GRectangle.__init__(self,**keywords)
         self._defined = True
     
@@ -256,6 +289,7 @@ class GImage(GRectangle):
         GObject._reset(self)
         
         self._texture = GameApp.load_texture(self.source)
+        self._mask = GameApp.load_mask(self.source) if self._masked else None
         if not self._texture is None and (self.width == 0 or self.height == 0):
                 self.width  = self._texture.width
                 self.height = self._texture.height
@@ -300,7 +334,16 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    The text is rendered with :meth:`GameApp.load_text`, which caches the texture.  So
+    labels with the same text, font and color share a texture, and making the same
+    label again (say, every animation frame) does not render the text again.
+    
+    Because of this, a label is no longer a Kivy ``Label`` widget underneath, and it only
+    has the text settings listed here.  The other keywords of a Kivy ``Label`` (such as
+    ``markup``, ``italic``, ``padding`` or ``line_height``) used to be passed on to it.
+    They are now an error, rather than ignored."""
     
     # MUTABLE PROPERTIES
     @property
@@ -315,8 +358,8 @@ class GLabel(GRectangle):
     def font_size(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        if self._defined:
+            self._reset()
     
     @property
     def font_name(self):
@@ -324,14 +367,15 @@ class GLabel(GRectangle):
         The file name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
-        self._label.font_name = value
-        self._label.texture_update()
+        self._fname = value
+        if self._defined:
+            self._reset()
     
     @property
     def bold(self):
@@ -343,13 +387,14 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        self._bold = value
+        if self._defined:
+            self._reset()
 
     @property
     def text(self):
@@ -361,13 +406,14 @@ class GLabel(GRectangle):
         this label will grow to ensure that the text will fit in the rectangle.
         
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
-        self._label.text = value
-        self._label.texture_update()
+        self._text = value
+        if self._defined:
+            self._reset()
     
     @property
     def halign(self):
@@ -389,7 +435,6 @@ class GLabel(GRectangle):
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
-        self._label.halign = value
         if self._defined:
             self._reset()
     
@@ -413,7 +458,6 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
-        self._label.valign = value
         if self._defined:
             self._reset()
     
@@ -432,6 +476,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._touch()
         self._hanchor = 'center'
         self._ha = value
     
@@ -448,6 +493,7 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._touch()
         self._vanchor = 'center'
         self._hv = value
     
@@ -592,20 +638,24 @@ class GLabel(GRectangle):
             GLabel(text='Hello')
         
         This class supports the all same keywords as :class:`GRectangle`, as well as 
-        additional attributes for the text properties (e.g. font size and name).
+        additional attributes for the text properties (e.g. font size and name).  Any
+        other keyword (like the Kivy ``Label`` keyword ``markup``) raises a TypeError.
         """
+        for key in keywords:
+            if not hasattr(type(self),key):
+                raise TypeError('%s is not a keyword of %s' % (repr(key),type(self).__name__))
+        
         self._defined = False
         self._hanchor = 'center'
         self._vanchor = 'center'
+        self._texture = None
         
-        sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
-        for key in keywords:
-            if not key in excludes:
-                sanitized[key] = keywords[key]
-        
-        self._label = Label(**sanitized)
-        self._label.size_hint = (None,None)
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self._fname = DEFAULT_FONT
+        if 'font_name' in keywords:
+            self.font_name = keywords['font_name']
+        self.font_size = keywords['font_size'] if 'font_size' in keywords else sp(15)
+        self.bold = keywords['bold'] if 'bold' in keywords else False
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -616,7 +666,6 @@ class GLabel(GRectangle):
             self.linecolor = (0,0,0,1)
         self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
     
     def __str__(self):
         """
@@ -631,27 +680,20 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
-        """
-        A workaround to deal with parameter requirements for callbacks
-        """
-        if self._defined:
-            self._reset()
-    
     def _reset(self):
         """
         Resets the drawing cache.
         """
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        if self.linecolor:
-            self._label.color = self.linecolor
+        # Render the text (or get it from the cache)
+        color = self.linecolor if self.linecolor else (1,1,1,1)
+        self._texture = GameApp.load_text(self._text,self._fname,self._fsize,self._bold,
+                                          color,self._halign)
+        (tw, th) = (0, 0) if self._texture is None else self._texture.size
         
         # Resize the outside if necessary
         self._defined = False
-        self._width  = max(self.width, self._label.width)
-        self._height = max(self.height,self._label.height)
+        self._width  = max(self.width, tw)
+        self._height = max(self.height,th)
         self._defined = True
         
         # Reset the absolute anchor
@@ -665,18 +707,21 @@ class GLabel(GRectangle):
             self._trans.y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
+        self._touch()
         
-        # Reset the label anchor.
+        # Reset the text anchor.
+        tx = -tw/2.0
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            tx = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
+            tx = self.width/2.0-tw
         
-        # Reset the label anchor.
+        # Reset the text anchor.
+        ty = -th/2.0
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            ty = self.height/2.0-th
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            ty = -self.height/2.0
         
         GObject._reset(self)
         x = -self.width/2.0
@@ -687,7 +732,9 @@ class GLabel(GRectangle):
             self._cache.add(self._fillcolor)
             self._cache.add(fill)
         
-        self._cache.add(self._label.canvas)
+        if not self._texture is None:
+            self._cache.add(Color(1,1,1,1))
+            self._cache.add(Rectangle(pos=(int(tx),int(ty)),size=(tw,th),texture=self._texture))
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
@@ -33,7 +33,17 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are only cut out once.  Every sprite with the same source
+    and format shares them, so making a new sprite is little more than a lookup.
     """
+    # Class attribute for tracking frames, keyed by (source,format).  Each value is a
+    # tuple (texture,frames,masks), where masks is None until a masked sprite needs them
+    FRAME_CACHE = {}
+    
+    # Class attribute for tracking checked hitboxes, keyed by (source,format).  Each value
+    # is the last hitbox list given to a sprite, as a tuple of tuples
+    HITBOX_CACHE = {}
     
     # IMMUTABLE PROPERTIES
     @property
@@ -62,6 +72,26 @@ class GSprite(GRectangle):
         if self._defined:
             self._reset()
     
+    @property
+    def masked(self):
+        """
+        Whether this sprite uses collision masks from its alpha channel.
+        
+        If this value is True, each frame has its own mask, and :meth:`collides` only
+        reports a collision if the visible (not transparent) pixels of the current
+        frame overlap.  The masks are made once, when the image is loaded.
+        
+        **invariant**. Value is a bool.
+        """
+        return self._masked
+    
+    @masked.setter
+    def masked(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._masked = value
+        if self._defined:
+            self._reset()
+    
     @property
     def format(self):
         """
@@ -131,6 +161,18 @@ class GSprite(GRectangle):
         if value is None:
             self._hitboxes = None
             self._hitbox   = None
+            self._touch()
+            return
+        
+        # Sprites given the same hitboxes (by value) do not need to check them again
+        key = (self._source,self._format)
+        try:
+            boxes = tuple(map(tuple,value))
+        except:
+            boxes = None
+        if not boxes is None and GSprite.HITBOX_CACHE.get(key) == boxes:
+            self._hitboxes = GSprite.HITBOX_CACHE[key]
+            self.hitbox = self._hitboxes[self.frame]
             return
         
         try:
@@ -140,10 +182,22 @@ class GSprite(GRectangle):
         assert size == self.count, '%s is not a tuple or list of size %s' % (repr(value),repr(self.count))
         assert all(map(lambda x : type(x) in [tuple,list] and len(x) == 4, value)), '%s contains an invalid hitbox' % repr(value)
         assert all(map(lambda x : all(map(lambda y: type(y) in [int,float], x)),value)),  '%s contains an invalid hitbox' % repr(value)
-        self._hitboxes = tuple(map(tuple,value))
+        self._hitboxes = boxes
+        GSprite.HITBOX_CACHE[key] = boxes
         self.hitbox = self._hitboxes[self.frame]
     
     
+    # IMMUTABLE PROPERTIES
+    @property
+    def mask(self):
+        """
+        The collision mask of the current frame (None if masked is False).
+        
+        **invariant**: Either a 2d numpy array of bools or ``None``
+        """
+        return None if self._masks is None else self._masks[self._frame]
+    
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -168,7 +222,9 @@ class GSprite(GRectangle):
         self._frame  = 0
         self.source = keywords['source'] if 'source' in keywords else None
         self.format = keywords['format'] if 'format' in keywords else (1,1)
+        self.masked = keywords['masked'] if 'masked' in keywords else False
         self._images = [None]*self.count
+        self._masks = None
         self._bounds = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
@@ -183,20 +239,14 @@ class GSprite(GRectangle):
         GObject._reset(self)
         
         texture = GameApp.load_texture(self.source)
+        self._masks = None
         if texture:
             width  = texture.width/self._format[1]
             height = texture.height/self._format[0]
             if (self.width == 0 or self.height == 0):
                 self.width  = width
                 self.height = height
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+            (self._images, self._masks) = self._slice(texture)
         else:
             print('Failed to load',repr(self.source))
         
@@ -216,4 +266,48 @@ class GSprite(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
+    
+    def _slice(self,texture):
+        """
+        Returns the pair (frames,masks) for this sprite, cut out of the texture.
+        
+        The frames are cut out the first time, and taken from ``FRAME_CACHE`` after
+        that.  The masks are None unless this sprite is masked.
+        
+        :param texture: The texture of the source file
+        :type texture:  Kivy ``Texture``
+        """
+        key = (self._source,self._format)
+        (rows, cols) = self._format
+        width  = texture.width/cols
+        height = texture.height/rows
+        entry = GSprite.FRAME_CACHE[key] if key in GSprite.FRAME_CACHE else None
+        
+        if entry is None or not entry[0] is texture:
+            images = [None]*self.count
+            ty = 0
+            for row in range(rows):
+                tx = 0
+                for col in range(cols):
+                    images[row*cols+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
+                    tx += width
+                ty += width
+            entry = (texture,tuple(images),None)
+        
+        if self._masked and entry[2] is None:
+            mask = GameApp.load_mask(self.source)
+            if not mask is None:
+                masks = [None]*self.count
+                ty = 0
+                for row in range(rows):
+                    tx = 0
+                    for col in range(cols):
+                        y0 = texture.height-int(ty)-int(height)
+                        masks[row*cols+col] = mask[y0:y0+int(height),int(tx):int(tx)+int(width)]
+                        tx += width
+                    ty += width
+                entry = (entry[0],entry[1],tuple(masks))
+        
+        GSprite.FRAME_CACHE[key] = entry
+        return (entry[1], entry[2] if self._masked else None)
 
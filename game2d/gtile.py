@@ -118,19 +118,26 @@ class GTile(GObject):
         rng_x = size_x+1 if rem_x > 0 else size_x
         rng_y = size_y+1 if rem_y > 0 else size_y
         
-        vert = []
-        indx = []
-        pos = 0
-        for ii in range(rng_x):
-            for jj in range(rng_y):
-                ni = 1 if ii < size_x else rem_x/grid_x
-                nj = 1 if jj < size_y else rem_y/grid_y
-                vert.extend([x+ii*grid_x,      y+jj*grid_y,         0, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,        ni, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y,   ni, 1-nj])
-                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y,    0, 1-nj])
-                indx.extend([pos,pos+1,pos+2,pos+2,pos+3,pos])
-                pos += 4
+        # The texture may be a region of an atlas, so go across and up its corners
+        (u0, v0, u1, v1, u2, v2, u3, v3) = self._texture.tex_coords
+        (du, dv) = (u1-u0, v1-v0)
+        (eu, ev) = (u3-u0, v3-v0)
+        
+        # Make every copy of the image at once (columns first, as in the texture)
+        import numpy as np
+        (ii, jj) = np.meshgrid(np.arange(rng_x),np.arange(rng_y),indexing='ij')
+        (ii, jj) = (ii.ravel(), jj.ravel())
+        ni = np.where(ii < size_x,1.0,rem_x/grid_x)
+        nj = np.where(jj < size_y,1.0,rem_y/grid_y)
+        (left, bottom) = (x+ii*grid_x, y+jj*grid_y)
+        (right, top) = (x+(ii+ni)*grid_x, y+(jj+nj)*grid_y)
+        vert = np.stack([left,   bottom, u0+0*ni,         v0+0*ni,
+                         right,  bottom, u0+ni*du,        v0+ni*dv,
+                         right,  top,    u0+ni*du+nj*eu,  v0+ni*dv+nj*ev,
+                         left,   top,    u0+nj*eu,        v0+nj*ev],axis=1)
+        indx = 4*np.arange(len(ii))[:,None]+np.array([0,1,2,2,3,0])
+        vert = vert.ravel().tolist()
+        indx = indx.ravel().tolist()
         
         mesh = Mesh(vertices=vert, indices=indx,mode='triangles',texture=self._texture)
         if not self._fillcolor is None:
@@ -15,6 +15,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from introcs.geom import Point2
+from .gobject import GObject
 
 
 class GInput(object):
@@ -146,6 +147,9 @@ class GInput(object):
         self._keystate = {}
         self._keycount = 0
 
+        # A function to call on every key or touch event (see GameApp.idle)
+        self._listener = None
+
 
     # PUBLIC METHODS
     def refresh(self):
@@ -360,6 +364,7 @@ class GInput(object):
         if not k in self._keystate or not self._keystate[k]:
             self._keycount += 1
         self._keystate[k] = True
+        self._notify()
         return True
 
     def _release_key(self, keyboard, keycode):
@@ -374,6 +379,7 @@ class GInput(object):
         """
         self._keystate[keycode[1]] = False
         self._keycount -= 1
+        self._notify()
         return True
 
     def _capture_touch(self,view,touch):
@@ -388,6 +394,7 @@ class GInput(object):
         """
         self._touch = touch
         #self._touch.grab(self)
+        self._notify()
 
     def _release_touch(self,view,touch):
         """
@@ -400,6 +407,14 @@ class GInput(object):
         :type touch:  ``kivy.input.motionevent.TouchEvent``
         """
         self._touch = None
+        self._notify()
+
+    def _notify(self):
+        """
+        Calls the listener (if there is one) after a key or touch event.
+        """
+        if not self._listener is None:
+            self._listener()
 
 
 # #mark -
@@ -411,6 +426,17 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    Objects that are on the screen for a long time can be added to the view with
+    :meth:`add` instead.  These objects stay in the view, beneath the objects drawn
+    with :meth:`draw`, until they are removed.  Changing an object in the view (moving
+    it, turning it, changing its frame) updates the screen on its own, so these
+    objects cost nothing in the frames where they do not change.
+
+    The contents of the view can also be read back as pixels with :meth:`capture`.
+    This draws the view into an offscreen framebuffer, so it works even when the
+    window is not visible (such as with ``SDL_VIDEODRIVER=offscreen``, or under a
+    virtual framebuffer like ``xvfb-run``).
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
@@ -429,6 +455,9 @@ class GView(FloatLayout):
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
+        self._scene = InstructionGroup()
+        self._members = {}
+        self._fbo = None
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
@@ -455,11 +484,110 @@ class GView(FloatLayout):
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  It does
+        not remove the objects that were added with :meth:`add`.
         """
         self._frame.clear()
         self._contents.clear()
 
+    def add(self,obj):
+        """
+        Adds an object to this view, where it stays until it is removed.
+
+        The object is drawn every frame, beneath the objects drawn with :meth:`draw`.
+        The objects added to the view are drawn in the order that they were added.
+        Adding an object that is already in the view does nothing.
+
+        :param obj: the object to add
+        :type obj:  :class:`GObject`
+        """
+        assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(obj)
+        if not obj in self._members:
+            self._members[obj] = obj._cache
+            self._scene.add(obj._cache)
+            obj._views = obj._views+(self,)
+
+    def remove(self,obj):
+        """
+        Removes an object that was added to this view.
+
+        Removing an object that is not in the view does nothing.
+
+        :param obj: the object to remove
+        :type obj:  :class:`GObject`
+        """
+        if obj in self._members:
+            self._scene.remove(self._members.pop(obj))
+            obj._views = tuple(view for view in obj._views if not view is self)
+
+    def remove_all(self):
+        """
+        Removes every object that was added to this view.
+        """
+        for obj in self._members:
+            obj._views = tuple(view for view in obj._views if not view is self)
+        self._members = {}
+        self._scene.clear()
+
+    def capture(self,width=None,height=None):
+        """
+        Returns the contents of this view as an array of pixels.
+
+        The view is drawn into an offscreen framebuffer of the given size, scaled to
+        fit, and read back from the graphics card.  Leaving out the width and height
+        captures the view at the size of the window (in pixels).  Smaller sizes are
+        much faster to read back, which matters when capturing every frame.
+
+        The result is a numpy array of type ``uint8`` with shape (height,width,3).
+        The first row is the top of the view, and each pixel is (red,green,blue).  The
+        pixels are read from the graphics card exactly once, and the array is a view
+        of that buffer.  So the array is read-only and not contiguous; use
+        ``numpy.array`` on it to get a copy that can be changed.
+
+        :param width: The width of the result in pixels (None for the view width)
+        :type width:  ``int`` > 0 or None
+
+        :param height: The height of the result in pixels (None for the view height)
+        :type height:  ``int`` > 0 or None
+
+        :return: The pixels of the view
+        :rtype:  numpy array of ``uint8`` with shape (height,width,3)
+        """
+        import numpy as np
+        width  = int(self.width)  if width  is None else width
+        height = int(self.height) if height is None else height
+        assert type(width) == int and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) == int and height > 0, '%s is not a valid height' % repr(height)
+
+        if self._fbo is None or tuple(self._fbo.size) != (width,height):
+            self._fbo = Fbo(size=(width,height))
+
+        # Move the canvas into the framebuffer, as in Widget.export_as_image
+        index = -1
+        if not self.parent is None:
+            index = self.parent.canvas.indexof(self.canvas)
+            if index > -1:
+                self.parent.canvas.remove(self.canvas)
+
+        self._fbo.clear()
+        self._fbo.add(ClearColor(0,0,0,1))
+        self._fbo.add(ClearBuffers())
+        self._fbo.add(PushMatrix())
+        self._fbo.add(Scale(width/float(self.width),height/float(self.height),1))
+        self._fbo.add(Translate(-self.x,-self.y,0))
+        self._fbo.add(self.canvas)
+        self._fbo.add(PopMatrix())
+        self._fbo.draw()
+        data = self._fbo.pixels
+        self._fbo.remove(self.canvas)
+
+        if index > -1:
+            self.parent.canvas.insert(index,self.canvas)
+
+        # The framebuffer is RGBA, with the bottom row first
+        pixels = np.frombuffer(data,np.uint8).reshape(height,width,4)
+        return pixels[::-1,:,:3]
+
     # HIDDEN METHODS
     def _reset(self,obj=None,value=None):
         """
@@ -470,4 +598,21 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        self.canvas.add(self._scene)
         self.canvas.add(self._frame)
+
+    def _replace(self,obj):
+        """
+        Puts the new drawing cache of an object in the place of its old one.
+
+        Objects call this method when they rebuild their drawing cache.
+
+        :param obj: the object with a new drawing cache
+        :type obj:  :class:`GObject` added to this view
+        """
+        old = self._members[obj]
+        if not old is obj._cache:
+            pos = self._scene.indexof(old)
+            self._scene.remove(old)
+            self._scene.insert(pos,obj._cache)
+            self._members[obj] = obj._cache
@@ -49,19 +49,23 @@ class Lane(object):         # You are permitted to change the parent class if yo
     subclass of GTile if you want.  This will make collisions easier.  However, it can
     make drawing really confusing because the Lane not only includes the tile but also
     all of the objects in the lane (cars, logs, etc.)
+
+    A lane is a view of a LaneSim object (from simulation.py).  The simulation moves
+    the obstacles and handles all collisions.  This class only has the images, and
+    moves them to the simulated positions when it draws.
     """
     # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _model: The simulated lane that this lane draws
+    # Invariant: _model is a LaneSim object
+
     # Attribute _tile: A GTile object, the background image of the lane
     # Invariant: _tile is a GTile object
 
     # Attribute _objs: A list of lane obstacles if lane has obstacles
-    # Invariant: _objs a list containing GImage objects or is empty
-
-    # Attribute _speed: The speed (#pixels/sec) obstacles are moving in the lane
-    # Invariat: _speed is set equal to zero if speed is specified in lane
+    # Invariant: _objs a list containing GImage objects (one per simulated obstacle)
 
-    # Attribute _width: The width of a lane in grid squares
-    # Invariant: _width is an int > 0
+    # Attribute _batch: The obstacles drawn together, with one mesh per texture
+    # Invariant: _batch is a GBatch object whose children are _objs
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getTile(self):
@@ -70,80 +74,89 @@ class Lane(object):         # You are permitted to change the parent class if yo
         """
         return self._tile
 
+    def getModel(self):
+        """
+        Returns the simulated lane (a LaneSim object) of this lane.
+        """
+        return self._model
+
 
     # INITIALIZER TO SET LANE POSITION, BACKGROUND,AND OBJECTS
-    def __init__(self,dict,lnnum,hbdict):
+    def __init__(self,model):
         """
         Initializes a Lane object.
 
-        Parameter dict: A JSON dictionary containing information about the level
-        Precondition: dict is a dictionary
-
-        Parameter lnnum: A int representing the lane number, bottom/first = 0
-        Precondition: lnnum is an int >= 0
-
-        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
-        Precondition: hbdict is a dictionary
+        Parameter model: The simulated lane to draw
+        Precondition: model is a LaneSim object
         """
-        listlanes = dict['lanes']
-        self._width = dict['size'][0]
-        lane = dict['lanes'][lnnum]
-        self._tile = GTile(source=listlanes[lnnum]['type']+'.png',\
-        width=self._width*GRID_SIZE,height=GRID_SIZE)
-        self._tile.bottom = lnnum*GRID_SIZE
+        self._model = model
+        width = model.getWidth()
+        self._tile = GTile(source=model.getType()+'.png',\
+        width=width*GRID_SIZE,height=GRID_SIZE)
+        self._tile.bottom = model.getRow()*GRID_SIZE
         self._tile.left = 0
-        self._speed = 0
-
-        if 'objects' in lane:
-            self._objs = []
-            for pos in range(len(lane['objects'])):
-                obst = GImage(source=lane['objects'][pos]['type']+'.png')
-                obst.x = lane['objects'][pos]['position']*GRID_SIZE+GRID_SIZE/2
-                obst.y = lnnum*GRID_SIZE + GRID_SIZE/2
-                hitbox =hbdict['images'][lane['objects'][pos]['type']]['hitbox']
-                obst.hitbox = hitbox
-                if 'speed' in lane:
-                    if lane['speed'] < 0:
-                        obst.angle = 180
-                    self._speed = lane['speed']
-                self._objs.append(obst)
-        else:
-            self._objs = []
+
+        self._objs = []
+        types = model.getTypes()
+        xs = model.getXs()
+        for pos in range(len(types)):
+            obst = GImage(source=types[pos]+'.png')
+            obst.x = xs[pos]
+            obst.y = model.getY()
+            obst.hitbox = model.getHitboxes()[pos]
+            obst.angle = model.getAngle()
+            self._objs.append(obst)
+        self._batch = GBatch(children=self._objs)
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
-    def update(self,dt,buffer):
+    def draw(self, view, xs=None):
         """
-        Updates and animates the obstacles within the lane.
+        Draws the GTile and obstacles within the lane.
 
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float) >= 0
+        The obstacles are moved to the positions in the simulated lane first, unless
+        other positions (such as positions between two simulation steps) are given.
 
-        Parameter buffer: The distance that obstacles can move offscreen
-        Precondition: buffer is a number > 0
+        Parameter view: The view to draw to
+        Precondition: view is a GView obect
+
+        Parameter xs: The x coordinates to draw the obstacles at (or None)
+        Precondition: xs is None or a list of floats, at least one per obstacle
         """
-        dx = self._speed*dt
-        buffer = buffer*GRID_SIZE
+        self._tile.draw(view)
+        self.place(xs)
+        self._batch.draw(view)
 
-        for pos in range(len(self._objs)):
-            self._objs[pos].x += dx
-            x = self._objs[pos].x
+    def retain(self, view):
+        """
+        Adds the obstacles within the lane to the view (see GView.add).
 
-            if self._speed < 0 and x < -buffer:
-                d = -x - buffer
-                self._objs[pos].x = self._width*GRID_SIZE+buffer-d
-            elif self._speed >= 0 and x > self._width*GRID_SIZE+buffer:
-                d = x - (self._width*GRID_SIZE+buffer)
-                self._objs[pos].x = -buffer+d
+        The images stay in the view, so the lane only needs to call place each frame
+        to move the obstacles.  The obstacles are added as one batch (see GBatch).
+        The GTile is not added, as it never moves.  It is up to the level to draw the
+        tile (such as in a GLayer with the other tiles).
 
-    def draw(self, view):
+        Parameter view: The view to add the images to
+        Precondition: view is a GView obect
         """
-        Draws the GTile and obstacles within the lane.
+        view.add(self._batch)
+
+    def place(self, xs=None):
         """
-        self._tile.draw(view)
+        Moves the obstacles to the positions in the simulated lane.
+
+        If other positions (such as positions between two simulation steps) are
+        given, the obstacles are moved there instead.  Obstacles that do not move are
+        left alone.
 
-        if not self._objs is None:
-           for obst in self._objs:
-                obst.draw(view)
+        Parameter xs: The x coordinates to move the obstacles to (or None)
+        Precondition: xs is None or a list of floats, at least one per obstacle
+        """
+        if xs is None and self._model.getSpeed() != 0:
+            xs = self._model.getXs()
+        if not xs is None:
+            for pos in range(len(self._objs)):
+                self._objs[pos].x = xs[pos]
+            self._batch.update()
 
 
 class Grass(Lane):                           # We recommend AGAINST changing this one
@@ -163,91 +176,30 @@ class Road(Lane):                           # We recommend AGAINST changing this
     """
     A class representing a roadway with cars.
 
-    If you implement Lane correctly, you do really need many methods here (not even an
-    initializer) as this class will inherit everything.  However, roads are different
-    than other lanes as they have cars that can kill the frog. Therefore, this class
-    does need a method to tell whether or not the frog is safe.
+    Roads are different than other lanes as they have cars that can kill the frog.
+    That rule is in the RoadSim class in simulation.py; this class only draws.
     """
-    # DEFINE ANY NEW METHODS HERE
-    def collide_car(self,frog):
-        """
-        Returns True if Frog collides with car.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        for objs in self._objs:
-            if frog.getFrog().collides(objs):
-                return True
-        return False
+    pass
 
 
 class Water(Lane):
     """
     A class representing a waterway with logs.
 
-    If you implement Lane correctly, you do really need many methods here (not even an
-    initializer) as this class will inherit everything.  However, water is very different
-    because it is quite hazardous. The frog will die in water unless the (x,y) position
-    of the frog (its center) is contained inside of a log. Therefore, this class needs a
-    method to tell whether or not the frog is safe.
-
-    In addition, the logs move the frog. If the frog is currently in this lane, then the
-    frog moves at the same rate as all of the logs.
+    Water is very different because it is quite hazardous, and the logs move the frog.
+    Those rules are in the WaterSim class in simulation.py; this class only draws.
     """
-    # DEFINE ANY NEW METHODS HERE
-    def on_log(self, frog):
-        """
-        Returns True if a log in the lane contains the frog.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        for obst in self._objs:
-            if obst.contains((frog.getX(),frog.getY())):
-                return True
-        return False
-
-    def move_frog_log(self,frog,dt):
-        """
-        Moves the frog along with the log.
-
-        Method moves the frog the same distance (dx) that the log moves.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float) >= 0
-        """
-        dx = self._speed*dt
-        frog.setX(frog.getX() + dx)
+    pass
 
 
 class Hedge(Lane):
     """
     A class representing the exit hedge.
 
-    This class is a subclass of lane because it does want to use a lot of the features
-    of that class. But there is a lot more going on with this class, and so it needs
-    several more methods.  First of all, hedges are the win condition. They contain exit
-    objects (which the frog is trying to reach). When a frog reaches the exit, it needs
-    to be replaced by the blue frog image and that exit is now "taken", never to be used
-    again.
-
-    That means this class needs methods to determine whether or not an exit is taken.
-    It also need to take the (x,y) position of the frog and use that to determine which
-    exit (if any) the frog has reached. Finally, it needs a method to determine if there
-    are any available exits at all; once they are taken the game is over.
-
-    These exit methods will require several additional attributes. That means this class
-    (unlike Road and Water) will need an initializer. Remember to user super() to combine
-    it with the initializer for the Lane.
+    Hedges are the win condition.  They contain exit objects (which the frog is trying
+    to reach), and once an exit is used it is "taken".  Those rules are in the HedgeSim
+    class in simulation.py; this class only draws.
     """
-    # LIST ALL HIDDEN ATTRIBUTES HERE
-    # Attribute _usedexits: A list GImage exit objects that have been used.
-    # Invariant: _usedexits is a list of GImage object
-
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getObjs(self):
         """
@@ -255,121 +207,4 @@ class Hedge(Lane):
         """
         return self._objs
 
-    # INITIALIZER TO SET ADDITIONAL EXIT INFORMATION
-    def __init__(self,dict,lnnum,hbdict):
-        """
-        Initializes a Hedge object, sublass of Lane.
-
-        Parameter dict: A JSON dictionary containing information about the level
-        Precondition: dict is a dictionary
-
-        Parameter lnnum: A int representing the lane number, bottom/first = 0
-        Precondition: lnnum is an int >= 0
-
-        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
-        Precondition: hbdict is a dictionary
-        """
-        self._usedexits = []
-        super().__init__(dict,lnnum,hbdict)
-
-    # ANY ADDITIONAL METHODS
-    def collide_hedge(self,frog):
-        """
-        Returns True if Frog collides with Hedge.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        if frog.getFrog().collides(self._tile):
-            return True
-
-        return False
-
-    def is_open_hedge(self,frog):
-        """
-        Returns True if frog is an exit or opening in the Hedge lane.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        cood = (frog.getX(),frog.getY())
-
-        for obst in self._objs:
-            if obst.contains(cood):
-                return True
-        return False
-
-    def type_hedge_obst(self,frog):
-        """
-        Returns the type of obstacle which contains the frog.
-
-        Method returns the type as a string. If no obstacle contains the
-        coordinates provided, the method returns an empty string.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        cood = (frog.getX(),frog.getY())
-        for obst in self._objs:
-            if obst.contains((frog.getX(),frog.getY())):
-                return obst.source[:-4]
-        return ''
-
-    def allow_in_exit(self,frog):
-        """
-        Returns True if the Frog can move into the exit within the Hedge.
-
-        Method will return False when the exit is already occupied.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        for obst in self._objs:
-            if obst.contains((frog.getX(),frog.getY())) and\
-            not obst in self._usedexits:
-                return True
-        return False
-
-    def add_used_exit(self,frog):
-        """
-        Adds used exit to the list _usedexits.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        cood = (frog.getX(),frog.getY())
-
-        for exit in self._objs:
-            if exit.contains(cood):
-                self._usedexits.append(exit)
-
-    def which_exit(self,frog):
-        """
-        Returns the exit which contains the frog.
-
-        If no exit contains the frog, method returns None.
-
-        Parameter frog: A Frog object representing the frog in the game
-        Precondition: frog is a Frog object
-        """
-        cood = (frog.getX(),frog.getY())
-        for exit in self._objs:
-            if exit.contains(cood):
-                return exit
-
-        return None
-
-    def exits_filled(self):
-        """
-        Returns True if all exits in Hedge lane are filled.
-        """
-        result = False
-        for exit in self._objs:
-            if exit in self._usedexits:
-                result = True
-            else:
-                return False
-
-        return result
-
 # IF YOU NEED ADDITIONAL LANE CLASSES, THEY GO HERE
@@ -19,6 +19,7 @@ from game2d import *
 from consts import *
 from lanes  import *
 from models import *
+from simulation import *
 
 # PRIMARY RULE: Level can only access attributes in models.py or lanes.py using getters
 # and setters. Level is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -49,9 +50,16 @@ class Level(object):
     resize to match.  That resizing is done in the Froggit app, and so it needs to access
     these values in the level.  The height value should include one extra grid square
     to suppose the number of lives meter.
+
+    The game rules are in the LevelSim class (in simulation.py), which runs without
+    Kivy.  This class is a view of that simulation: it turns the input into an action
+    for the simulation, plays the sounds, and draws the lanes, frog and lives.
     """
 
     # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _model: The simulation with the rules and state of the level
+    # Invariant: _model is a LevelSim object
+
     # Attribute _height: The height of the level by number of grid squares
     # Invariant: _height is an int > 0
 
@@ -59,41 +67,23 @@ class Level(object):
     # Invariant: _width is an int > 0
 
     # Attribute _lanes: A list of the lanes in a level extracted fron JSON dict
-    # Invariant: _lanes is a list containing Lane objects
+    # Invariant: _lanes is a list containing Lane objects, one per simulated lane
 
-    # Attribute _currlane: The current lane where the frog is located
-    # Invariant: _currlane is a Lane object
+    # Attribute _background: The lane tiles, drawn once into an offscreen texture
+    # Invariant: _background is a GLayer object whose children are the lane tiles
 
     # Attribute _frog: A Frog object representing the frog in the game
-    # Invariant: _frog is a Frog object or None
+    # Invariant: _frog is a Frog object or None (if the simulated frog is None)
 
-    # Attribute _lives: A list record of lives left in the game
-    # Invariant: _lives is a list of GImage objects
+    # Attribute _lives: A list record of all lives in the game
+    # Invariant: _lives is a list of GImage objects (only the first few are drawn)
 
     # Attribute _livlabel: A label indicating the frog head images are lives
     # Invariant: _livlabel is a GLabel object
 
-    # Attribute _buffer: The distance that obstacles can move offscreen
-    # Invariant: _buffer is a number > 0
-
-    # Attribute _state: The current state of the game
-    # Invariant: _state is an 0 <= int <= 5
-
-    # Attribute _startx: The starting x-coordinate of the frog
-    # Invariant: _starty is a number >= 0 and < width of game in pixels
-
-    # Attribute _starty: The starting y-coordinate of the frog
-    # Invariant: _starty is a number >= 0 and < height of game in pixels
-
     # Attribute _donefrogs: A list of images representing frogs that finished
     # Invariant: _donefrogs is list of GImage objects
 
-    # Attribute _animator: A coroutine for performing an animation
-    # Invariant: _animator is a generator-based coroutine or None
-
-    # Attribute _alive: A bool stating if frog is alive or dying
-    # Invariant: _alive is a bool, False while in dying animation
-
     # Attribute _croakS: The sound for when the frog jumps
     # Invariant: _croakS is Sound object
 
@@ -103,6 +93,18 @@ class Level(object):
     # Attribute _trillS: The sound for when the frog reaches an exit
     # Invariant: _trillS is Sound object
 
+    # Attribute _hbdict: The JSON dictionary with hitbox sizes for obstacles
+    # Invariant: _hbdict is a dictionary
+
+    # Attribute _last: The simulated frog and its position (x,y) before the last update
+    # Invariant: _last is a tuple (FrogSim,x,y), or None if there was no frog
+
+    # Attribute _view: The view that holds the lanes, lives and finished frogs
+    # Invariant: _view is a GView object, or None if the level was never drawn
+
+    # Attribute _shown: The number of lives images in _view
+    # Invariant: _shown is an int in 0..len(_lives)
+
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getWidth(self):
         """
@@ -120,7 +122,7 @@ class Level(object):
         """
         Returns the current state of the game-level.
         """
-        return self._state
+        return self._model.getState()
 
     def getDonefrogs(self):
         """
@@ -128,11 +130,11 @@ class Level(object):
         """
         return self._donefrogs
 
-    def getDonefrogs(self):
+    def getModel(self):
         """
-        Returns the list (_donefrogs) of images representing frogs that finished.
+        Returns the simulation (a LevelSim object) of this level.
         """
-        return self._donefrogs
+        return self._model
 
     # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
     def __init__(self,dict,hbdict):
@@ -145,20 +147,19 @@ class Level(object):
         Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
         Precondition: hbdict is a dictionary
         """
-        self._width = dict['size'][0]
-        self._height = dict['size'][1]+1
-        self._state = STATE_ACTIVE
+        self._model = LevelSim(dict,hbdict)
+        self._hbdict = hbdict
+        self._width = self._model.getWidth()
+        self._height = self._model.getHeight()
 
-        self._init_lanes(dict,hbdict)
+        self._init_lanes()
         self._init_lives()
 
-        self._startx = dict['start'][0]*GRID_SIZE+GRID_SIZE/2
-        self._starty = dict['start'][1]*GRID_SIZE+GRID_SIZE/2
-        self._frog = Frog(self._startx,self._starty,hbdict)
-        self._buffer = dict['offscreen']
+        self._frog = Frog(self._model.getFrog(),hbdict)
         self._donefrogs = []
-        self._animator = None
-        self._alive = True
+        self._last = None
+        self._view = None
+        self._shown = 0
 
         self._croakS = Sound(source=CROAK_SOUND)
         self._splatS = Sound(source=SPLAT_SOUND)
@@ -176,106 +177,204 @@ class Level(object):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float) >= 0
         """
-        if self._alive:
-            self._special_cases(dt)
-
-        if not self._animator is None:
-            try:
-                self._animator.send(dt)
-            except:
-                self._animator = None
-                if not self._alive:
-                    self._frog_died()
-        elif not self._frog is None:
-            if input.is_key_down('right'):
-                self._to_right()
-            elif input.is_key_down('left'):
-                self._to_left()
-            elif input.is_key_down('up'):
-                self._to_up()
-            elif input.is_key_down('down'):
-                self._to_down()
+        action = None
+        if input.is_key_down('right'):
+            action = 'right'
+        elif input.is_key_down('left'):
+            action = 'left'
+        elif input.is_key_down('up'):
+            action = 'up'
+        elif input.is_key_down('down'):
+            action = 'down'
+
+        frog = self._model.getFrog()
+        self._last = None if frog is None else (frog,frog.getX(),frog.getY())
+        self._model.update(action,dt)
+
+        for event in self._model.getEvents():
+            if event == EVENT_JUMP:
+                self._croakS.play()
+            elif event == EVENT_DEATH:
+                self._splatS.play()
+            elif event == EVENT_EXIT:
+                self._trillS.play()
+
+        if self._model.getFrog() is None:
+            self._frog = None
 
-        for lane in self._lanes:
-            lane.update(dt,self._buffer)
+        self._sync_done()
 
     # DRAW METHOD TO DRAW THE FROG AND THE INDIVIDUAL LANES
-    def draw(self,view):
+    def draw(self,view,alpha=1.0):
         """
         Draws the all the aspects of the level, including the frog, lanes,
         lives and finished frogs, to the view.
 
+        If alpha is less than 1, the frog and the obstacles are drawn part of the
+        way between where they were before the last update and where they are now.
+        This smooths the animation when the game updates at a fixed rate.
+
+        Everything but the frog is added to the view the first time (see GView.add),
+        so after that this method only moves the obstacles and draws the frog.
+
         Parameter view: The view to draw to
         Precondition: view is a GView obect
+
+        Parameter alpha: The fraction of the way from the last update to this one
+        Precondition: alpha is a number with 0 <= alpha <= 1
         """
-        for lane in self._lanes:
-            lane.draw(view)
+        if not self._view is view:
+            self._retain(view)
 
-        for life in self._lives:
-            life.draw(view)
+        positions = None
+        if alpha < 1:
+            positions = self._model.getEngine().blend(alpha).tolist()
 
-        self._livlabel.draw(view)
+        for lane in self._lanes:
+            if positions is None:
+                lane.place()
+            else:
+                lane.place(positions[lane.getModel().getRow()])
+
+        lives = min(self._model.getLives(),len(self._lives))
+        while self._shown > lives:
+            self._shown -= 1
+            view.remove(self._lives[self._shown])
+        while self._shown < lives:
+            view.add(self._lives[self._shown])
+            self._shown += 1
 
         if not self._frog is None:
-            self._frog.draw(view)
-
-        if len(self._donefrogs) > 0:
-            for frog in self._donefrogs:
-                frog.draw(view)
+            self._frog.draw(view,self._blend_frog(alpha))
 
     # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
     def exits_full(self):
         """
         Returns True if all exits in the level are full.
         """
-        result = False
+        return self._model.exits_full()
 
-        for lane in self._lanes:
-            if lane.getTile().source == 'hedge.png':
-                result = lane.exits_filled()
+    def snapshot(self):
+        """
+        Returns the state of the level as a Snapshot (see LevelSim.snapshot).
+
+        The snapshot is a small immutable tuple, so it is cheap to keep many of them
+        (for example, one for every node of a search tree).
+        """
+        return self._model.snapshot()
+
+    def restore(self,snap):
+        """
+        Puts the level back in the state of a snapshot.
+
+        Parameter snap: The state of the level
+        Precondition: snap is a Snapshot from a level with the same JSON
+        """
+        self._model.restore(snap)
+        self._last = None
 
-        return result
+        frog = self._model.getFrog()
+        if frog is None:
+            self._frog = None
+        elif self._frog is None or not self._frog.getModel() is frog:
+            self._frog = Frog(frog,self._hbdict)
+        self._sync_done()
 
     def start_over(self,dict):
         """
         Generates a new frog and positions it in the starting position.
 
-        Uses the attributes startx and starty to return the frog back
-        to the intial starting position provided by the level JSON. Also
-        resets _alive attribute to True.
+        The simulation puts the frog back at the intial starting position
+        provided by the level JSON.
 
         Parameter dict: A JSON dictionary with hitbox sizes for obstacles
         Precondition: dict is a dictionary
         """
-        self._frog = Frog(self._startx,self._starty,dict)
-        self._alive = True
-        self._state = STATE_ACTIVE
+        self._model.start_over()
+        self._frog = Frog(self._model.getFrog(),dict)
 
-    def _init_lanes(self,dict,hbdict):
+    def _sync_done(self):
         """
-        Helper method to __init__ to initate _lanes attribute.
+        Makes the images of finished frogs match the finished frogs of the simulation.
+        """
+        done = self._model.getDone()
+        if not self._view is None:
+            for frog in self._donefrogs[len(done):]:
+                self._view.remove(frog)
+        del self._donefrogs[len(done):]
+        for pos in range(len(done)):
+            (x,y) = done[pos]
+            if pos == len(self._donefrogs):
+                self._donefrogs.append(GImage(source=FROG_SAFE,x=x,y=y))
+                if not self._view is None:
+                    self._view.add(self._donefrogs[pos])
+            elif self._donefrogs[pos].x != x or self._donefrogs[pos].y != y:
+                self._donefrogs[pos].x = x
+                self._donefrogs[pos].y = y
 
-        Parameter dict: A JSON dictionary containing information about the level
-        Precondition: dict is a dictionary
+    def _retain(self,view):
+        """
+        Adds the lanes, lives and finished frogs to the view (see GView.add).
 
-        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
-        Precondition: hbdict is a dictionary
+        The lane tiles never move, so they are added as one background layer (see
+        GLayer) rather than one tile at a time.
+
+        If they were in another view before, they are removed from it first.
+
+        Parameter view: The view to add the images to
+        Precondition: view is a GView obect
+        """
+        if not self._view is None:
+            self._view.remove_all()
+
+        self._view = view
+        view.add(self._background)
+        for lane in self._lanes:
+            lane.retain(view)
+
+        self._shown = min(self._model.getLives(),len(self._lives))
+        for life in self._lives[:self._shown]:
+            view.add(life)
+        view.add(self._livlabel)
+        for frog in self._donefrogs:
+            view.add(frog)
+
+    def _blend_frog(self,alpha):
+        """
+        Returns the position (x,y) to draw the frog at, or None for its current one.
+
+        Parameter alpha: The fraction of the way from the last update to this one
+        Precondition: alpha is a number with 0 <= alpha <= 1
+        """
+        frog = self._model.getFrog()
+        if alpha >= 1 or self._last is None or not self._last[0] is frog:
+            return None
+
+        (oldx,oldy) = self._last[1:]
+        return (oldx+(frog.getX()-oldx)*alpha,oldy+(frog.getY()-oldy)*alpha)
+
+    def _init_lanes(self):
+        """
+        Helper method to __init__ to initate _lanes attribute.
         """
         self._lanes = []
-        lstlanes = dict['lanes']
-
-        for pos in range(len(lstlanes)):
-            if lstlanes[pos]['type'] == 'grass':
-                lane = Grass(dict,pos,hbdict)
-            elif lstlanes[pos]['type'] == 'road':
-                lane = Road(dict,pos,hbdict)
-            elif lstlanes[pos]['type'] == 'water':
-                lane = Water(dict,pos,hbdict)
-            elif lstlanes[pos]['type'] == 'hedge':
-                lane = Hedge(dict,pos,hbdict)
+
+        for model in self._model.getLanes():
+            if model.getType() == 'grass':
+                lane = Grass(model)
+            elif model.getType() == 'road':
+                lane = Road(model)
+            elif model.getType() == 'water':
+                lane = Water(model)
+            elif model.getType() == 'hedge':
+                lane = Hedge(model)
 
             self._lanes.append(lane)
 
+        self._background = GLayer(children=[lane.getTile() for lane in self._lanes],
+                                  left=0,bottom=0,width=self._width*GRID_SIZE,
+                                  height=len(self._lanes)*GRID_SIZE)
+
     def _init_lives(self):
         """
         Helper method to __init__ to initate _lives and _livlabel attributes.
@@ -293,163 +392,3 @@ class Level(object):
         self._livlabel.font_name = ALLOY_FONT
         self._livlabel.font_size = ALLOY_SMALL
         self._livlabel.linecolor = 'dark green'
-
-    def _special_cases(self,dt):
-        """
-        Method checks for special cases when frog moves, including if frog
-        collides and dies, safely exits, or drowns.
-
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float) >= 0
-        """
-        lane = self._lanes[round((self._frog.getY()-GRID_SIZE/2)/GRID_SIZE)]
-        if isinstance(lane, Road) and lane.collide_car(self._frog):
-            self._initiate_death()
-        elif isinstance(lane, Water) and not lane.on_log(self._frog) and \
-        self._animator is None:
-            self._initiate_death()
-        elif isinstance(lane, Water) and lane.on_log(self._frog):
-            if self._animator is None:
-                lane.move_frog_log(self._frog,dt)
-            if self._frog.getX()< 0 or self._frog.getX()> self._width*GRID_SIZE:
-                self._initiate_death()
-        elif isinstance(lane,Hedge):
-            if lane.collide_hedge(self._frog):
-                if lane.type_hedge_obst(self._frog) == 'exit':
-                    if lane.allow_in_exit(self._frog):
-                        self._frog_to_exit()
-
-    def _to_right(self):
-        """
-        Initiates a right moving animation of the Frog if Frog can move into
-        new x position. Frog does not move out of level grid and into hedges.
-        """
-        self._croakS.play()
-        oldx = self._frog.getX()
-        newx = self._frog.getX()+GRID_SIZE
-        y = self._frog.getY()
-        self._frog.getFrog().angle = FROG_EAST
-
-        if newx < self._width*GRID_SIZE:
-            self._animator = self._frog.animate_horizontal('right')
-            next(self._animator)
-            lane = self._lanes[round((self._frog.getY()-GRID_SIZE/2)/GRID_SIZE)]
-            if isinstance(lane,Hedge):
-                self._animator = None
-
-    def _to_left(self):
-        """
-        Initiates a left moving animation of the Frog if Frog can move into
-        new x position. Frog does not move out of level grid and into hedges.
-        """
-        self._croakS.play()
-        oldx = self._frog.getX()
-        newx = self._frog.getX()-GRID_SIZE
-        y = self._frog.getY()
-        self._frog.getFrog().angle = FROG_WEST
-
-        if newx > 0:
-            self._animator = self._frog.animate_horizontal('left')
-            next(self._animator)
-            lane = self._lanes[round((self._frog.getY()-GRID_SIZE/2)/GRID_SIZE)]
-            if isinstance(lane,Hedge):
-                self._animator = None
-
-    def _to_up(self):
-        """
-        Initiates an upward moving animation of the Frog if Frog can move into
-        new y position. Frog does not move out of level grid, into hedges or
-        used exits.
-        """
-        self._croakS.play()
-        oldy = self._frog.getY()
-        newy = self._frog.getY()+GRID_SIZE
-        x = self._frog.getX()
-        self._frog.getFrog().angle = FROG_NORTH
-
-        if newy < (self._height-1)*GRID_SIZE:
-            self._animator = self._frog.animate_vertical('up')
-            next(self._animator)
-            lane = self._lanes[round((newy-GRID_SIZE/2)/GRID_SIZE)]
-            if isinstance(lane,Hedge):
-                self._frog.setY(newy)
-                if lane.collide_hedge(self._frog):
-                    if lane.type_hedge_obst(self._frog) == 'exit':
-                        if not lane.allow_in_exit(self._frog):
-                            self._frog.setY(oldy)
-                            self._animator = None
-                        elif lane.allow_in_exit(self._frog):
-                            self._frog.setY(oldy)
-                    elif not lane.is_open_hedge(self._frog):
-                        self._frog.setY(oldy)
-                        self._animator = None
-                    elif lane.is_open_hedge(self._frog):
-                        self._frog.setY(oldy)
-
-    def _to_down(self):
-        """
-        Initiates a downward moving animation of the Frog if Frog can move into
-        new y position. Frog does not move out of level grid, into hedges,
-        used exits, or open exits from above.
-        """
-        self._croakS.play()
-        oldy = self._frog.getY()
-        newy = self._frog.getY()-GRID_SIZE
-        x = self._frog.getX()
-        self._frog.getFrog().angle = FROG_SOUTH
-
-        if newy > 0:
-            self._animator = self._frog.animate_vertical('down')
-            next(self._animator)
-            lane = self._lanes[round((newy-GRID_SIZE/2)/GRID_SIZE)]
-            if isinstance(lane,Hedge):
-                self._frog.setY(newy)
-                if lane.collide_hedge(self._frog):
-                    if not lane.is_open_hedge(self._frog) or \
-                        lane.type_hedge_obst(self._frog) == 'exit':
-                            self._frog.setY(oldy)
-                            self._animator = None
-                    elif lane.is_open_hedge(self._frog):
-                        self._frog.setY(oldy)
-
-    def _initiate_death(self):
-        """
-        Changes the attribute _alive to False and initiates death animation
-        coroutine.
-        """
-        self._alive = False
-        self._splatS.play()
-        self._animator = self._frog.animate_death()
-        next(self._animator)
-
-    def _frog_died(self):
-        """
-        Alters _state, _animator, _frog and _lives attributes once frog dies
-        and adjusts according to how many lives are left.
-        """
-        self._animator = None
-        if len(self._lives) > 1:
-            self._state = STATE_PAUSED
-            self._frog = None
-            self._lives = self._lives[:-1]
-        else:
-            self._state = STATE_COMPLETE
-            self._frog = None
-            self._lives = self._lives[:-1]
-
-    def _frog_to_exit(self):
-        """
-        Creates finished frog image over exit and adjusts state based on how
-        many open exits are left. Adds the used exit to _donefrogs attribute.
-        """
-        self._trillS.play()
-        lane = self._lanes[round((self._frog.getY()-GRID_SIZE/2)/GRID_SIZE)]
-        exit = lane.which_exit(self._frog)
-        image = GImage(source=FROG_SAFE,x=exit.x,y=exit.y)
-        lane.add_used_exit(self._frog)
-        self._donefrogs.append(image)
-        self._frog = None
-        if self.exits_full():
-            self._state = STATE_COMPLETE
-        else:
-            self._state = STATE_PAUSED
@@ -43,14 +43,15 @@ class Frog(GSprite):         # You will need to change this by Task 3
     When you reach Task 3, you will discover that Frog needs to be a composite object,
     tracking both the frog animation and the death animation.  That will like caused
     major modifications to this class.
+
+    The frog is a view of a FrogSim object (from simulation.py).  The simulation moves
+    and animates the frog.  This class only has the two sprites, and copies the
+    position, heading and animation frame of the simulated frog when it draws.
     """
 
     # LIST ALL HIDDEN ATTRIBUTES HERE
-    # Attribute _x: the x coordinate of the composite frog object
-    # Invariant: _x is a number >= 0
-
-    # Attribute _y: the y coordinate of the composite frog object
-    # Invariant: _y is a number >= 0
+    # Attribute _model: the simulated frog that this object draws
+    # Invariant: _model is a FrogSim object
 
     # Attribute _frog: A sprite which illustrates the frog
     # Invariant: _frog is a GSprite object
@@ -71,50 +72,19 @@ class Frog(GSprite):         # You will need to change this by Task 3
         """
         return self._death
 
-    def getY(self):
-        """
-        Returns the y coordinate of the composite frog object.
-        """
-        return self._y
-
-    def getX(self):
-        """
-        Returns the x coordinate of the composite frog object.
-        """
-        return self._x
-
-    def setX(self,value):
-        """
-        Sets x coordinate of composite object equal to value.
-
-        Parameter value: The new x coordinate.
-        Precondition: value is a number >= 0
+    def getModel(self):
         """
-        self._x = value
-        self._frog.x = value
-        self._death.x = value
-
-    def setY(self,value):
+        Returns the simulated frog (a FrogSim object) of this frog.
         """
-        Sets y coordinate of composite object equal to value.
-
-        Parameter value: The new y coordinate.
-        Precondition: value is a number >= 0
-        """
-        self._y = value
-        self._frog.y = value
-        self._death.y = value
+        return self._model
 
     # INITIALIZER TO SET FROG POSITION
-    def __init__(self,x,y,dict):
+    def __init__(self,model,dict):
         """
         Initializes Frog object.
 
-        Parameter x: The starting x coordinate value of the frog
-        Precondition: x is a number
-
-        Parameter y: The starting y coordinate value of the frog
-        Precondition: y is a number
+        Parameter model: The simulated frog to draw
+        Precondition: model is a FrogSim object
 
         Parameter dict: A JSON dictionary with hitbox sizes for obstacles
         Precondition: dict is a dictionary
@@ -124,144 +94,46 @@ class Frog(GSprite):         # You will need to change this by Task 3
         hitboxes = dict['sprites']['frog']['hitboxes']
         deathformat = dict['sprites']['skulls']['format']
         deathsize = (deathformat[0],deathformat[1])
+        x = model.getX()
+        y = model.getY()
 
-        self._frog = GSprite(x=x,y=y,source=FROG_SPRITE+'.png',angle=FROG_NORTH,\
+        self._frog = GSprite(x=x,y=y,source=FROG_SPRITE+'.png',angle=model.getAngle(),\
             format=frogsize,frame=0,hitboxes=hitboxes)
 
         self._death = GSprite(x=x,y=y,source=DEATH_SPRITE+'.png',\
             format=deathsize,frame=0)
 
-        self._x = x
-        self._y = y
+        self._model = model
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
-    def draw(self,view):
+    def draw(self,view,pos=None):
         """
-        Draws the frog object (_frog and _death when appropriate).
+        Draws the frog object (_frog, or _death when the frog is dying).
+
+        The frog is drawn at the position of the simulated frog, unless another
+        position (such as a position between two simulation steps) is given.
 
         Parameter view: the view to draw to
         Precondition: view is a GView obect
-        """
-        if not self._frog is None:
-            self._frog.draw(view)
-
-        else:
-            self._death.draw(view)
-
-    def animate_vertical(self,direction):
-        """
-        Animates the frog up or down over FROG_SPEED seconds.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-
-        Parameter direction: The direction to move
-        Precondition: direction is a string, either 'up' or 'down'
-        """
-        start = self._y
-        if direction == 'up':
-            end = start + GRID_SIZE
-        elif direction == 'down':
-            end = start - GRID_SIZE
 
-        step = GRID_SIZE/FROG_SPEED
-        time = 0
-        split = FROG_SPEED/8
-        counttime = 0
-        frame = [0,1,2,3,4,3,2,1,0]
-        count = 0
-
-        while time <= FROG_SPEED:
-            dt = (yield)
-            if direction == 'up':
-                self.setY(self._y + step*dt)
-            elif direction == 'down':
-                self.setY(self._y - step*dt)
-
-            time += dt
-            counttime += dt
-            if counttime >= split:
-                count += 1
-                counttime = 0
-                self._frog.frame = frame[count]
-
-            if direction == 'up' and self._y > end:
-                self.setY(end)
-            elif direction == 'down' and self._y < end:
-                self.setY(end)
-
-        self._frog.frame = 0
-
-    def animate_horizontal(self,direction):
-        """
-        Animates the frog left or right over FROG_SPEED seconds.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-
-        Parameter direction: The direction to move
-        Precondition: direction is a string, either 'left' or 'right'
+        Parameter pos: The position (x,y) to draw the frog at (or None)
+        Precondition: pos is None or a pair of numbers
         """
-        start = self._x
-        if direction == 'right':
-            end = start + GRID_SIZE
-        elif direction == 'left':
-            end = start - GRID_SIZE
-
-        step = GRID_SIZE/FROG_SPEED
-        time = 0
-        split = FROG_SPEED/8
-        counttime = 0
-        frame = [0,1,2,3,4,3,2,1,0]
-        count = 0
-
-        while time < FROG_SPEED:
-            dt = (yield)
-            if direction == 'right':
-                self.setX(self._x + step*dt)
-            elif direction == 'left':
-                self.setX(self._x - step*dt)
-            if abs(self._x-start) > GRID_SIZE:
-                self.setX(end)
-
-            time += dt
-            counttime += dt
-
-            if counttime >= split:
-                count += 1
-                counttime = 0
-                self._frog.frame = frame[count]
-
-        if abs(self._x-start) > GRID_SIZE:
-            self.setX(end)
-
-        self._frog.frame = 0
-
-    def animate_death(self):
-        """
-        Animates the frogs death over DEATH_SPEED seconds.
-
-        Sets the _frog attribute to None.
-
-        Parameter dt: The time since the last animation frame.
-        Precondition: dt is a float.
-        """
-        self._frog = None
-        split = DEATH_SPEED/7
-        counttime = 0
-        count = 0
-        time = 0
-
-        while time <= DEATH_SPEED:
-            dt = (yield)
-            time += dt
-
-            counttime += dt
-            if counttime >= split:
-                count += 1
-                counttime = 0
-                self._death.frame = count
-
-        self._death.frame = 0
+        model = self._model
+        if not model.isDying():
+            sprite = self._frog
+            frame = model.getFrame()
+            if sprite.angle != model.getAngle():
+                sprite.angle = model.getAngle()
+        else:
+            sprite = self._death
+            frame = model.getDeathFrame()
+
+        (x,y) = (model.getX(),model.getY()) if pos is None else pos
+        sprite.x = x
+        sprite.y = y
+        if sprite.frame != frame:
+            sprite.frame = frame
+        sprite.draw(view)
 
 # IF YOU NEED ADDITIONAL LANE CLASSES, THEY GO HERE
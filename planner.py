@@ -0,0 +1,1313 @@
+"""
+Path planner module for Froggit
+
+This module contains the class Planner, which finds the fastest safe way for the frog
+to reach each exit of a level.  It searches over the places the frog can be at every
+frame (its column, its lane and the time), with the rules of LevelSim (in
+simulation.py): cars hit the frog during a hop as well as at rest, the frog rides a
+log whenever it sits on one, and a hop lasts FROG_SPEED seconds.  As the lanes move
+with a fixed period, the obstacle positions for a frame are computed directly from the
+time (see LaneEngine.getXAt), and they are computed once for all searches of a level.
+
+The search does not look at one frog at a time.  All of the frogs that could be in a
+lane at a frame are kept as the bits of an int, so a collision test for a whole lane
+is a few bit operations.  Frogs in the center of a column use one bit per column, and
+the columns hit by cars (at rest, and at every step of every hop) are computed with
+NumPy for many frames at once.  Frogs that ride logs leave the center of the columns,
+so they use one bit per point of a lattice that is fine enough to hold every position
+a log can carry them to (1/6 of a pixel for the levels in the JSON folder at 60 frames
+per second).  Riding a log is then a shift of these bits.
+
+A plan is a list of actions, one per frame, that can be given to LevelSim.update (or
+turned into key presses).  To find the plans for a level::
+
+    planner = Planner(load_json('complete.json'),load_json('objects.json'))
+    plans = planner.plan()         # The fastest plan to each exit
+    game = planner.solve()         # Plans that fill every exit, one after the other
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+from simulation import *
+import collections
+import fractions
+import gc
+import math
+import numpy as np
+
+# PRIMARY RULE: This module can only access consts.py, engine.py and simulation.py.
+# It must never import game2d (or anything from Kivy).
+
+
+# The longest time (in seconds) that a search looks ahead
+PLAN_HORIZON = 120
+
+# The number of frames of obstacle positions computed at a time
+_BLOCK = 256
+
+# The largest number of lattice points per pixel
+_MAX_LATTICE = 64
+
+# The distance (in pixels) that plans keep from the edge of every obstacle
+_EPSILON = 1e-6
+
+# The frog headings for each hop direction
+_HEADINGS = {'up': FROG_NORTH, 'down': FROG_SOUTH, 'right': FROG_EAST, 'left': FROG_WEST}
+
+# A plan to reach an exit (see Planner.plan)
+Plan = collections.namedtuple('Plan','exit start end actions')
+
+# A hop that can start in a lane.  It has the direction, the lane where it starts
+# ('source') and ends ('target'), the shift of the frog in columns ('shift') and in
+# lattice points ('offset'), the columns and lattice points where it may start
+# ('columns' and 'points'), the car tests (step,shape) in the starting lane ('before')
+# and in the target lane ('after'), the first step in the target lane ('switch'), the
+# key (lane,heading) of the frogs at rest where it ends ('landing'), and the hedge
+# obstacle types it may enter (or None if the target is not a hedge)
+_Hop = collections.namedtuple('_Hop','direction source target shift offset columns points '+
+                                     'before after switch landing enter')
+
+
+class Planner(object):
+    """
+    A class finding the fastest safe paths through a level.
+
+    A search starts with a frog at rest at a given frame (frame 0 is the start of the
+    level), and visits every frame in order.  At each frame, a frog at rest can wait
+    or start a hop, and the frog is checked for collisions at every frame, exactly as
+    LevelSim.update does it.  So a plan played with the same time step (dt) reaches
+    its exit in the frame that the planner expects.  The planner computes the obstacle
+    positions from the time, while LevelSim adds up the movement of each frame, so the
+    two can disagree by rounding error.  That is why plans keep _EPSILON away from the
+    edge of every obstacle.
+
+    The hedges must not move, and the level can be at most 62 columns wide.
+
+    The result of each search is kept, so asking again for the same start (for
+    example, for a hint) costs nothing.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _level: The simulation of the level (for its lanes and engine)
+    # Invariant: _level is a LevelSim object
+
+    # Attribute _dt: The time in seconds of each frame
+    # Invariant: _dt is a number > 0
+
+    # Attribute _limit: The number of frames that a search looks ahead
+    # Invariant: _limit is an int > 0
+
+    # Attribute _lanes: The lanes of the level, bottom lane first
+    # Invariant: _lanes is a list of LaneSim objects
+
+    # Attribute _kinds: The type of each lane ('grass','road','water' or 'hedge')
+    # Invariant: _kinds is a list of strings, one per lane
+
+    # Attribute _hedge: The last (top-most) hedge of the level
+    # Invariant: _hedge is a HedgeSim object or None
+
+    # Attribute _width: The number of columns in the level
+    # Invariant: _width is an int with 0 < _width < 63
+
+    # Attribute _lattice: The number of lattice points per pixel
+    # Invariant: _lattice is an int > 0
+
+    # Attribute _full: The bits of every lattice point strictly inside the level
+    # Invariant: _full is an int > 0
+
+    # Attribute _drifts: The number of lattice points the logs of each lane move per frame
+    # Invariant: _drifts is a list of ints, one per lane (0 if not water)
+
+    # Attribute _size: The size (width,height) of a frame of the frog sprite
+    # Invariant: _size is a pair of numbers > 0
+
+    # Attribute _hitboxes: The hitbox for each frame of the frog sprite
+    # Invariant: _hitboxes is a tuple of 4-element tuples of numbers
+
+    # Attribute _hopframes: The number of frames from the start of a hop to the next action
+    # Invariant: _hopframes is an int > 0
+
+    # Attribute _hops: The hops that can start in each lane
+    # Invariant: _hops is a list of lists of _Hop objects, one list per lane
+
+    # Attribute _shapes: The frog bounding boxes tested against cars, by key
+    # Invariant: _shapes is a dictionary of tuples (lane,(left,right),rows)
+
+    # Attribute _rests: The key in _shapes of a frog at rest on a road, by (lane,heading)
+    # Invariant: _rests is a dictionary of keys of _shapes
+
+    # Attribute _keys: The keys of the car tables, in the order they are computed
+    # Invariant: _keys is a list of (lane,heading) and (direction,lane,part) tuples
+
+    # Attribute _batch: The car tests of every key, as arrays (lanes,firsts,lasts,drifts,offsets)
+    # Invariant: _batch is a tuple of arrays with one entry per key (see _init_tests)
+
+    # Attribute _blocks: The left and right obstacle edges for each block of frames
+    # Invariant: _blocks is a list of pairs (lefts,rights) of arrays (frames,lanes,obstacles)
+
+    # Attribute _tables: The columns hit by cars at each frame computed so far
+    # Invariant: _tables is a dictionary of lists of ints, one per frame computed so far
+
+    # Attribute _spans: The cars that wrap around for each block of frames computed so far
+    # Invariant: _spans is a dictionary of lists of bool arrays (frames,obstacles)
+
+    # Attribute _logs: The lattice points on a log at each frame computed so far
+    # Invariant: _logs is a dictionary of lists of spans, one per frame computed so far
+
+    # Attribute _masks: The masks (and hops) that never change, by key
+    # Invariant: _masks is a dictionary of ints (or lists of hops, see _moves)
+
+    # Attribute _plans: The results of each search, keyed by its start
+    # Invariant: _plans is a dictionary of dictionaries of Plan objects
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getLevel(self):
+        """
+        Returns the simulation (a LevelSim object) used by the planner.
+        """
+        return self._level
+
+    def getDt(self):
+        """
+        Returns the time in seconds of each frame.
+        """
+        return self._dt
+
+    def getLattice(self):
+        """
+        Returns the number of lattice points per pixel for frogs that ride logs.
+        """
+        return self._lattice
+
+    def getHopFrames(self):
+        """
+        Returns the number of frames from the start of a hop to the next action.
+        """
+        return self._hopframes
+
+    def getExits(self):
+        """
+        Returns the list of exit positions (obstacle indices) in the last hedge.
+
+        The list is empty if the level has no hedge.
+        """
+        if self._hedge is None:
+            return []
+        types = self._hedge.getTypes()
+        return [pos for pos in range(len(types)) if types[pos] == 'exit']
+
+    # INITIALIZER
+    def __init__(self,dict,hbdict,dt=1/60,horizon=PLAN_HORIZON):
+        """
+        Initializes a planner for the given level.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+
+        Parameter dt: The time in seconds of each frame
+        Precondition: dt is a number > 0
+
+        Parameter horizon: The longest time (in seconds) that a search looks ahead
+        Precondition: horizon is a number > 0
+        """
+        assert type(dt) in [int,float] and dt > 0, repr(dt)+' is not a valid time step'
+        assert type(horizon) in [int,float] and horizon > 0, repr(horizon)+' is not a valid horizon'
+        self._level = LevelSim(dict,hbdict)
+        self._dt = dt
+        self._limit = int(horizon/dt)
+        self._lanes = self._level.getLanes()
+        self._kinds = [lane.getType() for lane in self._lanes]
+        self._width = self._level.getWidth()
+        assert self._width < 63, 'the level is too wide to plan'
+
+        self._hedge = None
+        for lane in self._lanes:
+            if isinstance(lane,HedgeSim):
+                assert lane.getSpeed() == 0, 'the planner needs hedges that do not move'
+                self._hedge = lane
+
+        frogformat = hbdict['sprites']['frog']['format']
+        size = image_size(FROG_SPRITE+'.png')
+        self._size = (size[0]/frogformat[1],size[1]/frogformat[0])
+        self._hitboxes = tuple(map(tuple,hbdict['sprites']['frog']['hitboxes']))
+
+        self._shapes = {}
+        self._rests = {}
+        self._keys = []
+        self._blocks = []
+        self._tables = {}
+        self._spans = {}
+        self._logs = {}
+        self._masks = {}
+        self._plans = {}
+        self._init_lattice()
+        self._init_hops()
+        self._init_tests()
+
+    def _init_lattice(self):
+        """
+        Helper method to __init__ to choose the lattice for frogs that ride logs.
+
+        The lattice has n points per pixel, for the smallest n such that every log
+        moves a whole number of points each frame.  If n would be more than
+        _MAX_LATTICE, the movement of the logs is rounded to the lattice.
+        """
+        denominator = 1
+        for lane in self._lanes:
+            if lane.getType() == 'water':
+                drift = fractions.Fraction(lane.getSpeed()*self._dt)
+                drift = drift.limit_denominator(_MAX_LATTICE).denominator
+                denominator = denominator*drift//math.gcd(denominator,drift)
+        self._lattice = min(denominator,_MAX_LATTICE)
+        self._full = (1 << (self._width*GRID_SIZE*self._lattice))-2
+        self._drifts = [round(lane.getSpeed()*self._dt*self._lattice)
+                        if lane.getType() == 'water' else 0 for lane in self._lanes]
+
+    def _init_hops(self):
+        """
+        Helper method to __init__ to describe every hop that can start in each lane.
+
+        The hops follow the rules of LevelSim._to_up (and the other moves): the frog
+        may not leave the level, hop sideways in a hedge, or hop into a hedge wall.
+        The hedge rules depend on the used exits, so they are checked in the search.
+
+        A frog never needs to hop down from grass if there is no water below it.  It
+        can only get back to the grass by hopping, and it could have hopped along the
+        grass (where it is safe) to the same place in less time.
+        """
+        self._hopframes = len(self._path('up',0,GRID_SIZE/2))+1
+        columns = (1 << self._width)-1
+        span = GRID_SIZE*self._lattice
+        top = self._width*span
+        moves = {'up': (1,0,columns,self._full),
+                 'down': (-1,0,columns,self._full),
+                 'right': (0,1,columns >> 1,(1 << (top-span))-1),
+                 'left': (0,-1,columns & ~1,self._full & ~((1 << (span+1))-1))}
+
+        for row in range(len(self._lanes)):
+            if self._kinds[row] == 'road':
+                for angle in _HEADINGS.values():
+                    y = row*GRID_SIZE+GRID_SIZE/2
+                    self._rests[(row,angle)] = self._shape(row,0,y,angle,0)
+
+        self._hops = []
+        for row in range(len(self._lanes)):
+            hops = []
+            for direction in ['up','left','right','down']:
+                (rise,shift,allowed,points) = moves[direction]
+                target = row+rise
+                if target < 0 or target >= len(self._lanes):
+                    continue
+                elif shift != 0 and self._kinds[row] == 'hedge':
+                    continue
+                elif direction == 'down' and self._kinds[row] == 'grass':
+                    if not 'water' in self._kinds[:row]:
+                        continue
+
+                enter = None
+                if self._kinds[target] == 'hedge':
+                    enter = ('open',) if direction == 'down' else ('open','exit')
+                landing = (target,self._heading(target,_HEADINGS[direction]))
+                (before,after,switch) = self._init_steps(direction,row,target)
+                hops.append(_Hop(direction,row,target,shift,shift*span,allowed,points,
+                                 before,after,switch,landing,enter))
+            self._hops.append(hops)
+
+    def _init_tests(self):
+        """
+        Helper method to __init__ to collect the car tests into arrays.
+
+        A car moves at a constant speed until it wraps around.  So the place where
+        it hits a frog over all of the steps of a hop (or at rest) is the place where
+        it hits the frog at the first step, moved by a fixed offset.  The offsets for
+        each car are computed here, once for every frog at rest and every part of a
+        hop.  A car that never meets the frog has infinite offsets.
+
+        A frog at rest is tested at step 0, the frame where it rests.  A frog that
+        starts a hop is tested from the frame after the hop starts (see _init_steps),
+        so the steps of a hop are one more than in the tests of the hop.
+        """
+        tests = {}
+        for (key,shape) in self._rests.items():
+            if self._heading(*key) == key[1]:
+                tests[key] = (0,((0,shape),))
+        for hops in self._hops:
+            for hop in hops:
+                if len(hop.before) > 0:
+                    tests[(hop.direction,hop.source,'before')] = (1,hop.before)
+                if len(hop.after) > 0:
+                    tests[(hop.direction,hop.source,'after')] = (1,hop.after)
+
+        columns = self._level.getEngine().getX().shape[1]
+        (lanes,firsts,lasts,drifts,offsets) = ([],[],[],[],[])
+        for (key,(delay,steps)) in tests.items():
+            lane = self._shapes[steps[0][1]][0]
+            speed = self._lanes[lane].getSpeed()*self._dt
+            first = steps[0][0]
+            low = np.full(columns,np.inf)
+            high = np.full(columns,-np.inf)
+            for (step,shape) in steps:
+                (lane,(l,r),rows) = self._shapes[shape]
+                rows = np.append(rows,np.zeros(columns-len(rows),bool))
+                low = np.where(rows,np.minimum(low,speed*(step-first)-r),low)
+                high = np.where(rows,np.maximum(high,speed*(step-first)-l),high)
+            self._keys.append(key)
+            self._tables[key] = []
+            self._spans[key] = []
+            lanes.append(lane)
+            firsts.append(delay+first)
+            lasts.append(delay+steps[-1][0])
+            drifts.append(speed*(steps[-1][0]-first))
+            offsets.append((low,high))
+        self._batch = (np.array(lanes,int),np.array(firsts,int),np.array(lasts,int),
+                       np.array(drifts,float).reshape(-1,1,1),np.array(offsets,float))
+
+    def _init_steps(self,direction,row,target):
+        """
+        Returns the triple (before,after,switch) of car tests for a hop.
+
+        The values before and after are tuples of pairs (step,key), where key names a
+        frog bounding box in _shapes, for the steps in the starting lane and in the
+        target lane.  Step 0 is the frame after the hop starts, when the frog has not
+        moved yet.  Only road lanes have car tests.  The value switch is the first step
+        with the frog in the target lane.
+
+        Parameter direction: The direction of the hop
+        Precondition: direction is 'up', 'down', 'left' or 'right'
+
+        Parameter row: The lane where the hop starts
+        Precondition: row is a valid lane number
+
+        Parameter target: The lane where the hop ends
+        Precondition: target is a valid lane number
+        """
+        y = row*GRID_SIZE+GRID_SIZE/2
+        steps = [(0,y,0)]+self._path(direction,0,y)[:-1]
+
+        before = []
+        after = []
+        switch = len(steps)
+        for step in range(len(steps)):
+            (dx,sy,sprite) = steps[step]
+            lane = round((sy-GRID_SIZE/2)/GRID_SIZE)
+            if lane == target and switch == len(steps):
+                switch = step
+            if self._kinds[lane] == 'road':
+                key = self._shape(lane,dx,sy,_HEADINGS[direction],sprite)
+                (after if lane != row else before).append((step,key))
+        return (tuple(before),tuple(after),switch)
+
+    def _path(self,direction,x,y):
+        """
+        Returns the frog positions (x,y,frame) after each animation frame of a hop.
+
+        The positions are computed with the animation code of FrogSim, so that they
+        are the same numbers that LevelSim produces.
+
+        Parameter direction: The direction of the hop
+        Precondition: direction is 'up', 'down', 'left' or 'right'
+
+        Parameter x: The x coordinate where the hop starts
+        Precondition: x is a number
+
+        Parameter y: The y coordinate where the hop starts
+        Precondition: y is a number
+        """
+        frog = self._level.getFrog()
+        state = frog.snapshot()
+        frog.restore((x,y,_HEADINGS[direction],0,False,0,None,0,0,0,0,0))
+        if direction == 'up' or direction == 'down':
+            frog.animate_vertical(direction)
+        else:
+            frog.animate_horizontal(direction)
+
+        steps = []
+        running = True
+        while running:
+            running = frog.animate(self._dt)
+            steps.append((frog.getX(),frog.getY(),frog.getFrame()))
+        frog.restore(state)
+        return steps
+
+    def _shape(self,lane,x,y,angle,sprite):
+        """
+        Returns the key of a frog bounding box to test against the cars of a lane.
+
+        A shape has the offsets (left,right) of the frog edges from the x coordinate
+        where the frog started its hop, and whether the box meets each car vertically
+        (as in the function collides).  Boxes with the same values share a key.
+
+        Parameter lane: The road lane
+        Precondition: lane is a valid lane number
+
+        Parameter x: The distance the frog has moved sideways in the hop
+        Precondition: x is a number
+
+        Parameter y: The y coordinate of the frog
+        Precondition: y is a number
+
+        Parameter angle: The heading of the frog
+        Precondition: angle is one of the FROG_ headings
+
+        Parameter sprite: The frame of the frog sprite
+        Precondition: sprite is a valid frame number
+        """
+        (l,t,r,b) = bbox(x,y,self._size[0],self._size[1],angle,self._hitboxes[sprite])
+        engine = self._level.getEngine()
+        (tops,bottoms) = (engine.getEdges()[3][lane],engine.getEdges()[4][lane])
+        rows = tuple(bool(b <= bottoms[pos] <= t or bottoms[pos] <= b <= tops[pos])
+                     for pos in range(engine.getCounts()[lane]))
+
+        key = (lane,l,r,rows)
+        if not key in self._shapes:
+            self._shapes[key] = (lane,(l,r),np.array(rows,bool))
+        return key
+
+    # ADDITIONAL METHODS
+    def plan(self,frame=0,used=0,frog=None):
+        """
+        Returns a dictionary with the fastest plan to each exit that can be reached.
+
+        The keys are the exit positions (obstacle indices in the last hedge), and the
+        values are Plan objects.  A plan has the exit position ('exit'), the frame of
+        its first action ('start'), the frame in which the frog reaches the exit
+        ('end') and the actions ('actions').  The actions are a tuple with an action
+        (None, 'up', 'down', 'left' or 'right') for every frame from start to end.
+        Exits that cannot be reached within the horizon are left out.
+
+        All of the exits are found by one search, which stops as soon as every open
+        exit is reached.  The result is remembered, so calling this method again with
+        the same arguments returns the same dictionary.
+
+        Parameter frame: The frame at which the frog starts (0 is the start of the level)
+        Precondition: frame is an int >= 0
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0 (see HedgeSim.getUsedMask)
+
+        Parameter frog: The position and heading (x,y,angle) of a frog at rest
+        Precondition: frog is a triple of numbers, or None for the starting position
+        """
+        assert type(frame) == int and frame >= 0, repr(frame)+' is not a valid frame'
+        assert type(used) == int and used >= 0, repr(used)+' is not a valid mask'
+        if frog is None:
+            start = self._level.getFrog()
+            frog = (start.getX(),start.getY(),FROG_NORTH)
+
+        key = (frame,used,tuple(frog))
+        if not key in self._plans:
+            # The search makes many small tuples and no reference cycles
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                self._plans[key] = self._search(frame,used,frog)
+            finally:
+                if enabled:
+                    gc.enable()
+        return self._plans[key]
+
+    def solve(self,frame=0):
+        """
+        Returns a list of plans that fill every exit, or None if there is none.
+
+        The plans are played one after the other, with a new frog starting in the
+        frame after the last frog reached its exit (as LevelEnv does it).  Each frog
+        goes to the exit it can reach first, so the plans may not give the fastest
+        way to fill every exit.  As in LevelSim, only the last hedge counts.
+
+        Parameter frame: The frame at which the first frog starts
+        Precondition: frame is an int >= 0
+        """
+        if self._hedge is None:
+            return None
+
+        types = self._hedge.getTypes()
+        full = (1 << len(types))-1
+        used = 0
+        for pos in range(len(types)):
+            if types[pos] != 'exit':
+                used |= 1 << pos
+
+        result = []
+        while used != full:
+            plans = self.plan(frame,used)
+            if len(plans) == 0:
+                return None
+            best = min(plans.values(),key=lambda plan: (plan.end,plan.exit))
+            result.append(best)
+            used |= 1 << best.exit
+            frame = best.end+1
+        return result
+
+    def time(self,plans):
+        """
+        Returns the time in seconds from the start of the first plan to the end of the last.
+
+        Parameter plans: The plans played one after the other
+        Precondition: plans is a non-empty list of Plan objects
+        """
+        return (plans[-1].end-plans[0].start+1)*self._dt
+
+    # HELPERS
+    def _search(self,frame,used,frog):
+        """
+        Returns the fastest plan to each exit, searching forward from the given start.
+
+        The search keeps the frogs at rest in each lane (and with each heading, on
+        roads) as a pair (columns,points) of bit masks, one pair per frame.  At each
+        frame, it removes the frogs that die at rest, moves the frogs on logs, and
+        tries every hop for all of the frogs that are left.  Frogs that survive a hop
+        are at rest in the target lane a hop later.  The frogs at rest after every
+        frame are kept, so that the moves to an exit can be traced back once it is
+        reached.
+
+        Parameter frame: The frame at which the frog starts
+        Precondition: frame is an int >= 0
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+
+        Parameter frog: The position and heading (x,y,angle) of a frog at rest
+        Precondition: frog is a triple of numbers
+        """
+        if self._hedge is None:
+            return {}
+        types = self._hedge.getTypes()
+        goals = [pos for pos in range(len(types)) if types[pos] == 'exit' and not used >> pos & 1]
+        if len(goals) == 0:
+            return {}
+
+        (x,y,angle) = frog
+        row = round((y-GRID_SIZE/2)/GRID_SIZE)
+        col = (x-GRID_SIZE/2)/GRID_SIZE
+        if self._kinds[row] != 'water' and col == int(col) and 0 <= col < self._width:
+            start = (1 << int(col),0)
+        else:
+            start = (0,1 << round(x*self._lattice))
+
+        waiting = collections.defaultdict(dict)
+        waiting[frame][(row,self._heading(row,angle))] = start
+        history = {}
+        found = {}
+        last = {}
+
+        now = frame
+        while now <= frame+self._limit and len(waiting) > 0:
+            if len(found) == len(goals) and now > max(end for (end,exit) in found.values()):
+                break
+            self._extend(now+self._hopframes)
+            frogs = waiting.pop(now,{})
+            resting = self._rest(frogs,now)
+            later = waiting[now+1]
+            lanes = {}
+            for (key,(cols,points)) in resting.items():
+                for (table,name) in ((later,key),(lanes,key[0])):
+                    if name in table:
+                        (c,p) = table[name]
+                        table[name] = (c | cols,p | points)
+                    else:
+                        table[name] = (cols,points)
+            self._hop(lanes,last,now,used,goals,found,waiting)
+            history[now] = resting
+            last = lanes
+            now += 1
+
+        result = {}
+        for (pos,(end,exit)) in found.items():
+            result[pos] = Plan(pos,frame,end,self._actions(history,used,frame,end,exit))
+        return result
+
+    def _rest(self,frogs,now):
+        """
+        Returns the frogs at rest that survive a frame, moved by the logs they are on.
+
+        The result is keyed by (lane,heading) like frogs, with the positions at the
+        start of the next frame.
+
+        Parameter frogs: The frogs at rest, keyed by (lane,heading)
+        Precondition: frogs is a dictionary of pairs (columns,points) of bit masks
+
+        Parameter now: The frame number
+        Precondition: now is an int >= 0
+        """
+        result = {}
+        for (key,(cols,points)) in frogs.items():
+            row = key[0]
+            kind = self._kinds[row]
+            if kind == 'road':
+                cols &= ~self._tables[key][now]
+                if points:
+                    points &= ~self._hit_points(key,now)
+            elif kind == 'water':
+                points &= self._mask(self._logs[row][now])
+                points = self._move(points,self._drifts[row])
+            if cols or points:
+                result[key] = (cols,points)
+        return result
+
+    def _moves(self,used):
+        """
+        Returns the hops that can start in each lane, with their masks for a search.
+
+        Each hop is a tuple (hop,columns,points,before,after,target,shift,offset,safe,
+        water,exits,still), where target, shift and offset are copied from the hop.
+        The masks columns and points have the frogs that may start the hop (see
+        _init_hops), less the ones that would hop into a hedge wall (or a used exit).
+        The values before and after are the pairs (key,table) of the car tests for the
+        hop, where table is the list in _tables for key (or None if it has no car
+        tests).  The lists grow as more frames are computed, so they stay current for
+        the whole search.  The value safe is True if the frog is safe at rest where
+        the hop ends (in grass or a hedge), water is True if it ends in water, and
+        exits is True if it is a hop up into a hedge.  The value still is True if the
+        hop starts and ends in lanes where the frog is safe, so that it always ends
+        the same way.
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+        """
+        key = ('moves',used)
+        if key in self._masks:
+            return self._masks[key]
+
+        result = []
+        for hops in self._hops:
+            moves = []
+            for hop in hops:
+                (cols,points) = (hop.columns,hop.points)
+                if not hop.enter is None:
+                    mask = used if self._lanes[hop.target] is self._hedge else 0
+                    cols &= self._inside_columns(hop.target,0,hop.enter,mask)
+                    points &= self._inside_points(hop.target,0,hop.enter,mask)
+                (before,after) = (None,None)
+                if len(hop.before) > 0:
+                    before = (hop.direction,hop.source,'before')
+                    before = (before,self._tables[before])
+                if len(hop.after) > 0:
+                    after = (hop.direction,hop.source,'after')
+                    after = (after,self._tables[after])
+                kind = self._kinds[hop.target]
+                safe = kind in ['grass','hedge']
+                exits = hop.direction == 'up' and kind == 'hedge'
+                still = safe and self._kinds[hop.source] in ['grass','hedge']
+                moves.append((hop,cols,points,before,after,hop.target,hop.shift,hop.offset,
+                              safe,kind == 'water',exits,still))
+            result.append(moves)
+        self._masks[key] = result
+        return result
+
+    def _hop(self,lanes,last,now,used,goals,found,waiting):
+        """
+        Tries every hop for the frogs at rest, and adds the frogs that make it to waiting.
+
+        The frogs that start a hop and land safely are added to the frogs at rest a hop
+        later (in waiting).  They are not kept for each hop, as _arrival can try the
+        hop again for the one frog that it traces back.  Frogs that reach an exit of
+        the last hedge are recorded in found (for the exits in goals).
+
+        A frog at rest on grass (or in a hedge opening) is safe there forever.  So a
+        hop to a place on grass where a frog is already at rest is not tried, as that
+        frog got there first.  For the same reason, a hop from grass to grass is only
+        tried by the frogs that were not at rest there in the frame before.
+
+        Parameter lanes: The frogs at rest after this frame, keyed by lane
+        Precondition: lanes is a dictionary of pairs (columns,points) of bit masks
+
+        Parameter last: The frogs at rest after the frame before, keyed by lane
+        Precondition: last is a dictionary of pairs (columns,points) of bit masks
+
+        Parameter now: The frame number
+        Precondition: now is an int >= 0
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+
+        Parameter goals: The exits to look for
+        Precondition: goals is a list of ints
+
+        Parameter found: The exits reached so far, with the frame and hop
+        Precondition: found is a dictionary of pairs (frame,exit) (see _exits)
+
+        Parameter waiting: The frogs at rest for the frames ahead
+        Precondition: waiting is a dictionary of dictionaries, keyed by frame
+        """
+        moves = self._moves(used)
+        land = waiting[now+self._hopframes]
+        full = self._full
+        for (row,(cols,points)) in lanes.items():
+            (oc,op) = last.get(row,(0,0))
+            for (hop,cmask,pmask,before,after,target,shift,offset,safe,water,exits,still) in moves[row]:
+                c = cols & cmask
+                p = points if pmask is full else points & pmask
+                if still:
+                    c &= ~oc
+                    if p and op:
+                        p &= ~op
+                if safe and target in lanes:
+                    (tc,tp) = lanes[target]
+                    c &= ~(tc >> shift if shift >= 0 else tc << -shift)
+                    if p and tp:
+                        p &= ~(tp >> offset if offset >= 0 else tp << -offset)
+                if not (c or p):
+                    continue
+
+                if not before is None:
+                    c &= ~before[1][now]
+                    if p:
+                        p &= ~self._hit_points(before[0],now)
+                if exits:
+                    (c,p) = self._exits(hop,now,c,p,used,goals,found)
+                if not after is None:
+                    c &= ~after[1][now]
+                    if p:
+                        p &= ~self._hit_points(after[0],now)
+                if not (c or p):
+                    continue
+
+                c = c << shift if shift >= 0 else c >> -shift
+                if p:
+                    p = p << offset if offset >= 0 else p >> -offset
+                if water and c:
+                    (c,p) = (0,p | self._to_points(c))
+                if hop.landing in land:
+                    (lc,lp) = land[hop.landing]
+                    land[hop.landing] = (lc | c,lp | p)
+                else:
+                    land[hop.landing] = (c,p)
+
+    def _survives(self,move,now,used,cols,points):
+        """
+        Returns True if a frog at rest makes a hop, as tried by _hop.
+
+        Parameter move: The hop with its masks and tests
+        Precondition: move is a tuple from _moves(used)
+
+        Parameter now: The frame where the hop starts
+        Precondition: now is an int >= 0
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+
+        Parameter cols: The frog in the center of a column (or 0)
+        Precondition: cols is an int bit mask
+
+        Parameter points: The frog on the lattice (or 0)
+        Precondition: points is an int bit mask
+        """
+        (hop,cmask,pmask,before,after,target,shift,offset,safe,water,exits,still) = move
+        (c,p) = (cols & cmask,points & pmask)
+        if not before is None:
+            c &= ~before[1][now]
+            if p:
+                p &= ~self._hit_points(before[0],now)
+        if exits:
+            (c,p) = self._exits(hop,now,c,p,used,[],{})
+        if not after is None:
+            c &= ~after[1][now]
+            if p:
+                p &= ~self._hit_points(after[0],now)
+        return bool(c or p)
+
+    def _exits(self,hop,now,cols,points,used,goals,found):
+        """
+        Removes the frogs that hop into an exit, and returns the pair (columns,points) left.
+
+        The frog is in an exit when its center is inside an unused exit at the first
+        step of the hop in the hedge.  Exits of the last hedge are recorded in found,
+        as the pair (frame,exit), where exit is the tuple (frame,hop,columns,points) of
+        one frog that starts the hop.  Frogs that reach an exit of a lower hedge leave
+        the board, and are not recorded.
+
+        Parameter hop: The hop up into a hedge
+        Precondition: hop is a _Hop object
+
+        Parameter now: The frame where the hop starts
+        Precondition: now is an int >= 0
+
+        Parameter cols: The frogs in the center of a column that start the hop
+        Precondition: cols is an int bit mask
+
+        Parameter points: The frogs on the lattice that start the hop
+        Precondition: points is an int bit mask
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+
+        Parameter goals: The exits to look for
+        Precondition: goals is a list of ints
+
+        Parameter found: The exits reached so far, with the frame and hop
+        Precondition: found is a dictionary of pairs (frame,exit)
+        """
+        lane = self._lanes[hop.target]
+        last = lane is self._hedge
+        frame = now+1+hop.switch
+        types = lane.getTypes()
+        for pos in range(len(types)):
+            if types[pos] != 'exit' or (last and used >> pos & 1):
+                continue
+            c = cols & self._inside_columns(hop.target,frame,('exit',),~(1 << pos))
+            p = points & self._inside_points(hop.target,frame,('exit',),~(1 << pos))
+            if (c or p) and last and pos in goals:
+                if not pos in found or found[pos][0] > frame:
+                    found[pos] = (frame,(now,hop,c & -c,0 if c else p & -p))
+            cols &= ~c
+            points &= ~p
+        return (cols,points)
+
+    def _heading(self,row,angle):
+        """
+        Returns the heading to record for a frog at rest in a lane.
+
+        The heading only matters on roads (where it changes the bounding box of a frog
+        at rest), so it is None in the other lanes.  Headings with the same bounding
+        box (such as up and down) are recorded as the first of them in _HEADINGS.
+
+        Parameter row: The lane number
+        Precondition: row is a valid lane number
+
+        Parameter angle: The heading of the frog
+        Precondition: angle is one of the FROG_ headings
+        """
+        if self._kinds[row] != 'road':
+            return None
+        for other in _HEADINGS.values():
+            if self._rests[(row,other)] == self._rests[(row,angle)]:
+                return other
+
+    def _move(self,mask,shift):
+        """
+        Returns the bit mask moved by shift bits (to the right of the level if positive).
+
+        Parameter mask: The bit mask
+        Precondition: mask is an int >= 0
+
+        Parameter shift: The number of bits to move
+        Precondition: shift is an int
+        """
+        return mask << shift if shift >= 0 else mask >> -shift
+
+    def _to_points(self,cols):
+        """
+        Returns the lattice points of the centers of the columns in a bit mask.
+
+        Parameter cols: The columns
+        Precondition: cols is an int bit mask
+        """
+        key = ('centers',cols)
+        if key in self._masks:
+            return self._masks[key]
+
+        points = 0
+        for col in range(self._width):
+            if cols >> col & 1:
+                points |= 1 << ((col*GRID_SIZE+GRID_SIZE//2)*self._lattice)
+        self._masks[key] = points
+        return points
+
+    def _to_column(self,points):
+        """
+        Returns the column whose center is the lattice point in points (or 0 if none).
+
+        Parameter points: A single lattice point
+        Precondition: points is an int bit mask with one bit set
+        """
+        x = (points.bit_length()-1)/self._lattice
+        col = (x-GRID_SIZE/2)/GRID_SIZE
+        if col == int(col) and 0 <= col < self._width:
+            return 1 << int(col)
+        return 0
+
+    def _extend(self,frame):
+        """
+        Computes the obstacle edges and car tables up to (at least) the given frame.
+
+        The edges are computed with the engine for _BLOCK frames at a time.  For every
+        road lane, the tables have the columns and lattice points where a frog at rest
+        is hit (for each heading) and where a frog starting each hop is hit.  For
+        every water lane, they have the lattice points on a log.
+
+        Parameter frame: The last frame needed
+        Precondition: frame is an int >= 0
+        """
+        while len(self._blocks)*_BLOCK <= frame:
+            first = len(self._blocks)*_BLOCK
+            engine = self._level.getEngine()
+            (lefts,rights,halves,tops,bottoms) = engine.getEdges()
+            times = np.arange(first,first+_BLOCK+self._hopframes)*self._dt
+            xs = engine.getXAt(times[:,None,None])
+            left = xs+lefts-halves
+            right = xs-rights+halves
+            self._blocks.append((left,right))
+            if len(self._keys) > 0:
+                self._add_tests(left,right)
+            for row in range(len(self._lanes)):
+                if self._kinds[row] == 'water':
+                    self._logs.setdefault(row,[]).extend(self._supports(left,right,row))
+
+    def _add_tests(self,left,right):
+        """
+        Adds the columns and lattice points hit by cars, for each frame of a block.
+
+        A frog is hit if its box and a car overlap (as in the function collides), or
+        are less than _EPSILON apart.  The columns hit at each frame are added to
+        _tables as a bit mask.  The cars that wrap around are added to _spans, as a
+        bool array for the block.  Only a frog that left the center of the columns (on
+        a log) needs the lattice points, so these are found from _blocks when they are
+        needed (see _hit_points).  The tests of every key are done at once, in the
+        order of _keys.
+
+        A car hits the frog from the first step to the last, where the two points are
+        found with the offsets from _init_tests.  If a car wraps around during a hop,
+        this is done twice: once from where the car starts, and once from where it
+        ends.  This is a little safer than the game (the frog stays away from both),
+        but a car only wraps once it is offscreen.  Cars that never meet the frog (with
+        infinite offsets) are never counted as wrapping.
+
+        Parameter left: The left edges of the obstacles (frames,lanes,obstacles)
+        Precondition: left is a float array
+
+        Parameter right: The right edges of the obstacles (frames,lanes,obstacles)
+        Precondition: right is a float array
+        """
+        (lanes,firsts,lasts,drifts,offsets) = self._batch
+        # The arrays are large, so they are reused in place where possible
+        windows = np.lib.stride_tricks.sliding_window_view(left,_BLOCK,axis=0)
+        lows = windows[firsts,lanes].transpose(0,2,1)
+        moved = windows[lasts,lanes].transpose(0,2,1)
+        moved -= lows
+        moved -= drifts
+        wrapped = (np.abs(moved,out=moved) > GRID_SIZE) & np.isfinite(offsets[:,None,0])
+        lows += offsets[:,None,0]-_EPSILON
+        windows = np.lib.stride_tricks.sliding_window_view(right,_BLOCK,axis=0)
+        highs = windows[firsts,lanes].transpose(0,2,1)
+        highs += offsets[:,None,1]+_EPSILON
+
+        bits = np.bitwise_or.reduce(self._columns(lows,highs),axis=2)
+        if wrapped.any():
+            (key,frame,car) = np.nonzero(wrapped)
+            (low,high) = (offsets[key,0,car]-drifts[key,0,0],offsets[key,1,car]-drifts[key,0,0])
+            low = left[lasts[key]+frame,lanes[key],car]+low-_EPSILON
+            high = right[lasts[key]+frame,lanes[key],car]+high+_EPSILON
+            np.bitwise_or.at(bits,(key,frame),self._columns(low,high))
+
+        for (pos,table) in enumerate(bits.tolist()):
+            key = self._keys[pos]
+            self._tables[key].extend(table)
+            self._spans[key].append(wrapped[pos])
+
+    def _columns(self,lows,highs):
+        """
+        Returns the bit masks of the columns whose center is between low and high.
+
+        Parameter lows: The left ends in pixels
+        Precondition: lows is a float array
+
+        Parameter highs: The right ends in pixels (with the same shape as lows)
+        Precondition: highs is a float array
+        """
+        first = lows/GRID_SIZE
+        first = np.ceil(np.subtract(first,0.5,out=first),out=first)
+        last = highs/GRID_SIZE
+        last = np.floor(np.add(last,0.5,out=last),out=last)
+        # fmin and fmax skip a nan (no car), which leaves the mask empty
+        first = np.fmax(np.fmin(first,self._width,out=first),0,out=first).astype(np.int64)
+        last = np.fmin(np.fmax(last,0,out=last),self._width,out=last).astype(np.int64)
+        # The mask (1 << last)-(1 << first) is negative if empty (last < first)
+        np.left_shift(1,last,out=last)
+        last -= np.left_shift(1,first,out=first)
+        return np.maximum(last,0,out=last)
+
+    def _supports(self,left,right,row):
+        """
+        Returns the lattice points on a log in a water lane, for each frame of a block.
+
+        The result has one entry per frame, which is a list [first,last,...] with the
+        first and last lattice point of each log (see _mask).  Points closer than
+        _EPSILON to the end of a log are left out, as are the points that the log
+        carries out of the level (off _full) in the frame.
+
+        Parameter left: The left edges of the obstacles (frames,lanes,obstacles)
+        Precondition: left is a float array
+
+        Parameter right: The right edges of the obstacles (frames,lanes,obstacles)
+        Precondition: right is a float array
+
+        Parameter row: The water lane
+        Precondition: row is a valid lane number
+        """
+        count = self._level.getEngine().getCounts()[row]
+        (tops,bottoms) = self._level.getEngine().getEdges()[3:]
+        y = self._lanes[row].getY()
+        rows = (bottoms[row,:count] <= y) & (y <= tops[row,:count])
+        size = self._width*GRID_SIZE*self._lattice
+        (low,high) = (max(1-self._drifts[row],0),min(size-1-self._drifts[row],size))
+        first = np.clip(np.ceil((left[:_BLOCK,row,:count]+_EPSILON)*self._lattice),low,high+1)
+        last = np.clip(np.floor((right[:_BLOCK,row,:count]-_EPSILON)*self._lattice),low-1,high)
+        last = np.where(rows,last,-1)
+        return np.stack([first,last],axis=2).astype(np.int64).reshape(_BLOCK,2*count).tolist()
+
+    def _mask(self,spans):
+        """
+        Returns the bit mask of the lattice points in a list of spans.
+
+        Parameter spans: The spans, as a list [first,last,...] of the first and last
+        lattice point of each span (inclusive, and empty if last < first)
+        Precondition: spans is a list of ints with an even length
+        """
+        mask = 0
+        for pos in range(0,len(spans),2):
+            if spans[pos] <= spans[pos+1]:
+                mask |= (1 << (spans[pos+1]+1))-(1 << spans[pos])
+        return mask
+
+    def _hit_points(self,key,now):
+        """
+        Returns the lattice points where a frog is hit by a car, at rest or in a hop.
+
+        Parameter key: The key of the tests in _spans, which is (lane,heading) for a
+        frog at rest, and (direction,lane,part) for a hop
+        Precondition: key is a key of _spans
+
+        Parameter now: The frame where the frog is at rest or starts the hop
+        Precondition: now is an int >= 0
+        """
+        (lanes,firsts,lasts,drifts,offsets) = self._batch
+        pos = self._keys.index(key)
+        (left,right) = self._blocks[now//_BLOCK]
+        lows = left[firsts[pos]+now % _BLOCK,lanes[pos]]+(offsets[pos,0]-_EPSILON)
+        highs = right[firsts[pos]+now % _BLOCK,lanes[pos]]+(offsets[pos,1]+_EPSILON)
+        mask = 0
+        for (low,high) in zip(lows.tolist(),highs.tolist()):
+            if low <= high:
+                mask |= self._span(low,high)
+        wrapped = self._spans[key][now//_BLOCK]
+        if wrapped[now % _BLOCK].any():
+            frame = lasts[pos]+now % _BLOCK
+            for car in np.nonzero(wrapped[now % _BLOCK])[0]:
+                low = left[frame,lanes[pos],car]+offsets[pos,0,car]-drifts[pos,0,0]
+                high = right[frame,lanes[pos],car]+offsets[pos,1,car]-drifts[pos,0,0]
+                mask |= self._span(low-_EPSILON,high+_EPSILON)
+        return mask
+
+    def _inside_columns(self,row,frame,kinds,used=0):
+        """
+        Returns the columns whose center is inside an obstacle of the given kinds.
+
+        Parameter row: The lane number
+        Precondition: row is a valid lane number
+
+        Parameter frame: The frame number
+        Precondition: frame is an int >= 0
+
+        Parameter kinds: The obstacle types to look for (such as 'exit')
+        Precondition: kinds is a tuple of strings
+
+        Parameter used: The obstacles to leave out, as a bit mask
+        Precondition: used is an int
+        """
+        key = ('columns',row,kinds,used)
+        if key in self._masks:
+            return self._masks[key]
+
+        centers = [col*GRID_SIZE+GRID_SIZE/2 for col in range(self._width)]
+        mask = 0
+        for (left,right) in self._inside(row,frame,kinds,used):
+            for col in range(self._width):
+                if left+_EPSILON <= centers[col] <= right-_EPSILON:
+                    mask |= 1 << col
+        if self._lanes[row].getSpeed() == 0:
+            self._masks[key] = mask
+        return mask
+
+    def _inside_points(self,row,frame,kinds,used=0):
+        """
+        Returns the lattice points inside an obstacle of the given kinds.
+
+        Parameter row: The lane number
+        Precondition: row is a valid lane number
+
+        Parameter frame: The frame number
+        Precondition: frame is an int >= 0
+
+        Parameter kinds: The obstacle types to look for (such as 'exit')
+        Precondition: kinds is a tuple of strings
+
+        Parameter used: The obstacles to leave out, as a bit mask
+        Precondition: used is an int
+        """
+        key = ('points',row,kinds,used)
+        if key in self._masks:
+            return self._masks[key]
+
+        mask = 0
+        for (left,right) in self._inside(row,frame,kinds,used):
+            mask |= self._span(left+_EPSILON,right-_EPSILON)
+        if self._lanes[row].getSpeed() == 0:
+            self._masks[key] = mask
+        return mask
+
+    def _inside(self,row,frame,kinds,used):
+        """
+        Returns the list of (left,right) edges of the obstacles of the given kinds.
+
+        Only obstacles whose bottom and top edges contain the lane center are listed,
+        as the frog center is always the lane center when these are tested.
+
+        Parameter row: The lane number
+        Precondition: row is a valid lane number
+
+        Parameter frame: The frame number
+        Precondition: frame is an int >= 0
+
+        Parameter kinds: The obstacle types to look for
+        Precondition: kinds is a tuple of strings
+
+        Parameter used: The obstacles to leave out, as a bit mask
+        Precondition: used is an int
+        """
+        lane = self._lanes[row]
+        (lefts,rights) = self._blocks[frame//_BLOCK]
+        (tops,bottoms) = self._level.getEngine().getEdges()[3:]
+        types = lane.getTypes()
+        result = []
+        for pos in range(len(types)):
+            if not types[pos] in kinds or used >> pos & 1:
+                continue
+            elif bottoms[row,pos] <= lane.getY() <= tops[row,pos]:
+                result.append((lefts[frame % _BLOCK,row,pos],rights[frame % _BLOCK,row,pos]))
+        return result
+
+    def _span(self,left,right):
+        """
+        Returns the bit mask of the lattice points from left to right (inclusive).
+
+        Only points inside the level are included.
+
+        Parameter left: The left end in pixels
+        Precondition: left is a number
+
+        Parameter right: The right end in pixels
+        Precondition: right is a number
+        """
+        first = max(math.ceil(left*self._lattice),0)
+        last = min(math.floor(right*self._lattice),self._width*GRID_SIZE*self._lattice)
+        return self._mask([first,last])
+
+    def _actions(self,history,used,start,end,exit):
+        """
+        Returns the tuple of actions for each frame from start to end.
+
+        The moves are traced back from the hop into the exit.  A frog at rest in a
+        frame either waited there in the frame before or finished a hop.  The masks
+        in history tell if it waited, and otherwise _arrival finds the hop.
+
+        Parameter history: The frogs at rest after every frame searched
+        Precondition: history is a dictionary keyed by frame, of dictionaries keyed
+        by (lane,heading)
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+
+        Parameter start: The frame where the search started
+        Precondition: start is an int >= 0
+
+        Parameter end: The frame where the frog reaches the exit
+        Precondition: end is an int >= start
+
+        Parameter exit: The hop into the exit, as (frame,hop,columns,points)
+        Precondition: exit is a tuple recorded by _exits
+        """
+        actions = [None]*(end-start+1)
+        (now,hop,cols,points) = exit
+        while True:
+            actions[now-start] = hop.direction
+            (row,angle,cols,points) = self._departure(history[now],hop.source,cols,points)
+            while now > start:
+                (c,p) = history[now-1].get((row,angle),(0,0))
+                if not (cols & c or points & p):
+                    break
+                points = self._move(points,-self._drifts[row])
+                now -= 1
+            if now == start:
+                return tuple(actions)
+            (now,hop,cols,points) = self._arrival(history,used,now,row,angle,cols,points)
+
+    def _departure(self,resting,row,cols,points):
+        """
+        Returns the frog at rest (lane,heading,columns,points) that started a hop.
+
+        The hop starts after the frog has moved with its log, so the frog is moved
+        back to where it was at the start of the frame.
+
+        Parameter resting: The frogs at rest after the frame where the hop starts
+        Precondition: resting is a dictionary keyed by (lane,heading)
+
+        Parameter row: The lane where the hop starts
+        Precondition: row is a valid lane number
+
+        Parameter cols: The single frog in the center of a column (or 0)
+        Precondition: cols is an int bit mask
+
+        Parameter points: The single frog on the lattice (or 0)
+        Precondition: points is an int bit mask
+        """
+        for ((lane,angle),(c,p)) in resting.items():
+            if lane == row and (cols & c or points & p):
+                return (row,angle,cols,self._move(points,-self._drifts[row]))
+        raise RuntimeError('the search lost track of a frog')
+
+    def _arrival(self,history,used,now,row,angle,cols,points):
+        """
+        Returns the hop (frame,hop,columns,points) that put a frog at rest in a lane.
+
+        The hop started from a frog at rest a hop earlier, and that frog made the hop
+        (see _survives).
+
+        Parameter history: The frogs at rest after every frame searched
+        Precondition: history is a dictionary keyed by frame, of dictionaries keyed
+        by (lane,heading)
+
+        Parameter used: The used exits of the last hedge, as a bit mask
+        Precondition: used is an int >= 0
+
+        Parameter now: The frame where the frog is at rest
+        Precondition: now is an int >= 0
+
+        Parameter row: The lane of the frog
+        Precondition: row is a valid lane number
+
+        Parameter angle: The heading recorded for the frog
+        Precondition: angle is one of the FROG_ headings or None
+
+        Parameter cols: The single frog in the center of a column (or 0)
+        Precondition: cols is an int bit mask
+
+        Parameter points: The single frog on the lattice (or 0)
+        Precondition: points is an int bit mask
+        """
+        then = now-self._hopframes
+        resting = history.get(then,{})
+        moves = self._moves(used)
+        for source in range(len(self._hops)):
+            (c,p) = (0,0)
+            for ((lane,heading),(oc,op)) in resting.items():
+                if lane == source:
+                    (c,p) = (c | oc,p | op)
+            for move in moves[source]:
+                hop = move[0]
+                if hop.target != row or self._heading(row,_HEADINGS[hop.direction]) != angle:
+                    continue
+                back = self._move(cols,-hop.shift)
+                if back & c and self._survives(move,then,used,back,0):
+                    return (then,hop,back,0)
+                back = self._move(points,-hop.offset)
+                if back & p and self._survives(move,then,used,0,back):
+                    return (then,hop,0,back)
+                if points and hop.shift == 0 and self._kinds[source] != 'water':
+                    back = self._to_column(points) & c
+                    if back and self._survives(move,then,used,back,0):
+                        return (then,hop,back,0)
+        raise RuntimeError('the search lost track of a frog')
@@ -0,0 +1,261 @@
+"""
+Rollout module for Froggit
+
+This module plays many games of Froggit without a window, spread over all of the
+cores of the machine.  It takes a folder of level files (like the JSON folder) and a
+policy, and it plays a number of episodes of every level in a process pool.  The
+results are streamed back one episode at a time, as soon as each one is finished.
+
+A policy is a function that takes an observation (see LevelEnv in env.py) and returns
+an action (an index into ACTIONS).  It must be defined at the top level of a module,
+so that it can be sent to the worker processes.  This module has two simple policies,
+random_policy and hop_policy.
+
+To run a sweep from the command line::
+
+    python rollout.py JSON --episodes 20 --policy random
+
+This prints one line of JSON per episode, followed by a summary for each level.  Use
+the --options form for every number, as consts.py reads the second command line
+argument as the frog speed.
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+from simulation import *
+from env import *
+import multiprocessing
+import argparse
+import random
+import json
+import os
+
+# PRIMARY RULE: This module can only access consts.py, engine.py, simulation.py,
+# vector.py and env.py.  It must never import game2d (or anything from Kivy).
+
+
+# The number of frames after which an episode is stopped (5 minutes at 60 fps)
+FRAME_LIMIT = 18000
+
+# The object data of a worker process (read once, when the worker starts)
+_HBDICT = None
+# The environments of a worker process, keyed by level file path
+_ENVS = {}
+
+
+def random_policy(obs):
+    """
+    Returns a random action.
+
+    Parameter obs: The observation of the game
+    Precondition: obs is an observation from LevelEnv
+    """
+    return random.randrange(len(ACTIONS))
+
+
+def hop_policy(obs):
+    """
+    Returns the action to hop up, no matter what is in the way.
+
+    Parameter obs: The observation of the game
+    Precondition: obs is an observation from LevelEnv
+    """
+    return ACTIONS.index('up')
+
+
+# The policies available from the command line
+POLICIES = {'random': random_policy, 'hop': hop_policy}
+
+
+def read_level(path):
+    """
+    Returns the JSON dictionary in the given file, or None if it cannot be read.
+
+    Parameter path: The path to a JSON file
+    Precondition: path is a string
+    """
+    try:
+        with open(path) as file:
+            return json.loads(file.read())
+    except:
+        return None
+
+
+def rollouts(folder,policy,episodes=1,processes=None,objects=None,dt=1/60,seed=0,
+             limit=FRAME_LIMIT):
+    """
+    Plays episodes of every level in folder, and yields the result of each episode.
+
+    Each result is a dictionary with the level file name ('level'), the episode
+    number ('episode'), whether the frog filled all exits ('won'), the number of
+    frames played ('frames'), the number of frogs that reached an exit ('exits'), a
+    dictionary with the number of deaths for each lane type ('deaths'), and whether
+    the episode was stopped at the frame limit ('truncated').  The results arrive in
+    the order that the episodes finish.
+
+    Level files that cannot be loaded (or are not valid levels) yield one result
+    with the file name ('level') and an error message ('error').  The object data
+    file in folder (OBJECT_DATA) is not treated as a level.
+
+    The episodes are seeded with the seed, level name and episode number, so a sweep
+    with the same arguments plays the same games.
+
+    Parameter folder: The folder with the level files
+    Precondition: folder is a string naming a folder
+
+    Parameter policy: The policy choosing the actions
+    Precondition: policy is a top-level function taking an observation and
+    returning an index into ACTIONS
+
+    Parameter episodes: The number of episodes to play for each level
+    Precondition: episodes is an int > 0
+
+    Parameter processes: The number of worker processes (None for one per core)
+    Precondition: processes is an int > 0 or None
+
+    Parameter objects: The object data file (None for the one in the JSON folder)
+    Precondition: objects is a string naming a JSON file or None
+
+    Parameter dt: The time in seconds of each frame
+    Precondition: dt is a number > 0
+
+    Parameter seed: The seed for the random numbers of the episodes
+    Precondition: seed is an int
+
+    Parameter limit: The number of frames after which an episode is stopped
+    Precondition: limit is an int > 0
+    """
+    if objects is None:
+        objects = os.path.join(JSON_PATH,OBJECT_DATA)
+    hbdict = read_level(objects)
+    assert not hbdict is None, 'cannot read the object data in '+repr(objects)
+
+    tasks = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder,name)
+        if name[-5:].lower() != '.json' or name == OBJECT_DATA:
+            continue
+        error = _check_level(path,hbdict)
+        if not error is None:
+            yield {'level': name, 'error': error}
+            continue
+        for episode in range(episodes):
+            tasks.append((path,episode,policy,dt,seed,limit))
+
+    with multiprocessing.Pool(processes,_init_worker,(objects,)) as pool:
+        for result in pool.imap_unordered(_play,tasks):
+            yield result
+
+
+def summarize(results):
+    """
+    Returns a dictionary with a summary of the results for each level.
+
+    The summary of a level has the number of episodes ('episodes'), the number of
+    wins ('wins'), the average number of frames ('frames') and the total number of
+    deaths for each lane type ('deaths').  Results with an error are skipped.
+
+    Parameter results: The results of the episodes
+    Precondition: results is a list of dictionaries from rollouts
+    """
+    summary = {}
+    for result in results:
+        if 'error' in result:
+            continue
+        level = summary.setdefault(result['level'],
+                                   {'episodes': 0, 'wins': 0, 'frames': 0, 'deaths': {}})
+        level['episodes'] += 1
+        level['wins'] += 1 if result['won'] else 0
+        level['frames'] += result['frames']
+        for (kind,count) in result['deaths'].items():
+            level['deaths'][kind] = level['deaths'].get(kind,0)+count
+
+    for level in summary.values():
+        level['frames'] = level['frames']/level['episodes']
+    return summary
+
+
+def _check_level(path,hbdict):
+    """
+    Returns an error message if the file is not a valid level, and None otherwise.
+
+    Parameter path: The path to a level file
+    Precondition: path is a string
+
+    Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+    Precondition: hbdict is a dictionary
+    """
+    dict = read_level(path)
+    if dict is None:
+        return 'cannot read the JSON'
+    try:
+        LevelSim(dict,hbdict)
+    except Exception as e:
+        return 'not a valid level ('+type(e).__name__+': '+str(e)+')'
+    return None
+
+
+def _init_worker(objects):
+    """
+    Reads the object data for a worker process.
+
+    Parameter objects: The object data file
+    Precondition: objects is a string naming a JSON file
+    """
+    global _HBDICT
+    _HBDICT = read_level(objects)
+
+
+def _play(task):
+    """
+    Plays one episode in a worker process and returns the result.
+
+    The environment of each level is made the first time the worker plays that
+    level, and it is reset (not rebuilt) for later episodes.
+
+    Parameter task: The tuple (path,episode,policy,dt,seed,limit) for the episode
+    Precondition: task is a tuple of the arguments described in rollouts
+    """
+    (path,episode,policy,dt,seed,limit) = task
+    name = os.path.basename(path)
+    if not (path,dt) in _ENVS:
+        _ENVS[(path,dt)] = LevelEnv(read_level(path),_HBDICT,dt)
+    env = _ENVS[(path,dt)]
+    level = env.getLevel()
+    random.seed(str(seed)+':'+name+':'+str(episode))
+
+    obs = env.reset()
+    done = False
+    exits = 0
+    deaths = {}
+    while not done and env.getFrames() < limit:
+        (obs,reward,done,info) = env.step(policy(obs))
+        if EVENT_EXIT in info['events']:
+            exits += 1
+        if EVENT_DEATH in info['events']:
+            kind = level.getLaneAt(level.getFrog().getY()).getType()
+            deaths[kind] = deaths.get(kind,0)+1
+
+    return {'level': name, 'episode': episode, 'won': done and level.exits_full(),
+            'frames': env.getFrames(), 'exits': exits, 'deaths': deaths,
+            'truncated': not done}
+
+
+# Application code
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plays episodes of Froggit levels.')
+    parser.add_argument('folder',help='the folder with the level files')
+    parser.add_argument('--policy',choices=sorted(POLICIES),default='random')
+    parser.add_argument('--episodes',type=int,default=1)
+    parser.add_argument('--processes',type=int,default=None)
+    parser.add_argument('--seed',type=int,default=0)
+    parser.add_argument('--limit',type=int,default=FRAME_LIMIT)
+    args = parser.parse_args()
+
+    results = []
+    for result in rollouts(args.folder,POLICIES[args.policy],args.episodes,
+                           args.processes,seed=args.seed,limit=args.limit):
+        print(json.dumps(result),flush=True)
+        results.append(result)
+    print(json.dumps(summarize(results),indent=2))
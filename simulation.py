@@ -0,0 +1,1741 @@
+"""
+Headless simulation module for Froggit
+
+This module contains the game rules for Froggit as plain data: positions, hitboxes
+and state.  Nothing in this module creates a GObject, a texture, or a Sound, and so it
+does not need a window, an OpenGL context or an audio device.  That makes it possible
+to run thousands of simulated games for automated testing.
+
+The classes in this module mirror the classes in level.py, lanes.py and models.py.
+Those classes are now thin views: they read the positions and state from the objects
+in this module and use them to draw the game.  All collisions and movement happen
+here, with the same bounding box math as GObject, so a simulated game plays exactly
+like the one on screen.  The obstacles of all lanes are moved together by the
+LaneEngine in engine.py.
+
+To simulate a game without Kivy, use the load_json function to read a level and the
+object data, and then call update on a LevelSim object each frame::
+
+    level = LevelSim(load_json('easy1.json'),load_json('objects.json'))
+    level.update('up',1/60)
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+from engine import *
+import collections
+import bisect
+import os.path
+import struct
+import json
+
+# PRIMARY RULE: This module can only access consts.py and engine.py.  It must never import game2d
+# (or anything from Kivy), as it has to run on machines with no display.
+
+
+# The folder with the image files (for reading image sizes)
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images')
+# The folder with the json files
+JSON_PATH  = os.path.join(os.path.dirname(os.path.abspath(__file__)),'JSON')
+
+# The animation frames for a frog hop
+HOP_FRAMES = (0,1,2,3,4,3,2,1,0)
+
+# The events recorded by LevelSim.update (so a view can play the matching sound)
+EVENT_JUMP  = 'jump'
+EVENT_DEATH = 'death'
+EVENT_EXIT  = 'exit'
+
+# The image sizes read so far, keyed by file name
+_IMAGE_SIZES = {}
+
+# The slack (in pixels) of the obstacle index, for the rounding error of the engine
+INDEX_SLACK = 1.0
+
+# The state of a level at one moment (see LevelSim.snapshot)
+Snapshot = collections.namedtuple('Snapshot','clock xs state lives alive frog used done sweep')
+
+
+def load_json(name):
+    """
+    Returns the JSON for the given file name, or None if it cannot be loaded
+
+    This is the headless version of GameApp.load_json.  The name must refer to a
+    file in the JSON folder.
+
+    Parameter name: The file name
+    Precondition: name is a string
+    """
+    path = os.path.join(JSON_PATH,name)
+    if name[-4:].lower() != 'json' or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as file:
+            return json.loads(file.read())
+    except:
+        return None
+
+
+def image_size(name):
+    """
+    Returns the size (width,height) in pixels of the given image file.
+
+    The size is read from the header of the PNG file, so no texture is ever loaded.
+    The result is cached, so each file is only read once.
+
+    Parameter name: The file name of an image in the Images folder
+    Precondition: name is a string naming a PNG file
+    """
+    if not name in _IMAGE_SIZES:
+        with open(os.path.join(IMAGE_PATH,name),'rb') as file:
+            header = file.read(24)
+        _IMAGE_SIZES[name] = struct.unpack('>II',header[16:24])
+    return _IMAGE_SIZES[name]
+
+
+def bbox(x,y,width,height,angle,hitbox):
+    """
+    Returns the bounding box (l,t,r,b) of an object with the given attributes.
+
+    This is the same computation as GObject._bbox, and it only supports angles that
+    are a multiple of 90 degrees (which are the only angles in Froggit).
+
+    Parameter x: The horizontal coordinate of the object center
+    Precondition: x is a number
+
+    Parameter y: The vertical coordinate of the object center
+    Precondition: y is a number
+
+    Parameter width: The width of the object
+    Precondition: width is a number > 0
+
+    Parameter height: The height of the object
+    Precondition: height is a number > 0
+
+    Parameter angle: The angle of the object in degrees
+    Precondition: angle is a number and a multiple of 90
+
+    Parameter hitbox: The hitbox offsets (left,top,right,bottom) of the object
+    Precondition: hitbox is a 4-element tuple of numbers
+    """
+    oangle = angle % 360
+    w = width/2
+    h = height/2
+    if oangle == 0:
+        return (x + hitbox[0] - w, y - hitbox[1] + h, x - hitbox[2] + w, y + hitbox[3] - h)
+    elif oangle == 90:
+        return (x + hitbox[1] - h, y + hitbox[2] - w, x - hitbox[3] + h, y - hitbox[0] + w)
+    elif oangle == 180:
+        return (x + hitbox[2] - w, y - hitbox[3] + h, x - hitbox[0] + w, y + hitbox[1] - h)
+    return (x + hitbox[3] - h, y + hitbox[0] - w, x - hitbox[1] + h, y - hitbox[2] + w)
+
+
+def collides(box1,box2):
+    """
+    Returns True if the two bounding boxes overlap.
+
+    This is the same test as GObject.collides, where box1 is the bounding box of the
+    calling object.  The order matters for frogs facing east or west.
+
+    Parameter box1: The bounding box (l,t,r,b) of the first object
+    Precondition: box1 is a 4-element tuple of numbers
+
+    Parameter box2: The bounding box (l,t,r,b) of the second object
+    Precondition: box2 is a 4-element tuple of numbers
+    """
+    (l1,t1,r1,b1) = box1
+    (l0,t0,r0,b0) = box2
+    isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
+    isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
+    return isx and isy
+
+
+def _sweep(a0,a1,b0,b1):
+    """
+    Returns True if two quantities that change linearly are both >= 0 at one time.
+
+    Over an update, the time s goes from 0 to 1.  The first quantity goes from a0 to
+    a1, and the second goes from b0 to b1.
+
+    Parameter a0: The first quantity at the start of the update
+    Precondition: a0 is a number
+
+    Parameter a1: The first quantity at the end of the update
+    Precondition: a1 is a number
+
+    Parameter b0: The second quantity at the start of the update
+    Precondition: b0 is a number
+
+    Parameter b1: The second quantity at the end of the update
+    Precondition: b1 is a number
+    """
+    (lo,hi) = (0.0,1.0)
+    for (v0,v1) in ((a0,a1),(b0,b1)):
+        if v0 < 0 and v1 < 0:
+            return False
+        elif v0 < 0:
+            lo = max(lo,v0/(v0-v1))
+        elif v1 < 0:
+            hi = min(hi,v0/(v0-v1))
+    return lo <= hi
+
+
+class FrogSim(object):
+    """
+    A class representing the state of the frog.
+
+    This is the model behind the Frog class in models.py.  It has the position, the
+    heading, the animation frame and the hitboxes of the frog.  It also replaces the
+    animation coroutines of the original frog with an explicit animation state.  Each
+    call to the method animate is one step of that coroutine.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _x: the x coordinate of the frog
+    # Invariant: _x is a float
+
+    # Attribute _y: the y coordinate of the frog
+    # Invariant: _y is a float
+
+    # Attribute _angle: the heading of the frog (one of the FROG_ angles)
+    # Invariant: _angle is a number that is a multiple of 90
+
+    # Attribute _frame: the current frame of the frog sprite
+    # Invariant: _frame is an int in 0..len(_hitboxes)-1
+
+    # Attribute _width: the width of a single frame of the frog sprite
+    # Invariant: _width is a float > 0
+
+    # Attribute _height: the height of a single frame of the frog sprite
+    # Invariant: _height is a float > 0
+
+    # Attribute _hitboxes: the hitbox for each frame of the frog sprite
+    # Invariant: _hitboxes is a tuple of 4-element tuples of numbers
+
+    # Attribute _deathcount: the number of frames in the death sprite
+    # Invariant: _deathcount is an int > 0
+
+    # Attribute _dying: whether the frog is playing the death animation
+    # Invariant: _dying is a bool
+
+    # Attribute _deathframe: the current frame of the death sprite
+    # Invariant: _deathframe is an int in 0..._deathcount-1
+
+    # Attribute _anim: the current animation ('up','down','left','right','death')
+    # Invariant: _anim is one of those strings or None if there is no animation
+
+    # Attribute _start: the coordinate where the current hop started
+    # Invariant: _start is a float
+
+    # Attribute _end: the coordinate where the current hop ends
+    # Invariant: _end is a float
+
+    # Attribute _time: the time spent in the current animation
+    # Invariant: _time is a float >= 0
+
+    # Attribute _counttime: the time spent in the current animation frame
+    # Invariant: _counttime is a float >= 0
+
+    # Attribute _count: the number of animation frames played so far
+    # Invariant: _count is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getX(self):
+        """
+        Returns the x coordinate of the frog.
+        """
+        return self._x
+
+    def getY(self):
+        """
+        Returns the y coordinate of the frog.
+        """
+        return self._y
+
+    def setX(self,value):
+        """
+        Sets the x coordinate of the frog.
+
+        Parameter value: The new x coordinate.
+        Precondition: value is a number
+        """
+        self._x = value
+
+    def setY(self,value):
+        """
+        Sets the y coordinate of the frog.
+
+        Parameter value: The new y coordinate.
+        Precondition: value is a number
+        """
+        self._y = value
+
+    def getAngle(self):
+        """
+        Returns the heading of the frog.
+        """
+        return self._angle
+
+    def setAngle(self,value):
+        """
+        Sets the heading of the frog.
+
+        Parameter value: The new heading
+        Precondition: value is one of FROG_NORTH, FROG_SOUTH, FROG_EAST, FROG_WEST
+        """
+        self._angle = value
+
+    def getFrame(self):
+        """
+        Returns the current frame of the frog sprite.
+        """
+        return self._frame
+
+    def getDeathFrame(self):
+        """
+        Returns the current frame of the death sprite.
+        """
+        return self._deathframe
+
+    def isDying(self):
+        """
+        Returns True if the frog is playing (or has played) the death animation.
+        """
+        return self._dying
+
+    def isAnimating(self):
+        """
+        Returns True if the frog is in the middle of an animation.
+        """
+        return not self._anim is None
+
+    # INITIALIZER TO SET FROG POSITION
+    def __init__(self,x,y,dict):
+        """
+        Initializes a FrogSim object.
+
+        Parameter x: The starting x coordinate value of the frog
+        Precondition: x is a number
+
+        Parameter y: The starting y coordinate value of the frog
+        Precondition: y is a number
+
+        Parameter dict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: dict is a dictionary
+        """
+        frogformat = dict['sprites']['frog']['format']
+        deathformat = dict['sprites']['skulls']['format']
+        size = image_size(FROG_SPRITE+'.png')
+
+        self._width = size[0]/frogformat[1]
+        self._height = size[1]/frogformat[0]
+        self._hitboxes = tuple(map(tuple,dict['sprites']['frog']['hitboxes']))
+        self._deathcount = deathformat[0]*deathformat[1]
+
+        self._x = x
+        self._y = y
+        self._angle = FROG_NORTH
+        self._frame = 0
+        self._dying = False
+        self._deathframe = 0
+
+        self._anim = None
+        self._start = 0
+        self._end = 0
+        self._time = 0
+        self._counttime = 0
+        self._count = 0
+
+    # ADDITIONAL METHODS (COLLISIONS, MOVEMENT, ETC)
+    def snapshot(self):
+        """
+        Returns a tuple with the position, angle and animation state of the frog.
+
+        The tuple only holds numbers, strings and bools, and it can be given to
+        restore to put this frog (or any other) back in the same state.
+        """
+        return (self._x,self._y,self._angle,self._frame,self._dying,self._deathframe,
+                self._anim,self._start,self._end,self._time,self._counttime,self._count)
+
+    def restore(self,state):
+        """
+        Puts the frog in the state from snapshot.
+
+        Parameter state: The state of a frog
+        Precondition: state is a tuple returned by snapshot
+        """
+        (self._x,self._y,self._angle,self._frame,self._dying,self._deathframe,
+         self._anim,self._start,self._end,self._time,self._counttime,self._count) = state
+
+    def getBox(self):
+        """
+        Returns the bounding box (l,t,r,b) of the frog sprite.
+        """
+        return self.getBoxAt(self._x,self._y)
+
+    def getBoxAt(self,x,y):
+        """
+        Returns the bounding box (l,t,r,b) the frog sprite would have at (x,y).
+
+        The box has the current angle and animation frame of the frog.
+
+        Parameter x: The horizontal coordinate of the frog center
+        Precondition: x is a number
+
+        Parameter y: The vertical coordinate of the frog center
+        Precondition: y is a number
+        """
+        return bbox(x,y,self._width,self._height,self._angle,self._hitboxes[self._frame])
+
+    def animate_vertical(self,direction):
+        """
+        Starts a hop up or down that lasts FROG_SPEED seconds.
+
+        Parameter direction: The direction to move
+        Precondition: direction is a string, either 'up' or 'down'
+        """
+        self._anim = direction
+        self._start = self._y
+        self._end = self._y + GRID_SIZE if direction == 'up' else self._y - GRID_SIZE
+        self._time = 0
+        self._counttime = 0
+        self._count = 0
+
+    def animate_horizontal(self,direction):
+        """
+        Starts a hop left or right that lasts FROG_SPEED seconds.
+
+        Parameter direction: The direction to move
+        Precondition: direction is a string, either 'left' or 'right'
+        """
+        self._anim = direction
+        self._start = self._x
+        self._end = self._x + GRID_SIZE if direction == 'right' else self._x - GRID_SIZE
+        self._time = 0
+        self._counttime = 0
+        self._count = 0
+
+    def animate_death(self):
+        """
+        Starts the death animation that lasts DEATH_SPEED seconds.
+        """
+        self._anim = 'death'
+        self._dying = True
+        self._time = 0
+        self._counttime = 0
+        self._count = 0
+
+    def stop(self):
+        """
+        Stops the current animation (if any), leaving the frog where it is.
+        """
+        self._anim = None
+
+    def animate(self,dt):
+        """
+        Advances the current animation and returns True if it is still running.
+
+        When the animation ends, the method returns False and the frog has no
+        animation anymore.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a number (int or float) >= 0
+        """
+        if self._anim == 'death':
+            return self._animate_death(dt)
+        elif self._anim == 'up' or self._anim == 'down':
+            return self._animate_vertical(dt)
+        elif self._anim == 'left' or self._anim == 'right':
+            return self._animate_horizontal(dt)
+        return False
+
+    def _next_frame(self,dt,split):
+        """
+        Advances the animation timers, returning True if a new frame has started.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a number (int or float) >= 0
+
+        Parameter split: The time that each animation frame lasts
+        Precondition: split is a number > 0
+        """
+        self._time += dt
+        self._counttime += dt
+        if self._counttime >= split:
+            self._count += 1
+            self._counttime = 0
+            return True
+        return False
+
+    def _animate_vertical(self,dt):
+        """
+        Advances a hop up or down by one animation frame.
+
+        If the hop runs out of sprite frames (which can happen with a very uneven
+        frame rate), the hop stops where it is.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a number (int or float) >= 0
+        """
+        step = GRID_SIZE/FROG_SPEED
+        up = self._anim == 'up'
+        self._y = self._y + step*dt if up else self._y - step*dt
+
+        if self._next_frame(dt,FROG_SPEED/8):
+            if self._count >= len(HOP_FRAMES):
+                self._anim = None
+                return False
+            self._frame = HOP_FRAMES[self._count]
+
+        if up and self._y > self._end:
+            self._y = self._end
+        elif not up and self._y < self._end:
+            self._y = self._end
+
+        if self._time <= FROG_SPEED:
+            return True
+        self._frame = 0
+        self._anim = None
+        return False
+
+    def _animate_horizontal(self,dt):
+        """
+        Advances a hop left or right by one animation frame.
+
+        If the hop runs out of sprite frames (which can happen with a very uneven
+        frame rate), the hop stops where it is.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a number (int or float) >= 0
+        """
+        step = GRID_SIZE/FROG_SPEED
+        right = self._anim == 'right'
+        self._x = self._x + step*dt if right else self._x - step*dt
+        if abs(self._x-self._start) > GRID_SIZE:
+            self._x = self._end
+
+        if self._next_frame(dt,FROG_SPEED/8):
+            if self._count >= len(HOP_FRAMES):
+                self._anim = None
+                return False
+            self._frame = HOP_FRAMES[self._count]
+
+        if self._time < FROG_SPEED:
+            return True
+        if abs(self._x-self._start) > GRID_SIZE:
+            self._x = self._end
+        self._frame = 0
+        self._anim = None
+        return False
+
+    def _animate_death(self,dt):
+        """
+        Advances the death animation by one animation frame.
+
+        If the animation runs out of sprite frames, it stops early.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a number (int or float) >= 0
+        """
+        if self._next_frame(dt,DEATH_SPEED/7):
+            if self._count >= self._deathcount:
+                self._anim = None
+                return False
+            self._deathframe = self._count
+
+        if self._time <= DEATH_SPEED:
+            return True
+        self._deathframe = 0
+        self._anim = None
+        return False
+
+
+class LaneSim(object):
+    """
+    Parent class for the state of an arbitrary lane.
+
+    This is the model behind the Lane class in lanes.py.  It stores the obstacles of
+    the lane as parallel lists (one entry per obstacle) instead of GImage objects.
+    The obstacles in a lane all share the same y coordinate and angle, so only the x
+    coordinate changes as the lane moves.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _type: The lane type ('grass', 'road', 'water' or 'hedge')
+    # Invariant: _type is a string
+
+    # Attribute _row: The lane number, bottom/first = 0
+    # Invariant: _row is an int >= 0
+
+    # Attribute _width: The width of a lane in grid squares
+    # Invariant: _width is an int > 0
+
+    # Attribute _speed: The speed (#pixels/sec) obstacles are moving in the lane
+    # Invariant: _speed is a number (0 if the lane has no moving obstacles)
+
+    # Attribute _tilebox: The bounding box (l,t,r,b) of the lane background
+    # Invariant: _tilebox is a 4-element tuple of numbers
+
+    # Attribute _types: The obstacle types (e.g. 'car1' or 'exit')
+    # Invariant: _types is a list of strings
+
+    # Attribute _xs: The starting x coordinates of the obstacle centers
+    # Invariant: _xs is a list of floats, the same length as _types
+
+    # Attribute _engine: The engine that moves the obstacles (once the level has one)
+    # Invariant: _engine is a LaneEngine object or None
+
+    # Attribute _y: The y coordinate of the obstacle centers
+    # Invariant: _y is a float
+
+    # Attribute _angle: The angle of the obstacles (180 if they move left)
+    # Invariant: _angle is 0 or 180
+
+    # Attribute _sizes: The image size (width,height) of each obstacle
+    # Invariant: _sizes is a list of pairs of numbers, the same length as _types
+
+    # Attribute _hitboxes: The hitbox of each obstacle
+    # Invariant: _hitboxes is a list of 4-element tuples, the same length as _types
+
+    # Attribute _lefts: The hitbox offset of the left edge of each obstacle
+    # Invariant: _lefts is a list of numbers, the same length as _types
+
+    # Attribute _rights: The hitbox offset of the right edge of each obstacle
+    # Invariant: _rights is a list of numbers, the same length as _types
+
+    # Attribute _halves: The half width of each obstacle
+    # Invariant: _halves is a list of numbers, the same length as _types
+
+    # Attribute _tops: The top edge of each obstacle (which never changes)
+    # Invariant: _tops is a list of numbers, the same length as _types
+
+    # Attribute _bottoms: The bottom edge of each obstacle (which never changes)
+    # Invariant: _bottoms is a list of numbers, the same length as _types
+
+    # Attribute _period: The distance an obstacle moves before it wraps back
+    # Invariant: _period is a float > 0, or None if the lane has no engine
+
+    # Attribute _phases: The left edges of the obstacles, less the distance the lane
+    # has moved, modulo _period (see _near)
+    # Invariant: _phases is a sorted list of floats, the same length as _types
+
+    # Attribute _order: The obstacle indices, in the order of _phases
+    # Invariant: _order is a list of ints, the same length as _types
+
+    # Attribute _reach: The largest distance from the left edge to the right edge
+    # Invariant: _reach is a number >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getType(self):
+        """
+        Returns the lane type ('grass', 'road', 'water' or 'hedge').
+        """
+        return self._type
+
+    def getRow(self):
+        """
+        Returns the lane number (bottom/first = 0).
+        """
+        return self._row
+
+    def getWidth(self):
+        """
+        Returns the width of the lane in grid squares.
+        """
+        return self._width
+
+    def getSpeed(self):
+        """
+        Returns the speed of the obstacles in the lane.
+        """
+        return self._speed
+
+    def getTypes(self):
+        """
+        Returns the list of obstacle types in the lane.
+        """
+        return self._types
+
+    def getXs(self):
+        """
+        Returns the list of x coordinates of the obstacles in the lane.
+
+        Once the lane has an engine, the positions come from the engine.
+        """
+        if self._engine is None:
+            return self._xs
+        return self._engine.getXs(self._row)
+
+    def getSizes(self):
+        """
+        Returns the list of obstacle image sizes (width,height) in the lane.
+        """
+        return self._sizes
+
+    def getY(self):
+        """
+        Returns the y coordinate of the obstacles in the lane.
+        """
+        return self._y
+
+    def getAngle(self):
+        """
+        Returns the angle of the obstacles in the lane.
+        """
+        return self._angle
+
+    def getHitboxes(self):
+        """
+        Returns the list of obstacle hitboxes in the lane.
+        """
+        return self._hitboxes
+
+    def getTileBox(self):
+        """
+        Returns the bounding box (l,t,r,b) of the lane background.
+        """
+        return self._tilebox
+
+    def setEngine(self,value):
+        """
+        Sets the engine that moves the obstacles in this lane.
+
+        Parameter value: The engine for the level containing this lane
+        Precondition: value is a LaneEngine object built from this lane
+        """
+        assert isinstance(value,LaneEngine)
+        self._engine = value
+        self._init_index()
+
+    # INITIALIZER TO SET LANE POSITION AND OBJECTS
+    def __init__(self,dict,lnnum,hbdict):
+        """
+        Initializes a LaneSim object.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter lnnum: A int representing the lane number, bottom/first = 0
+        Precondition: lnnum is an int >= 0
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+        """
+        lane = dict['lanes'][lnnum]
+        self._type = lane['type']
+        self._row = lnnum
+        self._width = dict['size'][0]
+        self._tilebox = (0,(lnnum+1)*GRID_SIZE,self._width*GRID_SIZE,lnnum*GRID_SIZE)
+        self._speed = 0
+        self._y = lnnum*GRID_SIZE + GRID_SIZE/2
+        self._angle = 0
+
+        self._types = []
+        self._xs = []
+        self._engine = None
+        self._period = None
+        self._sizes = []
+        self._hitboxes = []
+        objects = lane['objects'] if 'objects' in lane else []
+        for obj in objects:
+            if 'speed' in lane:
+                self._angle = 180 if lane['speed'] < 0 else self._angle
+                self._speed = lane['speed']
+            self._types.append(obj['type'])
+            self._xs.append(obj['position']*GRID_SIZE+GRID_SIZE/2)
+            self._sizes.append(image_size(obj['type']+'.png'))
+            self._hitboxes.append(tuple(hbdict['images'][obj['type']]['hitbox']))
+
+        self._init_edges()
+
+    def _init_edges(self):
+        """
+        Helper method to __init__ to precompute the obstacle edge offsets.
+
+        The top and bottom edges never change, and the left and right edges are
+        the x coordinate plus a fixed offset.  These are the same values that
+        GObject._bbox computes for an angle of 0 or 180.
+        """
+        self._lefts = []
+        self._rights = []
+        self._halves = []
+        self._tops = []
+        self._bottoms = []
+        for pos in range(len(self._types)):
+            (l,t,r,b) = bbox(0,self._y,self._sizes[pos][0],self._sizes[pos][1],
+                             self._angle,self._hitboxes[pos])
+            hit = self._hitboxes[pos]
+            self._lefts.append(hit[0] if self._angle == 0 else hit[2])
+            self._rights.append(hit[2] if self._angle == 0 else hit[0])
+            self._halves.append(self._sizes[pos][0]/2)
+            self._tops.append(t)
+            self._bottoms.append(b)
+
+    def _init_index(self):
+        """
+        Helper method to setEngine to sort the obstacles for collision queries.
+
+        All of the obstacles in a lane move together, and an obstacle that wraps
+        around moves exactly one period.  So the left edge of an obstacle, less the
+        distance the lane has moved, is always the same modulo the period.  These
+        phases are sorted once, and they stay sorted as the obstacles wrap around.
+        """
+        self._period = self._engine.getPeriod(self._row)
+        travel = self._speed*self._engine.getClock()
+        xs = self.getXs()
+        phases = [(self._box(pos,xs[pos])[0]-travel) % self._period
+                  for pos in range(len(self._types))]
+        self._order = sorted(range(len(self._types)),key=lambda pos: phases[pos])
+        self._phases = [phases[pos] for pos in self._order]
+        self._reach = max([self._box(pos,0)[2]-self._box(pos,0)[0]
+                           for pos in range(len(self._types))]+[0])
+
+    # ADDITIONAL METHODS (COLLISIONS, MOVEMENT, ETC)
+    def _near(self,left,right):
+        """
+        Returns the indices of the obstacles that may overlap the span from left to right.
+
+        The obstacles are found with a binary search of the phases, so the cost does
+        not grow with the number of obstacles in the lane (only with the number that
+        are near the span).  The result may have a few obstacles that do not overlap
+        the span, so it must be checked with the obstacle boxes.  A lane with no
+        engine returns every obstacle.
+
+        Parameter left: The left end of the span
+        Precondition: left is a number
+
+        Parameter right: The right end of the span
+        Precondition: right is a number >= left
+        """
+        if self._period is None:
+            return range(len(self._types))
+
+        travel = self._speed*self._engine.getClock()
+        low = (left-self._reach-INDEX_SLACK-travel) % self._period
+        high = low+(right-left)+self._reach+2*INDEX_SLACK
+        if high-low >= self._period:
+            return self._order
+        start = bisect.bisect_left(self._phases,low)
+        if high < self._period:
+            return self._order[start:bisect.bisect_right(self._phases,high)]
+        return self._order[start:]+self._order[:bisect.bisect_right(self._phases,high-self._period)]
+
+    def getBox(self,pos):
+        """
+        Returns the bounding box (l,t,r,b) of the obstacle at the given position.
+
+        Parameter pos: The obstacle index
+        Precondition: pos is a valid index in the obstacle list
+        """
+        return self._box(pos,self.getXs()[pos])
+
+    def contains(self,pos,point):
+        """
+        Returns True if the obstacle at the given position contains the point.
+
+        Parameter pos: The obstacle index
+        Precondition: pos is a valid index in the obstacle list
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+        """
+        (l,t,r,b) = self.getBox(pos)
+        return l <= point[0] <= r and b <= point[1] <= t
+
+    def getXsAt(self,t):
+        """
+        Returns the list of x coordinates of the obstacles at time t.
+
+        The time is measured from the start of the level (see LaneEngine.getXAt), and
+        the positions are computed without stepping through the frames in between.
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0, and the lane has an engine
+        """
+        assert not self._engine is None, 'the lane is not part of a level'
+        return self._engine.getXsAt(self._row,t)
+
+    def is_safe(self,col,t,frog):
+        """
+        Returns True if a frog in the given column of this lane is safe at time t.
+
+        This is the collision status of one grid cell.  The frog is placed at the
+        center of the cell, with its current angle and animation frame.  A lane with
+        no dangers (such as grass) is always safe.
+
+        Parameter col: The column of the cell, left/first = 0
+        Precondition: col is an int >= 0
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0
+
+        Parameter frog: The frog to place in the cell
+        Precondition: frog is a FrogSim object
+        """
+        return True
+
+    def _box(self,pos,x):
+        """
+        Returns the bounding box (l,t,r,b) of an obstacle with the given x coordinate.
+
+        Parameter pos: The obstacle index
+        Precondition: pos is a valid index in the obstacle list
+
+        Parameter x: The x coordinate of the obstacle center
+        Precondition: x is a number
+        """
+        return (x + self._lefts[pos] - self._halves[pos], self._tops[pos],
+                x - self._rights[pos] + self._halves[pos], self._bottoms[pos])
+
+    def _contains_at(self,pos,x,point):
+        """
+        Returns True if an obstacle with the given x coordinate contains the point.
+
+        Parameter pos: The obstacle index
+        Precondition: pos is a valid index in the obstacle list
+
+        Parameter x: The x coordinate of the obstacle center
+        Precondition: x is a number
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+        """
+        (l,t,r,b) = self._box(pos,x)
+        return l <= point[0] <= r and b <= point[1] <= t
+
+
+class GrassSim(LaneSim):
+    """
+    A class representing the state of a 'safe' grass area.
+    """
+    pass
+
+
+class RoadSim(LaneSim):
+    """
+    A class representing the state of a roadway with cars.
+
+    Roads have cars that can kill the frog.  Therefore, this class has a method to
+    tell whether or not the frog is safe.
+    """
+    def collide_car(self,frog):
+        """
+        Returns True if the frog collides with a car.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        box = frog.getBox()
+        for pos in self._near(box[0],box[2]):
+            if collides(box,self.getBox(pos)):
+                return True
+        return False
+
+    def sweep_car(self,frog,before,dt):
+        """
+        Returns True if the frog hit a car at any time during the last update.
+
+        The frog box moved from before to its current box, and each car moved its
+        speed times dt, both at a steady rate.  The method collide_car only tests
+        the end of the update, so a fast car (or a long update) can pass right
+        through the frog.  This test covers the whole update, and it is True
+        whenever collide_car is.  The vertical test is the one in collides, at the
+        end of the update (cars never move up or down).
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+
+        Parameter before: The frog box (l,t,r,b) at the start of the last update
+        Precondition: before is a 4-element tuple of numbers
+
+        Parameter dt: The time in seconds of the last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        (l1,t1,r1,b1) = frog.getBox()
+        (l0,r0) = (before[0],before[2])
+        move = self._speed*dt
+        for pos in self._near(min(l0,l1)-abs(move),max(r0,r1)+abs(move)):
+            (cl,ct,cr,cb) = self.getBox(pos)
+            if b1 <= cb <= t1 or cb <= b1 <= ct:
+                if _sweep(cr-move-l0,cr-l1,r0-cl+move,r1-cl):
+                    return True
+        return False
+
+    def is_safe(self,col,t,frog):
+        """
+        Returns True if a frog in the given column is not hit by a car at time t.
+
+        Parameter col: The column of the cell, left/first = 0
+        Precondition: col is an int >= 0
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0
+
+        Parameter frog: The frog to place in the cell
+        Precondition: frog is a FrogSim object
+        """
+        box = frog.getBoxAt(col*GRID_SIZE+GRID_SIZE/2,self._y)
+        xs = self.getXsAt(t)
+        for pos in range(len(xs)):
+            if collides(box,self._box(pos,xs[pos])):
+                return False
+        return True
+
+
+class WaterSim(LaneSim):
+    """
+    A class representing the state of a waterway with logs.
+
+    The frog will die in water unless the (x,y) position of the frog (its center)
+    is contained inside of a log.  In addition, the logs move the frog.
+    """
+    def on_log(self,frog):
+        """
+        Returns True if a log in the lane contains the frog.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        point = (frog.getX(),frog.getY())
+        for pos in self._near(point[0],point[0]):
+            if self.contains(pos,point):
+                return True
+        return False
+
+    def move_frog_log(self,frog,dt):
+        """
+        Moves the frog the same distance (dx) that the logs move.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        dx = self._speed*dt
+        frog.setX(frog.getX() + dx)
+
+    def is_safe(self,col,t,frog):
+        """
+        Returns True if a frog in the given column is on a log at time t.
+
+        Parameter col: The column of the cell, left/first = 0
+        Precondition: col is an int >= 0
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0
+
+        Parameter frog: The frog to place in the cell
+        Precondition: frog is a FrogSim object
+        """
+        point = (col*GRID_SIZE+GRID_SIZE/2,self._y)
+        xs = self.getXsAt(t)
+        for pos in range(len(xs)):
+            if self._contains_at(pos,xs[pos],point):
+                return True
+        return False
+
+
+class HedgeSim(LaneSim):
+    """
+    A class representing the state of the exit hedge.
+
+    Hedges contain exit objects (which the frog is trying to reach) and openings.
+    Once an exit is used, it is "taken", never to be used again.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _used: The obstacles that have been used, as a bit mask
+    # Invariant: _used is an int >= 0, with bit pos set if obstacle pos is used
+
+    # Attribute _full: The bit mask with every obstacle used
+    # Invariant: _full is an int equal to 2**len(_types)-1
+
+    # Attribute _bounds: The sorted left and right edges of the obstacles (see _inside)
+    # Invariant: _bounds is a sorted list of numbers, or None if the hedge moves
+
+    # Attribute _table: The obstacles that may contain a point, for each edge in _bounds
+    # and each space between them (see _inside)
+    # Invariant: _table is a list of 2*len(_bounds)+1 tuples of obstacle indices,
+    # or None if the hedge moves
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getUsedExits(self):
+        """
+        Returns the list of indices of the used exits (in order of index).
+        """
+        return [pos for pos in range(len(self._types)) if self._used >> pos & 1]
+
+    def getUsedMask(self):
+        """
+        Returns the used exits as a bit mask (bit pos is set if exit pos is used).
+        """
+        return self._used
+
+    def setUsedMask(self,value):
+        """
+        Sets the used exits from a bit mask (bit pos is set if exit pos is used).
+
+        Parameter value: The bit mask of used exits
+        Precondition: value is an int >= 0
+        """
+        assert type(value) == int and value >= 0, repr(value)+' is not a valid mask'
+        self._used = value & self._full
+
+    # INITIALIZER TO SET ADDITIONAL EXIT INFORMATION
+    def __init__(self,dict,lnnum,hbdict):
+        """
+        Initializes a HedgeSim object, sublass of LaneSim.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter lnnum: A int representing the lane number, bottom/first = 0
+        Precondition: lnnum is an int >= 0
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+        """
+        self._used = 0
+        self._bounds = None
+        self._table = None
+        super().__init__(dict,lnnum,hbdict)
+        self._full = (1 << len(self._types))-1
+
+    def _init_index(self):
+        """
+        Helper method to setEngine to make the exit table of a hedge that does not move.
+
+        The left and right edges of the obstacles split the lane into pieces.  For each
+        edge, and each piece between two edges, the table has the obstacles that may
+        contain a point there.  The obstacles are widened by INDEX_SLACK, so the table
+        is never missing an obstacle because of rounding.
+        """
+        super()._init_index()
+        if self._speed != 0:
+            return
+
+        xs = self.getXs()
+        boxes = [self._box(pos,xs[pos]) for pos in range(len(self._types))]
+        self._bounds = sorted(set([box[0] for box in boxes]+[box[2] for box in boxes]))
+        ends = [-float('inf')]
+        for x in self._bounds:
+            ends.extend([x,x])
+        ends.append(float('inf'))
+
+        self._table = []
+        for piece in range(2*len(self._bounds)+1):
+            (lo,hi) = (ends[piece],ends[piece+1])
+            self._table.append(tuple(pos for pos in range(len(boxes))
+                                     if boxes[pos][0]-INDEX_SLACK <= hi and
+                                     lo <= boxes[pos][2]+INDEX_SLACK))
+
+    # ANY ADDITIONAL METHODS
+    def collide_hedge(self,frog):
+        """
+        Returns True if the frog collides with the hedge.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        return collides(frog.getBox(),self._tilebox)
+
+    def is_open_hedge(self,frog):
+        """
+        Returns True if frog is in an exit or opening in the hedge.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        return not self.which_exit(frog) is None
+
+    def type_hedge_obst(self,frog):
+        """
+        Returns the type of obstacle ('exit' or 'open') which contains the frog.
+
+        If no obstacle contains the frog, the method returns an empty string.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        pos = self.which_exit(frog)
+        return '' if pos is None else self._types[pos]
+
+    def allow_in_exit(self,frog):
+        """
+        Returns True if the frog can move into the exit within the hedge.
+
+        Method will return False when the exit is already occupied.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        for pos in self._inside((frog.getX(),frog.getY())):
+            if not self._used >> pos & 1:
+                return True
+        return False
+
+    def add_used_exit(self,frog):
+        """
+        Marks the exit containing the frog as used.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        for pos in self._inside((frog.getX(),frog.getY())):
+            self._used |= 1 << pos
+
+    def which_exit(self,frog):
+        """
+        Returns the index of the exit (or opening) which contains the frog.
+
+        If no exit contains the frog, method returns None.
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        inside = self._inside((frog.getX(),frog.getY()))
+        return inside[0] if len(inside) > 0 else None
+
+    def clear_exits(self):
+        """
+        Marks all of the exits in the hedge as unused.
+        """
+        self._used = 0
+
+    def is_safe(self,col,t,frog):
+        """
+        Returns True if a frog can be in the given column of the hedge at time t.
+
+        This is the case if the cell is in an opening, or in an exit that is not
+        used yet.
+
+        Parameter col: The column of the cell, left/first = 0
+        Precondition: col is an int >= 0
+
+        Parameter t: The time in seconds since the start of the level
+        Precondition: t is a number (int or float) >= 0
+
+        Parameter frog: The frog to place in the cell
+        Precondition: frog is a FrogSim object
+        """
+        point = (col*GRID_SIZE+GRID_SIZE/2,self._y)
+        if self._table is None:
+            xs = self.getXsAt(t)
+            inside = [pos for pos in range(len(xs)) if self._contains_at(pos,xs[pos],point)]
+        else:
+            inside = self._inside(point)
+        if len(inside) == 0:
+            return False
+        elif self._types[inside[0]] != 'exit':
+            return True
+        for pos in inside:
+            if not self._used >> pos & 1:
+                return True
+        return False
+
+    def exits_filled(self):
+        """
+        Returns True if all exits in the hedge are filled.
+        """
+        return self._full != 0 and self._used == self._full
+
+    def _inside(self,point):
+        """
+        Returns the indices of the obstacles that contain the point, in order of index.
+
+        A hedge that does not move looks up the point in its exit table, so the time
+        does not depend on the number of exits.  Otherwise, it uses the obstacle index
+        of the lane (see LaneSim._near).
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+        """
+        if self._table is None:
+            near = sorted(self._near(point[0],point[0]))
+        else:
+            piece = bisect.bisect_left(self._bounds,point[0])
+            if piece < len(self._bounds) and self._bounds[piece] == point[0]:
+                near = self._table[2*piece+1]
+            else:
+                near = self._table[2*piece]
+        return [pos for pos in near if self.contains(pos,point)]
+
+
+class LevelSim(object):
+    """
+    This class simulates a single level of Froggit.
+
+    This is the model behind the Level class in level.py.  It has the same rules
+    as that class, but it takes an action instead of a GInput in update.  The action
+    is one of 'right', 'left', 'up', 'down', or None.  It also records the events of
+    each update (jumps, deaths and exits) so that a view can play the right sounds.
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _height: The height of the level by number of grid squares
+    # Invariant: _height is an int > 0
+
+    # Attribute _width: The width of the level by number of grid squares
+    # Invariant: _width is an int > 0
+
+    # Attribute _lanes: The lanes in the level, bottom lane first
+    # Invariant: _lanes is a list of LaneSim objects
+
+    # Attribute _engine: The engine that moves the obstacles in all lanes
+    # Invariant: _engine is a LaneEngine object
+
+    # Attribute _hbdict: The JSON dictionary with hitbox sizes for obstacles
+    # Invariant: _hbdict is a dictionary
+
+    # Attribute _frog: The frog in the game
+    # Invariant: _frog is a FrogSim object or None
+
+    # Attribute _lives: The number of lives left in the game
+    # Invariant: _lives is an int >= 0
+
+    # Attribute _buffer: The distance that obstacles can move offscreen
+    # Invariant: _buffer is a number > 0
+
+    # Attribute _state: The current state of the game
+    # Invariant: _state is an 0 <= int <= 5
+
+    # Attribute _startx: The starting x-coordinate of the frog
+    # Invariant: _startx is a number >= 0 and < width of game in pixels
+
+    # Attribute _starty: The starting y-coordinate of the frog
+    # Invariant: _starty is a number >= 0 and < height of game in pixels
+
+    # Attribute _done: The positions (x,y) of the frogs that finished
+    # Invariant: _done is a list of pairs of numbers
+
+    # Attribute _alive: A bool stating if frog is alive or dying
+    # Invariant: _alive is a bool, False while in dying animation
+
+    # Attribute _events: The events (EVENT_JUMP, etc.) of the last update
+    # Invariant: _events is a list of strings
+
+    # Attribute _goal: The last (top-most) hedge, the only one counted by exits_full
+    # Invariant: _goal is a HedgeSim object or None if the level has no hedge
+
+    # Attribute _sweep: The frog, its box at the start of the last update and the
+    # length of that update (for sweep_car in RoadSim)
+    # Invariant: _sweep is a tuple (FrogSim,4-element tuple,number) or None
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getWidth(self):
+        """
+        Returns the width of level.
+        """
+        return self._width
+
+    def getHeight(self):
+        """
+        Returns the height of level (including the row for the lives).
+        """
+        return self._height
+
+    def getState(self):
+        """
+        Returns the current state of the game-level.
+        """
+        return self._state
+
+    def getLanes(self):
+        """
+        Returns the list of lanes, bottom lane first.
+        """
+        return self._lanes
+
+    def getLaneAt(self,y):
+        """
+        Returns the lane containing the given y coordinate.
+
+        Parameter y: The y coordinate
+        Precondition: y is a number inside the level
+        """
+        return self._lane_at(y)
+
+    def getEngine(self):
+        """
+        Returns the engine that moves the obstacles in all lanes.
+        """
+        return self._engine
+
+    def getFrog(self):
+        """
+        Returns the frog, or None if there is no frog on the board.
+        """
+        return self._frog
+
+    def getLives(self):
+        """
+        Returns the number of lives left.
+        """
+        return self._lives
+
+    def getDone(self):
+        """
+        Returns the list of positions (x,y) of frogs that finished.
+        """
+        return self._done
+
+    def getEvents(self):
+        """
+        Returns the list of events (EVENT_JUMP, etc.) from the last update.
+        """
+        return self._events
+
+    def isAlive(self):
+        """
+        Returns False if the frog is dying.
+        """
+        return self._alive
+
+    # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
+    def __init__(self,dict,hbdict):
+        """
+        Initializes a level simulation from a level JSON dictionary.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+        """
+        self._width = dict['size'][0]
+        self._height = dict['size'][1]+1
+        self._state = STATE_ACTIVE
+        self._hbdict = hbdict
+
+        self._init_lanes(dict,hbdict)
+        self._lives = FROG_LIVES
+        hedges = [lane for lane in self._lanes if isinstance(lane,HedgeSim)]
+        self._goal = hedges[-1] if len(hedges) > 0 else None
+
+        self._startx = dict['start'][0]*GRID_SIZE+GRID_SIZE/2
+        self._starty = dict['start'][1]*GRID_SIZE+GRID_SIZE/2
+        self._frog = FrogSim(self._startx,self._starty,hbdict)
+        self._buffer = dict['offscreen']
+        self._engine = LaneEngine(self._lanes,self._buffer)
+        for lane in self._lanes:
+            lane.setEngine(self._engine)
+        self._done = []
+        self._alive = True
+        self._events = []
+        self._sweep = None
+
+    # UPDATE METHOD TO MOVE THE FROG AND UPDATE ALL OF THE LANES
+    def update(self,action,dt):
+        """
+        Moves the frog according to the action and updates all the lanes.
+
+        Parameter action: The frog movement for this frame
+        Precondition: action is 'right', 'left', 'up', 'down' or None
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        self._events = []
+        frog = self._frog
+        if self._alive and not frog is None:
+            self._special_cases(dt)
+            frog = self._frog
+        self._sweep = None if frog is None else (frog,frog.getBox(),dt)
+
+        if not frog is None and frog.isAnimating():
+            if not frog.animate(dt) and not self._alive:
+                self._frog_died()
+        elif not frog is None:
+            if action == 'right':
+                self._to_right()
+            elif action == 'left':
+                self._to_left()
+            elif action == 'up':
+                self._to_up()
+            elif action == 'down':
+                self._to_down()
+
+        self._engine.step(dt)
+
+    # ANY NECESSARY HELPERS
+    def exits_full(self):
+        """
+        Returns True if all exits in the level are full.
+
+        Only the last (top-most) hedge in the level counts.
+        """
+        return not self._goal is None and self._goal.exits_filled()
+
+    def reset(self):
+        """
+        Puts the level back in its starting state, as if it was just created.
+
+        This is much faster than making a new LevelSim, as the level JSON is not
+        read again and the lanes are reused.
+        """
+        self._engine.reset()
+        for lane in self._lanes:
+            if isinstance(lane,HedgeSim):
+                lane.clear_exits()
+
+        self._lives = FROG_LIVES
+        self._done = []
+        self._events = []
+        self.start_over()
+
+    def snapshot(self):
+        """
+        Returns the state of the level as a Snapshot (a named tuple).
+
+        The snapshot records the lane clock and the obstacle positions in each lane,
+        the state, the lives, the frog (its
+        position and the progress of its animation), the used exits of each hedge
+        (as bit masks) and the positions of the finished frogs.  It also records the
+        frog box at the start of the last update and the length of that update, as
+        the pair (box,dt) or None, as the next update needs them for the swept car
+        test.  It is immutable, holds only numbers, strings and tuples (about a kilobyte),
+        and can be pickled.  The obstacle positions follow from the lane clock, but they
+        are stored anyway, as the positions after many steps differ from the computed
+        ones by rounding error (which can change a close collision).
+        """
+        frog = None if self._frog is None else self._frog.snapshot()
+        used = tuple(lane.getUsedMask() for lane in self._lanes if isinstance(lane,HedgeSim))
+        sweep = None
+        if not self._sweep is None and self._sweep[0] is self._frog:
+            sweep = (tuple(self._sweep[1]),self._sweep[2])
+        counts = self._engine.getCounts()
+        xs = self._engine.getX().tolist()
+        xs = tuple(tuple(xs[row][:counts[row]]) for row in range(len(xs)))
+        return Snapshot(self._engine.getClock(),xs,self._state,self._lives,self._alive,
+                        frog,used,tuple(self._done),sweep)
+
+    def restore(self,snap):
+        """
+        Puts the level back in the state of a snapshot.
+
+        The snapshot may come from any LevelSim for the same level, and it can be
+        restored any number of times.  The obstacles are moved back to their exact
+        positions (see LaneEngine.setClock).  If the snapshot has a frog,
+        the current frog object is reused if there is one.
+
+        Parameter snap: The state of the level
+        Precondition: snap is a Snapshot from a level with the same JSON
+        """
+        self._engine.setClock(snap.clock,snap.xs)
+        hedges = [lane for lane in self._lanes if isinstance(lane,HedgeSim)]
+        for pos in range(len(hedges)):
+            hedges[pos].setUsedMask(snap.used[pos])
+
+        self._state = snap.state
+        self._lives = snap.lives
+        self._alive = snap.alive
+        self._done = list(snap.done)
+        self._events = []
+
+        if snap.frog is None:
+            self._frog = None
+        else:
+            if self._frog is None:
+                self._frog = FrogSim(self._startx,self._starty,self._hbdict)
+            self._frog.restore(snap.frog)
+
+        if snap.sweep is None or self._frog is None:
+            self._sweep = None
+        else:
+            self._sweep = (self._frog,)+snap.sweep
+
+    def start_over(self):
+        """
+        Generates a new frog and positions it in the starting position.
+        """
+        self._frog = FrogSim(self._startx,self._starty,self._hbdict)
+        self._alive = True
+        self._state = STATE_ACTIVE
+        self._sweep = None
+
+    def _init_lanes(self,dict,hbdict):
+        """
+        Helper method to __init__ to initate _lanes attribute.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+        """
+        self._lanes = []
+        lstlanes = dict['lanes']
+
+        for pos in range(len(lstlanes)):
+            if lstlanes[pos]['type'] == 'grass':
+                lane = GrassSim(dict,pos,hbdict)
+            elif lstlanes[pos]['type'] == 'road':
+                lane = RoadSim(dict,pos,hbdict)
+            elif lstlanes[pos]['type'] == 'water':
+                lane = WaterSim(dict,pos,hbdict)
+            elif lstlanes[pos]['type'] == 'hedge':
+                lane = HedgeSim(dict,pos,hbdict)
+
+            self._lanes.append(lane)
+
+    def _lane_at(self,y):
+        """
+        Returns the lane containing the given y coordinate.
+
+        Parameter y: The y coordinate
+        Precondition: y is a number inside the level
+        """
+        return self._lanes[round((y-GRID_SIZE/2)/GRID_SIZE)]
+
+    def _special_cases(self,dt):
+        """
+        Method checks for special cases when frog moves, including if frog
+        collides and dies, safely exits, or drowns.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        frog = self._frog
+        lane = self._lane_at(frog.getY())
+        if isinstance(lane,RoadSim):
+            if lane.collide_car(frog):
+                self._initiate_death()
+            elif self._swept(frog) and lane.sweep_car(frog,self._sweep[1],self._sweep[2]):
+                self._initiate_death()
+        elif isinstance(lane,WaterSim):
+            if not lane.on_log(frog):
+                if not frog.isAnimating():
+                    self._initiate_death()
+            else:
+                if not frog.isAnimating():
+                    lane.move_frog_log(frog,dt)
+                if frog.getX() < 0 or frog.getX() > self._width*GRID_SIZE:
+                    self._initiate_death()
+        elif isinstance(lane,HedgeSim):
+            if lane.collide_hedge(frog):
+                if lane.type_hedge_obst(frog) == 'exit':
+                    if lane.allow_in_exit(frog):
+                        self._frog_to_exit()
+
+    def _swept(self,frog):
+        """
+        Returns True if collisions with cars must be tested over the last update.
+
+        This is only needed if the last update was longer than SWEEP_TIME.  At the
+        normal rate, a car moves a few pixels between updates, and testing the end of
+        each update is enough (and is what the planner expects).
+
+        Parameter frog: The frog in the game
+        Precondition: frog is a FrogSim object
+        """
+        return not self._sweep is None and self._sweep[0] is frog and self._sweep[2] > SWEEP_TIME
+
+    def _to_right(self):
+        """
+        Initiates a right hop of the frog if the frog can move into the new x
+        position. Frog does not move out of level grid and into hedges.
+        """
+        self._events.append(EVENT_JUMP)
+        frog = self._frog
+        frog.setAngle(FROG_EAST)
+
+        if frog.getX()+GRID_SIZE < self._width*GRID_SIZE:
+            if not isinstance(self._lane_at(frog.getY()),HedgeSim):
+                frog.animate_horizontal('right')
+
+    def _to_left(self):
+        """
+        Initiates a left hop of the frog if the frog can move into the new x
+        position. Frog does not move out of level grid and into hedges.
+        """
+        self._events.append(EVENT_JUMP)
+        frog = self._frog
+        frog.setAngle(FROG_WEST)
+
+        if frog.getX()-GRID_SIZE > 0:
+            if not isinstance(self._lane_at(frog.getY()),HedgeSim):
+                frog.animate_horizontal('left')
+
+    def _to_up(self):
+        """
+        Initiates an upward hop of the frog if the frog can move into the new y
+        position. Frog does not move out of level grid, into hedges or used exits.
+        """
+        self._events.append(EVENT_JUMP)
+        frog = self._frog
+        oldy = frog.getY()
+        newy = oldy+GRID_SIZE
+        frog.setAngle(FROG_NORTH)
+
+        if newy < (self._height-1)*GRID_SIZE:
+            lane = self._lane_at(newy)
+            if isinstance(lane,HedgeSim):
+                frog.setY(newy)
+                allowed = True
+                if lane.collide_hedge(frog):
+                    if lane.type_hedge_obst(frog) == 'exit':
+                        allowed = lane.allow_in_exit(frog)
+                    else:
+                        allowed = lane.is_open_hedge(frog)
+                frog.setY(oldy)
+                if not allowed:
+                    return
+            frog.animate_vertical('up')
+
+    def _to_down(self):
+        """
+        Initiates a downward hop of the frog if the frog can move into the new y
+        position. Frog does not move out of level grid, into hedges, used exits,
+        or open exits from above.
+        """
+        self._events.append(EVENT_JUMP)
+        frog = self._frog
+        oldy = frog.getY()
+        newy = oldy-GRID_SIZE
+        frog.setAngle(FROG_SOUTH)
+
+        if newy > 0:
+            lane = self._lane_at(newy)
+            if isinstance(lane,HedgeSim):
+                frog.setY(newy)
+                allowed = True
+                if lane.collide_hedge(frog):
+                    allowed = lane.is_open_hedge(frog) and \
+                        lane.type_hedge_obst(frog) != 'exit'
+                frog.setY(oldy)
+                if not allowed:
+                    return
+            frog.animate_vertical('down')
+
+    def _initiate_death(self):
+        """
+        Changes the attribute _alive to False and starts the death animation.
+        """
+        self._alive = False
+        self._events.append(EVENT_DEATH)
+        self._frog.animate_death()
+
+    def _frog_died(self):
+        """
+        Alters _state, _frog and _lives attributes once frog dies and adjusts
+        according to how many lives are left.
+        """
+        self._state = STATE_PAUSED if self._lives > 1 else STATE_COMPLETE
+        self._frog = None
+        self._lives -= 1
+
+    def _frog_to_exit(self):
+        """
+        Records the finished frog over the exit and adjusts state based on how
+        many open exits are left.
+        """
+        self._events.append(EVENT_EXIT)
+        frog = self._frog
+        lane = self._lane_at(frog.getY())
+        pos = lane.which_exit(frog)
+        self._done.append((lane.getXs()[pos],lane.getY()))
+        lane.add_used_exit(frog)
+        self._frog = None
+        if self.exits_full():
+            self._state = STATE_COMPLETE
+        else:
+            self._state = STATE_PAUSED
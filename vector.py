@@ -0,0 +1,727 @@
+"""
+Batched simulation module for Froggit
+
+This module contains the class VecLevel, which simulates many independent games of
+the same level in lock-step.  It has the rules of LevelSim (in simulation.py), but
+the state of every game is stored in NumPy arrays, with one entry per game.  A single
+call to step then advances all of the games with a fixed number of array operations,
+no matter how many games there are.  This is what you want for training agents.
+
+The games are stepped like this: the frog in each game takes the action given for
+that game, and then the lanes move.  A game where the frog died (or reached an exit)
+starts over immediately with a new frog, and a game that is complete (no lives left
+or all exits full) is reset to the start of the level.  With the same actions and the
+same dt, each game plays out exactly like a LevelSim driven the same way.  This
+includes the swept car test that LevelSim uses for steps longer than SWEEP_TIME.
+
+To simulate 1024 games of a level::
+
+    level = VecLevel(load_json('easy1.json'),load_json('objects.json'),1024)
+    obs = level.reset()
+    (obs,reward,done) = level.step(actions)
+
+where actions is an array of 1024 ints, each an index into ACTIONS.
+
+# YOUR NAME AND NETID HERE
+# DATE COMPLETED HERE
+"""
+from consts import *
+from simulation import *
+import numpy as np
+
+# PRIMARY RULE: This module can only access consts.py, engine.py and simulation.py.
+# It must never import game2d (or anything from Kivy).
+
+
+# The actions of a game, in the order of the action numbers passed to step
+ACTIONS = (None,'right','left','up','down')
+
+# The reward for a frog reaching an exit
+REWARD_EXIT  = 1.0
+# The reward for a frog dying
+REWARD_DEATH = -1.0
+
+# The animation frames for a frog hop, as an array
+_HOP_FRAMES = np.array(HOP_FRAMES)
+
+# The lane types, as stored in the lane type array
+_LANE_TYPES = ('grass','road','water','hedge')
+
+# The frog animations, as stored in the animation array
+_ANIM_NONE  = 0
+_ANIM_UP    = 1
+_ANIM_DOWN  = 2
+_ANIM_LEFT  = 3
+_ANIM_RIGHT = 4
+_ANIM_DEATH = 5
+
+
+def frog_tables(hbdict):
+    """
+    Returns the arrays (adds,subs) used to compute the frog bounding box.
+
+    Both arrays have shape (4,frames,4), indexed by the angle (0, 90, 180 or 270
+    degrees, divided by 90), the sprite frame, and the box edge (l,t,r,b).  Edges l
+    and r are computed from the frog x coordinate, and edges t and b from the frog y
+    coordinate, as (coordinate+adds)-subs.  This is the same arithmetic (in the same
+    order) as the function bbox in simulation.py.
+
+    Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+    Precondition: hbdict is a dictionary
+    """
+    frogformat = hbdict['sprites']['frog']['format']
+    size = image_size(FROG_SPRITE+'.png')
+    w = size[0]/frogformat[1]/2
+    h = size[1]/frogformat[0]/2
+    hitboxes = hbdict['sprites']['frog']['hitboxes']
+
+    adds = np.zeros((4,len(hitboxes),4))
+    subs = np.zeros((4,len(hitboxes),4))
+    for frame in range(len(hitboxes)):
+        (h0,h1,h2,h3) = hitboxes[frame]
+        adds[0,frame] = (h0,-h1,-h2,h3)
+        subs[0,frame] = (w,-h,-w,h)
+        adds[1,frame] = (h1,h2,-h3,-h0)
+        subs[1,frame] = (h,w,-h,-w)
+        adds[2,frame] = (h2,-h3,-h0,h1)
+        subs[2,frame] = (w,-h,-w,h)
+        adds[3,frame] = (h3,h0,-h1,-h2)
+        subs[3,frame] = (h,w,-h,-w)
+    return (adds,subs)
+
+
+class VecLevel(object):
+    """
+    A class simulating many games of the same level at once.
+
+    Each game has its own frog, lives, used exits and obstacle positions.  These are
+    stored as arrays with one entry (or row) per game.  The obstacle positions have
+    the same layout as the array of a LaneEngine, with an extra first dimension for
+    the game.
+
+    The observation returned by reset and step is a float array with one row per game.
+    Column 0 is the frog x coordinate, column 1 is the frog y coordinate, column 2 is
+    the number of lives, and the remaining columns are the x coordinates of every
+    obstacle in the level (bottom lane first, in the order of the level JSON).
+    """
+    # LIST ALL HIDDEN ATTRIBUTES HERE
+    # Attribute _size: The number of games
+    # Invariant: _size is an int > 0
+
+    # Attribute _width: The width of the level in pixels
+    # Invariant: _width is a number > 0
+
+    # Attribute _top: The y coordinate the frog must stay below (the lives row)
+    # Invariant: _top is a number > 0
+
+    # Attribute _engine: The engine with the speeds and edges of the lanes
+    # Invariant: _engine is a LaneEngine object
+
+    # Attribute _types: The type of each lane (an index into _LANE_TYPES)
+    # Invariant: _types is an int array with one entry per lane
+
+    # Attribute _speeds: The speed of each lane
+    # Invariant: _speeds is a float array with one entry per lane
+
+    # Attribute _tiles: The bounding box of each lane background
+    # Invariant: _tiles is a float array of shape (lanes,4)
+
+    # Attribute _exits: Whether each obstacle is an exit
+    # Invariant: _exits is a bool array with the shape of the engine array
+
+    # Attribute _hedge: The last hedge lane (the only one counted for exits_full)
+    # Invariant: _hedge is a lane number, or None if there is no hedge
+
+    # Attribute _start: The obstacle positions at the start of the level
+    # Invariant: _start is a float array with the shape of the engine array
+
+    # Attribute _columns: The entries of the engine array that are real obstacles
+    # Invariant: _columns is a bool array with one entry per engine array entry
+
+    # Attribute _adds: The frog bounding box offsets added to the frog position
+    # Invariant: _adds is a float array of shape (4,frames,4) (see frog_tables)
+
+    # Attribute _subs: The frog bounding box offsets subtracted after _adds
+    # Invariant: _subs is a float array of shape (4,frames,4) (see frog_tables)
+
+    # Attribute _deathcount: The number of frames in the death animation
+    # Invariant: _deathcount is an int > 0
+
+    # Attribute _startx: The starting x-coordinate of the frog
+    # Invariant: _startx is a number
+
+    # Attribute _starty: The starting y-coordinate of the frog
+    # Invariant: _starty is a number
+
+    # Attribute _x: The obstacle positions of each game
+    # Invariant: _x is a float array of shape (games,lanes,columns)
+
+    # Attribute _used: The used exits of each game
+    # Invariant: _used is a bool array of shape (games,lanes,columns)
+
+    # Attribute _lives: The number of lives left in each game
+    # Invariant: _lives is an int array with one entry per game
+
+    # Attribute _state: The state (STATE_ACTIVE, etc.) of each game
+    # Invariant: _state is an int array with one entry per game
+
+    # Attribute _hasfrog: Whether each game has a frog on the board
+    # Invariant: _hasfrog is a bool array with one entry per game
+
+    # Attribute _alive: Whether the frog of each game is alive (not dying)
+    # Invariant: _alive is a bool array with one entry per game
+
+    # Attribute _fx: The frog x coordinate of each game
+    # Invariant: _fx is a float array with one entry per game
+
+    # Attribute _fy: The frog y coordinate of each game
+    # Invariant: _fy is a float array with one entry per game
+
+    # Attribute _angle: The frog angle of each game, divided by 90
+    # Invariant: _angle is an int array with entries 0 to 3
+
+    # Attribute _frame: The frog sprite frame of each game
+    # Invariant: _frame is an int array with one entry per game
+
+    # Attribute _anim: The frog animation (_ANIM_NONE, etc.) of each game
+    # Invariant: _anim is an int array with one entry per game
+
+    # Attribute _begin: The coordinate at the start of the current hop
+    # Invariant: _begin is a float array with one entry per game
+
+    # Attribute _end: The coordinate at the end of the current hop
+    # Invariant: _end is a float array with one entry per game
+
+    # Attribute _time: The time since the start of the current animation
+    # Invariant: _time is a float array with one entry per game
+
+    # Attribute _counttime: The time since the start of the current animation frame
+    # Invariant: _counttime is a float array with one entry per game
+
+    # Attribute _count: The number of animation frames so far
+    # Invariant: _count is an int array with one entry per game
+
+    # Attribute _tracked: Whether each game has the same frog as in the last step
+    # Invariant: _tracked is a bool array with one entry per game
+
+    # Attribute _lastl: The frog left edge at the start of the last step
+    # Invariant: _lastl is a float array with one entry per game
+
+    # Attribute _lastr: The frog right edge at the start of the last step
+    # Invariant: _lastr is a float array with one entry per game
+
+    # Attribute _lastdt: The time in seconds of the last step
+    # Invariant: _lastdt is a number >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getSize(self):
+        """
+        Returns the number of games.
+        """
+        return self._size
+
+    def getLives(self):
+        """
+        Returns the array of the number of lives left in each game.
+        """
+        return self._lives
+
+    def getUsedExits(self):
+        """
+        Returns the bool array of used exits, of shape (games,lanes,columns).
+        """
+        return self._used
+
+    def getObstacles(self):
+        """
+        Returns the array of obstacle positions, of shape (games,lanes,columns).
+
+        Unused entries are NaN, as in LaneEngine.getX.
+        """
+        return self._x
+
+    # INITIALIZER
+    def __init__(self,dict,hbdict,size):
+        """
+        Initializes a VecLevel with size copies of a level.
+
+        Parameter dict: A JSON dictionary containing information about the level
+        Precondition: dict is a dictionary
+
+        Parameter hbdict: A JSON dictionary with hitbox sizes for obstacles
+        Precondition: hbdict is a dictionary
+
+        Parameter size: The number of games
+        Precondition: size is an int > 0
+        """
+        assert type(size) == int and size > 0, repr(size)+' is not a valid size'
+        level = LevelSim(dict,hbdict)
+        lanes = level.getLanes()
+        self._size = size
+        self._width = level.getWidth()*GRID_SIZE
+        self._top = (level.getHeight()-1)*GRID_SIZE
+        self._engine = level.getEngine()
+        self._startx = level.getFrog().getX()
+        self._starty = level.getFrog().getY()
+
+        self._types = np.array([_LANE_TYPES.index(lane.getType()) for lane in lanes])
+        self._speeds = np.array([float(lane.getSpeed()) for lane in lanes])
+        self._tiles = np.array([lane.getTileBox() for lane in lanes],dtype=float)
+        self._start = self._engine.getX().copy()
+        self._columns = ~np.isnan(self._start).ravel()
+        self._exits = np.zeros(self._start.shape,dtype=bool)
+        self._hedge = None
+        for lane in lanes:
+            for pos in range(len(lane.getTypes())):
+                self._exits[lane.getRow(),pos] = lane.getTypes()[pos] == 'exit'
+            if lane.getType() == 'hedge':
+                self._hedge = lane.getRow()
+
+        (self._adds,self._subs) = frog_tables(hbdict)
+        deathformat = hbdict['sprites']['skulls']['format']
+        self._deathcount = deathformat[0]*deathformat[1]
+
+        self._x = np.empty((size,)+self._start.shape)
+        self._used = np.zeros((size,)+self._start.shape,dtype=bool)
+        self._lives = np.zeros(size,dtype=int)
+        self._state = np.zeros(size,dtype=int)
+        self._hasfrog = np.zeros(size,dtype=bool)
+        self._alive = np.zeros(size,dtype=bool)
+        self._fx = np.zeros(size)
+        self._fy = np.zeros(size)
+        self._angle = np.zeros(size,dtype=int)
+        self._frame = np.zeros(size,dtype=int)
+        self._anim = np.zeros(size,dtype=int)
+        self._begin = np.zeros(size)
+        self._end = np.zeros(size)
+        self._time = np.zeros(size)
+        self._counttime = np.zeros(size)
+        self._count = np.zeros(size,dtype=int)
+        self._tracked = np.zeros(size,dtype=bool)
+        self._lastl = np.zeros(size)
+        self._lastr = np.zeros(size)
+        self._lastdt = 0
+        self.reset()
+
+    # ADDITIONAL METHODS
+    def reset(self):
+        """
+        Resets every game to the start of the level and returns the observation.
+        """
+        self._reset(np.ones(self._size,dtype=bool))
+        return self._observe()
+
+    def step(self,actions,dt=1/60):
+        """
+        Advances every game by one frame and returns the tuple (obs,reward,done).
+
+        The value obs is the observation after the step (see the class description),
+        reward is a float array with the reward of each game for this step, and done
+        is a bool array that is True for every game that just ended.  Games that end
+        are reset to the start of the level, so obs shows the start of a new game.
+
+        Parameter actions: The action of each game, as an index into ACTIONS
+        Precondition: actions is an int array (or list) with one entry per game
+
+        Parameter dt: The time in seconds of this step
+        Precondition: dt is a number (int or float) >= 0
+        """
+        actions = np.asarray(actions)
+        assert actions.shape == (self._size,), 'actions has shape '+repr(actions.shape)
+        reward = np.zeros(self._size)
+
+        self._special_cases(dt,reward)
+        box = self._frog_box(self._fy)
+        (self._lastl,self._lastr) = (box[0],box[2])
+        self._tracked = self._hasfrog.copy()
+        self._lastdt = dt
+        ready = self._hasfrog & (self._anim == _ANIM_NONE)
+        self._animate(dt)
+        self._move_frog(actions,ready)
+        self._engine.move(self._x,dt)
+
+        done = self._state == STATE_COMPLETE
+        self._start_over(self._state == STATE_PAUSED)
+        self._reset(done)
+        return (self._observe(),reward,done)
+
+    # HELPERS
+    def _reset(self,mask):
+        """
+        Resets the games in mask to the start of the level.
+
+        Parameter mask: The games to reset
+        Precondition: mask is a bool array with one entry per game
+        """
+        self._x[mask] = self._start
+        self._used[mask] = False
+        self._lives[mask] = FROG_LIVES
+        self._start_over(mask)
+
+    def _start_over(self,mask):
+        """
+        Puts a new frog at the starting position in the games in mask.
+
+        Parameter mask: The games to start over
+        Precondition: mask is a bool array with one entry per game
+        """
+        self._state[mask] = STATE_ACTIVE
+        self._hasfrog[mask] = True
+        self._alive[mask] = True
+        self._fx[mask] = self._startx
+        self._fy[mask] = self._starty
+        self._angle[mask] = FROG_NORTH % 360 // 90
+        self._frame[mask] = 0
+        self._anim[mask] = _ANIM_NONE
+        self._tracked[mask] = False
+
+    def _observe(self):
+        """
+        Returns the observation of every game (see the class description).
+        """
+        obstacles = self._x.reshape(self._size,-1)[:,self._columns]
+        obs = np.empty((self._size,3+obstacles.shape[1]))
+        obs[:,0] = self._fx
+        obs[:,1] = self._fy
+        obs[:,2] = self._lives
+        obs[:,3:] = obstacles
+        return obs
+
+    def _rows(self,y):
+        """
+        Returns the lane number of each y coordinate (as in LevelSim._lane_at).
+
+        Parameter y: The y coordinates
+        Precondition: y is a float array
+        """
+        rows = np.rint((y-GRID_SIZE/2)/GRID_SIZE).astype(int)
+        return np.clip(rows,0,len(self._types)-1)
+
+    def _frog_box(self,y):
+        """
+        Returns the frog bounding box (l,t,r,b) of each game, as four arrays.
+
+        Parameter y: The y coordinate of each frog
+        Precondition: y is a float array with one entry per game
+        """
+        adds = self._adds[self._angle,self._frame]
+        subs = self._subs[self._angle,self._frame]
+        x = self._fx
+        return ((x+adds[:,0])-subs[:,0],(y+adds[:,1])-subs[:,1],
+                (x+adds[:,2])-subs[:,2],(y+adds[:,3])-subs[:,3])
+
+    def _obstacle_boxes(self,rows):
+        """
+        Returns the obstacle bounding boxes (l,t,r,b) in the given lane of each game.
+
+        Each array has one row per game and one column per obstacle.
+
+        Parameter rows: The lane number for each game
+        Precondition: rows is an int array with one entry per game
+        """
+        (lefts,rights,halves,tops,bottoms) = self._engine.getEdges()
+        x = self._x[np.arange(self._size),rows]
+        return (x+lefts[rows]-halves[rows],tops[rows],x-rights[rows]+halves[rows],
+                bottoms[rows])
+
+    def _contains(self,rows,y):
+        """
+        Returns the bool array of the obstacles that contain the frog center.
+
+        The array has one row per game and one column per obstacle.
+
+        Parameter rows: The lane number for each game
+        Precondition: rows is an int array with one entry per game
+
+        Parameter y: The y coordinate of each frog
+        Precondition: y is a float array with one entry per game
+        """
+        (l,t,r,b) = self._obstacle_boxes(rows)
+        x = self._fx[:,None]
+        y = y[:,None]
+        return (l <= x) & (x <= r) & (b <= y) & (y <= t)
+
+    def _hedge_check(self,rows,y):
+        """
+        Returns the arrays (collide,isexit,allow,isopen) for a frog in a hedge.
+
+        The value collide is True if the frog collides with the hedge, isexit is True
+        if the first obstacle containing the frog is an exit, allow is True if an
+        unused obstacle contains the frog, and isopen is True if any obstacle contains
+        the frog.  These are the hedge tests of LevelSim.
+
+        Parameter rows: The lane number for each game
+        Precondition: rows is an int array with one entry per game
+
+        Parameter y: The y coordinate of each frog
+        Precondition: y is a float array with one entry per game
+        """
+        games = np.arange(self._size)
+        tiles = self._tiles[rows]
+        collide = _collides(self._frog_box(y),
+                            (tiles[:,0],tiles[:,1],tiles[:,2],tiles[:,3]))
+        inside = self._contains(rows,y)
+        isopen = inside.any(axis=1)
+        first = inside.argmax(axis=1)
+        isexit = isopen & self._exits[rows,first]
+        allow = (inside & ~self._used[games,rows]).any(axis=1)
+        return (collide,isexit,allow,isopen)
+
+    def _special_cases(self,dt,reward):
+        """
+        Kills the frogs that are hit, drown or float away, and moves frogs into exits.
+
+        This is LevelSim._special_cases for every game with a live frog.
+
+        Parameter dt: The time in seconds of this step
+        Precondition: dt is a number (int or float) >= 0
+
+        Parameter reward: The reward array for this step
+        Precondition: reward is a float array with one entry per game
+        """
+        active = self._hasfrog & self._alive
+        rows = self._rows(self._fy)
+        types = self._types[rows]
+        animating = self._anim != _ANIM_NONE
+
+        road = active & (types == 1)
+        water = active & (types == 2)
+        hedge = active & (types == 3)
+
+        (l1,t1,r1,b1) = self._frog_box(self._fy)
+        (l0,t0,r0,b0) = self._obstacle_boxes(rows)
+        hit = _collides((l1[:,None],t1[:,None],r1[:,None],b1[:,None]),(l0,t0,r0,b0))
+        killed = road & hit.any(axis=1)
+        if self._lastdt > SWEEP_TIME:
+            swept = road & self._tracked & ~killed
+            killed[swept] = self._sweep_car(rows,swept)[swept]
+
+        onlog = self._contains(rows,self._fy).any(axis=1)
+        killed |= water & ~onlog & ~animating
+        drift = water & onlog & ~animating
+        self._fx[drift] = self._fx[drift]+self._speeds[rows[drift]]*dt
+        killed |= water & onlog & ((self._fx < 0) | (self._fx > self._width))
+
+        (collide,isexit,allow,isopen) = self._hedge_check(rows,self._fy)
+        exited = hedge & collide & isexit & allow
+
+        # Frogs that die start the death animation
+        self._alive[killed] = False
+        self._anim[killed] = _ANIM_DEATH
+        self._time[killed] = 0
+        self._counttime[killed] = 0
+        self._count[killed] = 0
+        reward[killed] += REWARD_DEATH
+
+        # Frogs that reach an exit fill every obstacle that contains them
+        if exited.any():
+            games = np.nonzero(exited)[0]
+            inside = self._contains(rows,self._fy)[games]
+            self._used[games,rows[games]] |= inside
+            self._hasfrog[exited] = False
+            self._anim[exited] = _ANIM_NONE
+            reward[exited] += REWARD_EXIT
+            full = self._exits_full()
+            self._state[exited & full] = STATE_COMPLETE
+            self._state[exited & ~full] = STATE_PAUSED
+
+    def _sweep_car(self,rows,mask):
+        """
+        Returns the bool array of the games where the frog hit a car in the last step.
+
+        This is RoadSim.sweep_car for the games in mask.  The frog moved from its box
+        at the start of the last step (_lastl and _lastr) to its current box, and the
+        cars moved their speed times _lastdt.  The vertical test is the one at the end
+        of the step.  Games not in mask are False.
+
+        Parameter rows: The lane number for each game
+        Precondition: rows is an int array with one entry per game
+
+        Parameter mask: The games to test
+        Precondition: mask is a bool array with one entry per game
+        """
+        if not mask.any():
+            return mask
+        (l1,t1,r1,b1) = self._frog_box(self._fy)
+        (cl,ct,cr,cb) = self._obstacle_boxes(rows)
+        move = (self._speeds[rows]*self._lastdt)[:,None]
+        (l0,r0) = (self._lastl[:,None],self._lastr[:,None])
+        (l1,t1,r1,b1) = (l1[:,None],t1[:,None],r1[:,None],b1[:,None])
+        isy = ((b1 <= cb) & (cb <= t1)) | ((cb <= b1) & (b1 <= ct))
+        isx = _sweep(cr-move-l0,cr-l1,r0-cl+move,r1-cl)
+        return mask & (isy & isx & ~np.isnan(cl)).any(axis=1)
+
+    def _exits_full(self):
+        """
+        Returns the bool array of the games where all exits are full.
+
+        As in LevelSim.exits_full, only the last hedge in the level counts.
+        """
+        if self._hedge is None:
+            return np.zeros(self._size,dtype=bool)
+        count = self._engine.getCounts()[self._hedge]
+        if count == 0:
+            return np.zeros(self._size,dtype=bool)
+        return self._used[:,self._hedge,:count].all(axis=1)
+
+    def _animate(self,dt):
+        """
+        Advances the frog animations, and ends the games of frogs that finish dying.
+
+        This is FrogSim.animate (and LevelSim._frog_died) for every game with an
+        animated frog.
+
+        Parameter dt: The time in seconds of this step
+        Precondition: dt is a number (int or float) >= 0
+        """
+        anim = self._anim
+        moving = self._hasfrog & (anim != _ANIM_NONE)
+        if not moving.any():
+            return
+
+        step = GRID_SIZE/FROG_SPEED
+        up = moving & (anim == _ANIM_UP)
+        down = moving & (anim == _ANIM_DOWN)
+        left = moving & (anim == _ANIM_LEFT)
+        right = moving & (anim == _ANIM_RIGHT)
+        death = moving & (anim == _ANIM_DEATH)
+        vertical = up | down
+        horizontal = left | right
+
+        self._fy[up] = self._fy[up]+step*dt
+        self._fy[down] = self._fy[down]-step*dt
+        self._fx[right] = self._fx[right]+step*dt
+        self._fx[left] = self._fx[left]-step*dt
+        snap = horizontal & (np.abs(self._fx-self._begin) > GRID_SIZE)
+        self._fx[snap] = self._end[snap]
+
+        # Advance the animation frames
+        self._time[moving] += dt
+        self._counttime[moving] += dt
+        split = np.where(death,DEATH_SPEED/7,FROG_SPEED/8)
+        new = moving & (self._counttime >= split)
+        self._count[new] += 1
+        self._counttime[new] = 0
+
+        # Animations that run out of frames stop where they are
+        limit = np.where(death,self._deathcount,len(HOP_FRAMES))
+        out = new & (self._count >= limit)
+        hop = new & ~out & ~death
+        self._frame[hop] = _HOP_FRAMES[self._count[hop]]
+
+        over = up & ~out & (self._fy > self._end)
+        self._fy[over] = self._end[over]
+        under = down & ~out & (self._fy < self._end)
+        self._fy[under] = self._end[under]
+
+        running = ~out & ((vertical & (self._time <= FROG_SPEED)) |
+                          (horizontal & (self._time < FROG_SPEED)) |
+                          (death & (self._time <= DEATH_SPEED)))
+        finished = moving & ~running
+        self._frame[finished & ~out & ~death] = 0
+        anim[finished] = _ANIM_NONE
+
+        died = finished & ~self._alive
+        self._state[died & (self._lives > 1)] = STATE_PAUSED
+        self._state[died & (self._lives <= 1)] = STATE_COMPLETE
+        self._hasfrog[died] = False
+        self._lives[died] -= 1
+
+    def _move_frog(self,actions,ready):
+        """
+        Starts the hops of the frogs that are ready to move.
+
+        This is LevelSim._to_right, _to_left, _to_up and _to_down for every game.
+
+        Parameter actions: The action of each game, as an index into ACTIONS
+        Precondition: actions is an int array with one entry per game
+
+        Parameter ready: The games with a frog that is not animating
+        Precondition: ready is a bool array with one entry per game
+        """
+        right = ready & (actions == 1)
+        left = ready & (actions == 2)
+        up = ready & (actions == 3)
+        down = ready & (actions == 4)
+        self._angle[right] = FROG_EAST % 360 // 90
+        self._angle[left] = FROG_WEST % 360 // 90
+        self._angle[up] = FROG_NORTH % 360 // 90
+        self._angle[down] = FROG_SOUTH % 360 // 90
+
+        inhedge = self._types[self._rows(self._fy)] == 3
+        right &= (self._fx+GRID_SIZE < self._width) & ~inhedge
+        left &= (self._fx-GRID_SIZE > 0) & ~inhedge
+
+        newy = self._fy+GRID_SIZE
+        rows = self._rows(newy)
+        (collide,isexit,allow,isopen) = self._hedge_check(rows,newy)
+        allowed = np.where(isexit,allow,isopen)
+        up &= (newy < self._top) & ((self._types[rows] != 3) | ~collide | allowed)
+
+        newy = self._fy-GRID_SIZE
+        rows = self._rows(newy)
+        (collide,isexit,allow,isopen) = self._hedge_check(rows,newy)
+        allowed = isopen & ~isexit
+        down &= (newy > 0) & ((self._types[rows] != 3) | ~collide | allowed)
+
+        for (mask,code,coord,sign) in ((up,_ANIM_UP,self._fy,1),(down,_ANIM_DOWN,self._fy,-1),
+                                       (left,_ANIM_LEFT,self._fx,-1),
+                                       (right,_ANIM_RIGHT,self._fx,1)):
+            self._anim[mask] = code
+            self._begin[mask] = coord[mask]
+            self._end[mask] = coord[mask]+sign*GRID_SIZE
+            self._time[mask] = 0
+            self._counttime[mask] = 0
+            self._count[mask] = 0
+
+
+def _sweep(a0,a1,b0,b1):
+    """
+    Returns the bool array of the entries where two linear quantities are both >= 0.
+
+    This is the function _sweep in simulation.py, where each quantity is an array
+    instead of a number.  Over a step, the time s goes from 0 to 1, the first
+    quantity goes from a0 to a1, and the second goes from b0 to b1.
+
+    Parameter a0: The first quantity at the start of the step
+    Precondition: a0 is a float array
+
+    Parameter a1: The first quantity at the end of the step
+    Precondition: a1 is a float array the shape of a0
+
+    Parameter b0: The second quantity at the start of the step
+    Precondition: b0 is a float array the shape of a0
+
+    Parameter b1: The second quantity at the end of the step
+    Precondition: b1 is a float array the shape of a0
+    """
+    lo = np.zeros(np.shape(a0))
+    hi = np.ones(np.shape(a0))
+    ok = np.ones(np.shape(a0),dtype=bool)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        for (v0,v1) in ((a0,a1),(b0,b1)):
+            ok &= (v0 >= 0) | (v1 >= 0)
+            cross = v0/(v0-v1)
+            lo = np.where(v0 < 0,np.maximum(lo,cross),lo)
+            hi = np.where((v0 >= 0) & (v1 < 0),np.minimum(hi,cross),hi)
+    return ok & (lo <= hi)
+
+
+def _collides(box1,box2):
+    """
+    Returns the bool array of the boxes in box1 that overlap the boxes in box2.
+
+    This is the function collides in simulation.py, where each box is a tuple of
+    arrays (l,t,r,b) instead of a tuple of numbers.
+
+    Parameter box1: The bounding boxes (l,t,r,b) of the first objects
+    Precondition: box1 is a 4-element tuple of float arrays
+
+    Parameter box2: The bounding boxes (l,t,r,b) of the second objects
+    Precondition: box2 is a 4-element tuple of float arrays
+    """
+    (l1,t1,r1,b1) = box1
+    (l0,t0,r0,b0) = box2
+    isx = ((l1 <= l0) & (l0 <= r1)) | ((l0 <= l1) & (l1 <= r0))
+    isy = ((b1 <= b0) & (b0 <= t1)) | ((b0 <= b1) & (b1 <= t0))
+    return isx & isy